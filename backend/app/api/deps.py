@@ -3,7 +3,7 @@ Common dependencies for API endpoints
 """
 
 from typing import Generator, Optional, Dict, Any
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status, Query
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
@@ -19,6 +19,10 @@ from app.services.user_service import UserService
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
 )
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login",
+    auto_error=False
+)
 
 
 def get_current_user(
@@ -83,6 +87,18 @@ def get_current_user(
         )
 
 
+def get_current_stream_user(
+    db: Session = Depends(get_db),
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None)
+) -> Dict[str, Any]:
+    """
+    Get current user for streaming endpoints
+    Browsers' EventSource cannot send headers, so the token may also be passed as ?access_token=
+    """
+    return get_current_user(db, token or access_token or "")
+
+
 def get_current_active_user(
     current_user: Dict[str, Any] = Depends(get_current_user),
 ) -> Dict[str, Any]:
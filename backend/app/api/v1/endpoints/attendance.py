@@ -8,8 +8,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.dashboard_events import queue_delta
 from app.models.attendance import Attendance
 from app.schemas.attendance import AttendanceCreate, AttendanceUpdate, AttendanceResponse, AttendanceList
+from app.services.payroll_service import PayrollService
 
 router = APIRouter()
 
@@ -70,6 +72,9 @@ async def create_attendance(
         created_by=current_user["id"]
     )
     db.add(attendance)
+    PayrollService(db).mark_dirty([attendance.employee_id], [attendance.date])
+    if attendance.date == date.today():
+        queue_delta(db, "active_today", 1)
     db.commit()
     db.refresh(attendance)
     
@@ -109,9 +114,14 @@ async def update_attendance(
         raise HTTPException(status_code=404, detail="Attendance record not found")
     
     update_data = attendance_in.dict(exclude_unset=True)
+    previous = (attendance.employee_id, attendance.date)
     for field, value in update_data.items():
         setattr(attendance, field, value)
     
+    # Draft payrolls covering the old and new date are now stale
+    payroll_service = PayrollService(db)
+    payroll_service.mark_dirty([previous[0]], [previous[1]])
+    payroll_service.mark_dirty([attendance.employee_id], [attendance.date])
     db.commit()
     db.refresh(attendance)
     
@@ -133,6 +143,9 @@ async def delete_attendance(
         raise HTTPException(status_code=404, detail="Attendance record not found")
     
     db.delete(attendance)
+    PayrollService(db).mark_dirty([attendance.employee_id], [attendance.date])
+    if attendance.date == date.today():
+        queue_delta(db, "active_today", -1)
     db.commit()
     
     return {"success": True, "message": "Attendance record deleted successfully"}
\ No newline at end of file
@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app.api import deps
+from app.core.dashboard_events import queue_delta
 from app.models.leave import Leave
 from app.schemas.leave import LeaveCreate, LeaveUpdate, LeaveApprove, LeaveResponse, LeaveList
 
@@ -64,6 +65,7 @@ async def create_leave_request(
     
     leave = Leave(**leave_in.dict())
     db.add(leave)
+    queue_delta(db, "pending_leaves", 1)
     db.commit()
     db.refresh(leave)
     
@@ -140,6 +142,7 @@ async def approve_leave_request(
             raise HTTPException(status_code=400, detail="Rejection reason is required")
         leave.reject(current_user["id"], approval.rejection_reason)
     
+    queue_delta(db, "pending_leaves", -1)
     db.commit()
     db.refresh(leave)
     
@@ -163,6 +166,8 @@ async def cancel_leave_request(
     if leave.status == 3:
         raise HTTPException(status_code=400, detail="Cannot cancel rejected leave")
     
+    if leave.status == 1:
+        queue_delta(db, "pending_leaves", -1)
     leave.cancel()
     db.commit()
     
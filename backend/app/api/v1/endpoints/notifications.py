@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import desc
 
 from app.api import deps
+from app.core.dashboard_events import queue_delta
 from app.models.notification import Notification
 from app.models.activity_log import ActivityLog
 
@@ -80,6 +81,7 @@ async def toggle_notification_read(
     
     notification.is_read = not notification.is_read
     notification.read_at = datetime.now() if notification.is_read else None
+    queue_delta(db, "unread_notifications", -1 if notification.is_read else 1, user_id=current_user["id"])
     db.commit()
     
     return {
@@ -105,6 +107,7 @@ async def mark_all_notifications_read(
         notification.is_read = True
         notification.read_at = datetime.now()
     
+    queue_delta(db, "unread_notifications", -len(notifications), user_id=current_user["id"])
     db.commit()
     
     return {
@@ -10,14 +10,51 @@ from calendar import monthrange
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func, extract
+from sqlalchemy.exc import IntegrityError
 
 from app.api import deps
-from app.models.payment import Payment
+from app.models.payment import Payment, PaymentReference
+from app.models.payroll import Payroll
 from app.schemas.payment import PaymentCreate, PaymentUpdate, PaymentProcess, PaymentResponse, PaymentList, PaymentSummary
 
 router = APIRouter()
 
 
+def _check_reference(db: Session, reference_number: Optional[str], payment_id: Optional[int] = None):
+    """
+    Reject a reference number already used by another payment, in any year
+    """
+    if not reference_number:
+        return
+    owner = db.query(PaymentReference.payment_id).filter(
+        PaymentReference.reference_number == reference_number
+    ).scalar()
+    if owner is not None and owner != payment_id:
+        raise HTTPException(status_code=400, detail="Payment reference number already exists")
+
+
+def _record_reference(db: Session, payment: Payment):
+    """
+    Keep the payment's row in payment_references in step with it (payment must be flushed)
+    """
+    db.query(PaymentReference).filter(PaymentReference.payment_id == payment.id).delete(synchronize_session=False)
+    if payment.reference_number:
+        db.add(PaymentReference(
+            reference_number=payment.reference_number,
+            payment_id=payment.id,
+            payment_date=payment.payment_date
+        ))
+
+
+def _commit(db: Session):
+    """Commit; a reference number taken concurrently is reported like any duplicate"""
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Payment reference number already exists")
+
+
 @router.get("/", response_model=PaymentList)
 async def get_payments(
     skip: int = Query(0, ge=0),
@@ -121,12 +158,20 @@ async def create_payment(
     current_user: dict = Depends(deps.get_current_user_with_permission("payments:create"))
 ) -> Any:
     """Create new payment"""
+    _check_reference(db, payment_in.reference_number)
+    
+    # payments.payroll_id cannot be a foreign key once payroll is partitioned by year
+    if payment_in.payroll_id and not db.query(Payroll.id).filter(Payroll.id == payment_in.payroll_id).first():
+        raise HTTPException(status_code=400, detail="Payroll record not found")
+    
     payment_data = payment_in.dict()
     payment_data["created_by"] = current_user["id"]
     
     payment = Payment(**payment_data)
     db.add(payment)
-    db.commit()
+    db.flush()
+    _record_reference(db, payment)
+    _commit(db)
     db.refresh(payment)
     
     payment.status_name = payment.get_status_name()
@@ -150,10 +195,17 @@ async def update_payment(
         raise HTTPException(status_code=400, detail="Cannot update completed payment")
     
     update_data = payment_in.dict(exclude_unset=True)
+    if "reference_number" in update_data:
+        _check_reference(db, update_data["reference_number"], payment.id)
+    
     for field, value in update_data.items():
         setattr(payment, field, value)
     
-    db.commit()
+    if "reference_number" in update_data or "payment_date" in update_data:
+        db.flush()
+        _record_reference(db, payment)
+    
+    _commit(db)
     db.refresh(payment)
     
     payment.status_name = payment.get_status_name()
@@ -245,6 +297,7 @@ async def delete_payment(
     if payment.status == 2:
         raise HTTPException(status_code=400, detail="Cannot delete completed payment")
     
+    db.query(PaymentReference).filter(PaymentReference.payment_id == payment.id).delete(synchronize_session=False)
     db.delete(payment)
     db.commit()
     
@@ -10,12 +10,35 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from app.api import deps
-from app.models.payroll import Payroll
-from app.schemas.payroll import PayrollCreate, PayrollUpdate, PayrollProcess, PayrollResponse, PayrollList, PayrollSummary
+from app.models.payroll import Payroll, iso_weeks
+from app.schemas.payroll import (
+    PayrollCreate, PayrollUpdate, PayrollProcess, PayrollResponse, PayrollList, PayrollSummary,
+    PayrollBatchFilter, PayrollBatchPay, PayrollBatchResult, PayrollRecomputeResult,
+    PayrollSimulationRequest, PayrollSimulationResult
+)
+from app.schemas.payroll_run import PayrollRunCreate, PayrollRunResponse, PayrollRunList
+from app.models.payroll_run import PayrollRun
+from app.services.payroll_service import PayrollService
+from app.services.payroll_rollup import PayrollRollupService
+from app.services.payroll_run_service import PayrollRunService
+from app.services.payroll_simulation import PayrollSimulationService
+from app.services.payroll_calculator import PayrollCalculator
+from app.services.payslip_service import queue_archive
 
 router = APIRouter()
 
 
+def _check_week(payment_frequency: str, year: int, week_number: Optional[int]):
+    """
+    Reject weekly periods in an ISO week the year does not have (week 53 exists in some years only)
+    """
+    if payment_frequency in ["weekly", "bi-weekly"] and week_number and week_number > iso_weeks(year):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Week {week_number} does not exist in {year}, which has {iso_weeks(year)} ISO weeks"
+        )
+
+
 @router.get("/", response_model=PayrollList)
 async def get_payroll_records(
     skip: int = Query(0, ge=0),
@@ -95,45 +118,125 @@ async def create_payroll(
     """
     Create payroll record with support for different payment frequencies
     """
-    # Build query to check for existing payroll based on frequency
-    existing_query = db.query(Payroll).filter(
-        Payroll.employee_id == payroll_in.employee_id,
-        Payroll.year == payroll_in.year,
-        Payroll.payment_frequency == payroll_in.payment_frequency
-    )
-    
-    # Add period-specific filters
-    if payroll_in.payment_frequency == "monthly":
-        existing_query = existing_query.filter(Payroll.month == payroll_in.month)
-    elif payroll_in.payment_frequency in ["weekly", "bi-weekly"]:
-        if payroll_in.week_number:
-            existing_query = existing_query.filter(Payroll.week_number == payroll_in.week_number)
-        elif payroll_in.pay_period_start:
-            existing_query = existing_query.filter(Payroll.pay_period_start == payroll_in.pay_period_start)
-    elif payroll_in.payment_frequency == "daily":
-        if payroll_in.pay_period_start:
-            existing_query = existing_query.filter(Payroll.pay_period_start == payroll_in.pay_period_start)
-    
-    existing = existing_query.first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Payroll already exists for this period")
+    _check_week(payroll_in.payment_frequency, payroll_in.year, payroll_in.week_number)
     
     payroll = Payroll(
         **payroll_in.model_dump(),
         created_by=current_user["id"]
     )
     
-    # Calculate totals
-    payroll.calculate_totals()
+    # Statutory deductions (unless supplied explicitly) and totals
+    PayrollCalculator.calculate_payroll(payroll, statutory=True, keep=payroll_in.model_fields_set)
+    
+    # The unique period key rejects duplicates atomically (INSERT ... ON CONFLICT DO NOTHING)
+    payroll = PayrollService(db).create(payroll)
+    
+    if not payroll:
+        raise HTTPException(status_code=400, detail="Payroll already exists for this period")
     
-    db.add(payroll)
     db.commit()
     db.refresh(payroll)
     
     return payroll
 
 
+@router.post("/runs", response_model=PayrollRunResponse, status_code=202)
+async def create_payroll_run(
+    run_in: PayrollRunCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:create"))
+) -> Any:
+    """
+    Queue a company-wide payroll run
+    The run is executed in chunks by the background worker; poll GET /payroll/runs/{id} for progress
+    """
+    _check_week(run_in.payment_frequency, run_in.year, run_in.week_number)
+    
+    if run_in.auto_process or run_in.auto_pay:
+        from app.core.security import RolePermissions
+        if not RolePermissions.has_permission(current_user.get("role", "employee"), "payroll:process"):
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    run = PayrollRunService(db).create(run_in.model_dump(), created_by=current_user["id"])
+    run.status_name = run.get_status_name()
+    
+    return run
+
+
+@router.get("/runs", response_model=PayrollRunList)
+async def get_payroll_runs(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    status: Optional[int] = Query(None, ge=1, le=5),
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:read"))
+) -> Any:
+    """
+    Get payroll runs, newest first
+    """
+    query = db.query(PayrollRun)
+    
+    if status:
+        query = query.filter(PayrollRun.status == status)
+    
+    total = query.count()
+    runs = query.order_by(PayrollRun.id.desc()).offset(skip).limit(limit).all()
+    
+    for run in runs:
+        run.status_name = run.get_status_name()
+    
+    return {
+        "total": total,
+        "items": runs
+    }
+
+
+@router.get("/runs/{run_id}", response_model=PayrollRunResponse)
+async def get_payroll_run(
+    run_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:read"))
+) -> Any:
+    """
+    Get payroll run with progress (checkpoint, percentage, employees/second)
+    """
+    run = PayrollRunService(db).get(run_id)
+    
+    if not run:
+        raise HTTPException(status_code=404, detail="Payroll run not found")
+    
+    run.status_name = run.get_status_name()
+    return run
+
+
+@router.post("/runs/{run_id}/cancel", response_model=PayrollRunResponse)
+async def cancel_payroll_run(
+    run_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:create"))
+) -> Any:
+    """
+    Cancel a payroll run; chunks already committed are kept
+    """
+    run = PayrollRunService(db).cancel(run_id)
+    run.status_name = run.get_status_name()
+    return run
+
+
+@router.post("/runs/{run_id}/resume", response_model=PayrollRunResponse)
+async def resume_payroll_run(
+    run_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:create"))
+) -> Any:
+    """
+    Re-queue a failed or cancelled payroll run from its last checkpoint
+    """
+    run = PayrollRunService(db).resume(run_id)
+    run.status_name = run.get_status_name()
+    return run
+
+
 @router.get("/{payroll_id}", response_model=PayrollResponse)
 async def get_payroll(
     payroll_id: int,
@@ -173,8 +276,9 @@ async def update_payroll(
     for field, value in update_data.items():
         setattr(payroll, field, value)
     
-    # Recalculate totals
-    payroll.calculate_totals()
+    # Recalculate statutory deductions (unless supplied explicitly) and totals
+    PayrollCalculator.calculate_payroll(payroll, statutory=True, keep=set(update_data))
+    PayrollRollupService(db).refresh([PayrollRollupService.period_key(payroll)])
     
     db.commit()
     db.refresh(payroll)
@@ -199,7 +303,12 @@ async def process_payroll(
     if payroll.status != 1:
         raise HTTPException(status_code=400, detail="Payroll already processed")
     
+    if payroll.needs_recalculation:
+        PayrollService(db).recompute_dirty([Payroll.id == payroll.id], commit=False)
+        db.refresh(payroll)
+    
     payroll.process(current_user["id"])
+    PayrollRollupService(db).refresh([PayrollRollupService.period_key(payroll)])
     db.commit()
     db.refresh(payroll)
     
@@ -225,6 +334,8 @@ async def mark_payroll_paid(
         raise HTTPException(status_code=400, detail="Payroll must be processed first")
     
     payroll.mark_as_paid(payment.payment_method or "Bank Transfer", payment.payment_reference)
+    PayrollRollupService(db).refresh([PayrollRollupService.period_key(payroll)])
+    queue_archive(db, [payroll.id])
     db.commit()
     db.refresh(payroll)
     
@@ -248,7 +359,9 @@ async def delete_payroll(
     if payroll.status != 1:
         raise HTTPException(status_code=400, detail="Can only delete draft payroll")
     
+    period = PayrollRollupService.period_key(payroll)
     db.delete(payroll)
+    PayrollRollupService(db).refresh([period])
     db.commit()
     
     return {"success": True, "message": "Payroll record deleted successfully"}
@@ -266,38 +379,18 @@ async def get_payroll_summary_by_frequency(
     """
     Get payroll summary aggregated by payment frequency
     """
-    from decimal import Decimal
-    
-    query = db.query(Payroll).filter(
-        Payroll.year == year,
-        Payroll.payment_frequency == payment_frequency
+    # Totals and status breakdown from the period rollup
+    summary = PayrollRollupService(db).summarize(
+        year=year,
+        payment_frequency=payment_frequency,
+        month=month if payment_frequency == "monthly" else None,
+        week_number=week_number if payment_frequency in ["weekly", "bi-weekly"] else None
     )
     
-    if month and payment_frequency == "monthly":
-        query = query.filter(Payroll.month == month)
-    
-    if week_number and payment_frequency in ["weekly", "bi-weekly"]:
-        query = query.filter(Payroll.week_number == week_number)
-    
-    payrolls = query.all()
-    
-    # Calculate totals
-    total_gross = sum([p.gross_salary for p in payrolls], Decimal(0))
-    total_deductions = sum([p.total_deductions for p in payrolls], Decimal(0))
-    total_net = sum([p.net_salary for p in payrolls], Decimal(0))
-    
-    # Group by status
-    by_status = {}
-    for p in payrolls:
-        status_name = p.get_status_name()
-        if status_name not in by_status:
-            by_status[status_name] = {"count": 0, "amount": Decimal(0)}
-        by_status[status_name]["count"] += 1
-        by_status[status_name]["amount"] += p.net_salary
-    
-    # Convert Decimal to float for JSON serialization
-    for status in by_status:
-        by_status[status]["amount"] = float(by_status[status]["amount"])
+    by_status = {
+        status: {"count": totals["count"], "amount": float(totals["amount"])}
+        for status, totals in summary["by_status"].items()
+    }
     
     # Generate period label
     period_label = f"{year}"
@@ -311,10 +404,10 @@ async def get_payroll_summary_by_frequency(
     return {
         "frequency": payment_frequency,
         "period_label": period_label,
-        "total_employees": len(payrolls),
-        "total_gross": float(total_gross),
-        "total_deductions": float(total_deductions),
-        "total_net": float(total_net),
+        "total_employees": summary["count"],
+        "total_gross": float(summary["gross"]),
+        "total_deductions": float(summary["deductions"]),
+        "total_net": float(summary["net"]),
         "by_status": by_status
     }
 
@@ -334,87 +427,102 @@ async def bulk_create_payroll(
     """
     Bulk create payroll records for multiple employees
     Uses their salary structure to populate the payroll
+    Structures are loaded in bulk and rows inserted in chunks; employees that already
+    have a payroll for the period are listed in skipped_existing
     """
-    from app.models.salary_structure import SalaryStructure
-    from app.models.user import User
-    
-    created_payrolls = []
-    errors = []
-    
-    for emp_id in employee_ids:
-        # Get employee's salary structure
-        salary_struct = db.query(SalaryStructure).filter(
-            SalaryStructure.employee_id == emp_id,
-            SalaryStructure.is_active == True
-        ).first()
-        
-        if not salary_struct:
-            errors.append({"employee_id": emp_id, "error": "No active salary structure found"})
-            continue
-        
-        # Check for existing payroll
-        existing_query = db.query(Payroll).filter(
-            Payroll.employee_id == emp_id,
-            Payroll.year == year,
-            Payroll.payment_frequency == payment_frequency
-        )
-        
-        if payment_frequency == "monthly":
-            existing_query = existing_query.filter(Payroll.month == month)
-        elif payment_frequency in ["weekly", "bi-weekly"]:
-            existing_query = existing_query.filter(Payroll.week_number == week_number)
-        elif payment_frequency == "daily":
-            existing_query = existing_query.filter(Payroll.pay_period_start == pay_period_start)
-        
-        if existing_query.first():
-            errors.append({"employee_id": emp_id, "error": "Payroll already exists for this period"})
-            continue
-        
-        # Calculate prorated amounts based on frequency
-        monthly_basic = float(salary_struct.basic_salary)
-        
-        # Prorate based on frequency
-        if payment_frequency == "daily":
-            prorate_factor = 1 / 30
-        elif payment_frequency == "weekly":
-            prorate_factor = 1 / 4
-        elif payment_frequency == "bi-weekly":
-            prorate_factor = 1 / 2
-        elif payment_frequency == "yearly":
-            prorate_factor = 12
-        else:  # monthly
-            prorate_factor = 1
-        
-        # Create payroll record
-        payroll = Payroll(
-            employee_id=emp_id,
-            year=year,
-            month=month,
-            week_number=week_number,
-            pay_period_start=pay_period_start,
-            pay_period_end=pay_period_end,
-            payment_frequency=payment_frequency,
-            basic_salary=monthly_basic * prorate_factor,
-            house_allowance=float(salary_struct.house_allowance or 0) * prorate_factor,
-            transport_allowance=float(salary_struct.transport_allowance or 0) * prorate_factor,
-            medical_allowance=float(salary_struct.medical_allowance or 0) * prorate_factor,
-            other_allowances=float(salary_struct.other_allowances or 0) * prorate_factor,
-            daily_rate=monthly_basic / 30 if payment_frequency == "daily" else 0,
-            hourly_rate=monthly_basic / 30 / 8 if payment_frequency == "daily" else 0,
-            created_by=current_user["id"]
-        )
-        
-        # Calculate totals
-        payroll.calculate_totals()
-        
-        db.add(payroll)
-        created_payrolls.append(emp_id)
-    
-    db.commit()
+    _check_week(payment_frequency, year, week_number)
+    
+    result = PayrollService(db).bulk_create(
+        employee_ids,
+        payment_frequency=payment_frequency,
+        year=year,
+        month=month,
+        week_number=week_number,
+        pay_period_start=pay_period_start,
+        pay_period_end=pay_period_end,
+        created_by=current_user["id"]
+    )
     
     return {
         "success": True,
-        "created_count": len(created_payrolls),
-        "created_for": created_payrolls,
-        "errors": errors
-    }
\ No newline at end of file
+        "created_count": len(result["created"]),
+        "created_for": result["created"],
+        "skipped_count": len(result["skipped_existing"]),
+        "skipped_existing": result["skipped_existing"],
+        "errors": result["errors"]
+    }
+
+
+@router.post("/process-batch", response_model=PayrollBatchResult)
+async def process_payroll_batch(
+    batch_in: PayrollBatchFilter,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:process"))
+) -> Any:
+    """
+    Process many draft payroll records in one guarded UPDATE
+    Select rows by id list and/or year/month/week/frequency/department
+    """
+    return PayrollService(db).process_batch(current_user["id"], **batch_in.model_dump())
+
+
+@router.post("/pay-batch", response_model=PayrollBatchResult)
+async def pay_payroll_batch(
+    batch_in: PayrollBatchPay,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:process"))
+) -> Any:
+    """
+    Mark many processed payroll records as paid in one guarded UPDATE
+    Select rows by id list and/or year/month/week/frequency/department
+    """
+    batch = batch_in.model_dump()
+    payment_method = batch.pop("payment_method") or "Bank Transfer"
+    payment_reference = batch.pop("payment_reference")
+    
+    return PayrollService(db).pay_batch(payment_method, payment_reference, **batch)
+
+
+@router.post("/recompute", response_model=PayrollRecomputeResult)
+async def recompute_payroll(
+    year: Optional[int] = Query(None),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    week_number: Optional[int] = Query(None, ge=1, le=53),
+    payment_frequency: Optional[str] = Query(None, pattern="^(daily|weekly|bi-weekly|monthly|yearly)$"),
+    employee_id: Optional[int] = Query(None),
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:update"))
+) -> Any:
+    """
+    Recalculate draft payroll records whose salary structure or attendance changed
+    Only rows flagged for recalculation are touched
+    """
+    service = PayrollService(db)
+    clauses = service.filter_clauses(
+        employee_ids=[employee_id] if employee_id else None,
+        payment_frequency=payment_frequency,
+        year=year,
+        month=month,
+        week_number=week_number
+    )
+    
+    return service.recompute_dirty(clauses)
+
+
+@router.post("/simulate", response_model=PayrollSimulationResult)
+async def simulate_payroll(
+    simulation_in: PayrollSimulationRequest,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:read"))
+) -> Any:
+    """
+    What-if payroll costing: apply hypothetical salary adjustments to the active
+    salary structures in memory and return the change by department, designation
+    and payment frequency. Nothing is written.
+    """
+    _check_week(simulation_in.payment_frequency, simulation_in.year, simulation_in.week_number)
+    
+    simulation = simulation_in.model_dump()
+    adjustments = simulation.pop("adjustments")
+    
+    return PayrollSimulationService(db).simulate(adjustments, **simulation)
@@ -4,16 +4,18 @@ Payslip endpoints
 
 from typing import Any, Optional
 from datetime import date
-from fastapi import APIRouter, Depends, Query, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func, extract
 import io
 from decimal import Decimal
 
 from app.api import deps
-from app.models.user import User
 from app.models.payroll import Payroll
+from app.services.payslip_service import PayslipService, company_info
+from app.services.payslip_pdf import render_pdf, pdf_filename, stream_zip, EARNINGS, DEDUCTIONS
+from app.services.payslip_archive import read_pdf
 
 router = APIRouter()
 
@@ -32,38 +34,30 @@ async def get_payslips(
     """
     Get payslips with filters
     """
-    query = db.query(Payroll)
+    service = PayslipService(db)
+    filters = dict(month=month, year=year, employee_id=employee_id, status=status)
     
-    if month:
-        query = query.filter(Payroll.month == month)
-    if year:
-        query = query.filter(Payroll.year == year)
-    if employee_id:
-        query = query.filter(Payroll.employee_id == employee_id)
-    if status:
-        query = query.filter(Payroll.status == status)
+    total = service.count(**filters)
+    rows = service.summaries(skip=skip, limit=limit, **filters)
     
-    total = query.count()
-    payslips = query.offset(skip).limit(limit).all()
-    
-    items = []
-    for payslip in payslips:
-        employee = db.query(User).filter(User.id == payslip.employee_id).first()
-        items.append({
-            "id": payslip.id,
-            "employee_id": payslip.employee_id,
-            "employee_name": employee.name if employee else "Unknown",
-            "employee_number": employee.employee_id if employee else "N/A",
-            "month": payslip.month,
-            "year": payslip.year,
-            "basic_salary": float(payslip.basic_salary),
-            "gross_salary": float(payslip.gross_salary),
-            "total_deductions": float(payslip.total_deductions),
-            "net_salary": float(payslip.net_salary),
-            "status": payslip.get_status_name(),
-            "payment_date": payslip.payment_date,
-            "created_at": payslip.created_at
-        })
+    items = [
+        {
+            "id": row.id,
+            "employee_id": row.employee_id,
+            "employee_name": row.employee_name or "Unknown",
+            "employee_number": row.employee_number or "N/A",
+            "month": row.month,
+            "year": row.year,
+            "basic_salary": float(row.basic_salary),
+            "gross_salary": float(row.gross_salary),
+            "total_deductions": float(row.total_deductions),
+            "net_salary": float(row.net_salary),
+            "status": Payroll.STATUS_NAMES.get(row.status, "Unknown"),
+            "payment_date": row.payment_date,
+            "created_at": row.created_at
+        }
+        for row in rows
+    ]
     
     return {
         "items": items,
@@ -73,6 +67,55 @@ async def get_payslips(
     }
 
 
+@router.get("/bulk/download")
+async def download_bulk_payslips(
+    month: int = Query(..., ge=1, le=12),
+    year: int = Query(...),
+    employee_id: Optional[int] = Query(None),
+    format: str = Query("zip", pattern="^(zip|json)$"),
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:read"))
+) -> Any:
+    """
+    Download a month's payslips as a ZIP of PDFs
+    PDFs are rendered in a process pool and streamed into the ZIP as they complete.
+    format=json returns an array of payslip summaries instead
+    """
+    if format == "zip":
+        return StreamingResponse(
+            stream_zip(PayslipService(db).documents(month, year, employee_id), company_info()),
+            media_type="application/zip",
+            headers={"Content-Disposition": f"attachment; filename=payslips_{year}_{month:02d}.zip"}
+        )
+    
+    rows = PayslipService(db).summaries(month=month, year=year, employee_id=employee_id)
+    
+    result = [
+        {
+            "payslip_id": row.id,
+            "employee": {
+                "name": row.employee_name,
+                "employee_number": row.employee_number,
+                "designation": row.designation or "N/A"
+            },
+            "period": {
+                "month": row.month,
+                "year": row.year
+            },
+            "gross_salary": float(row.gross_salary),
+            "total_deductions": float(row.total_deductions),
+            "net_salary": float(row.net_salary)
+        }
+        for row in rows
+    ]
+    
+    return {
+        "payslips": result,
+        "total": len(result),
+        "period": f"{['', 'January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December'][month]} {year}"
+    }
+
+
 @router.get("/{payslip_id}")
 async def get_payslip(
     payslip_id: int,
@@ -82,27 +125,25 @@ async def get_payslip(
     """
     Get single payslip details
     """
-    payslip = db.query(Payroll).filter(Payroll.id == payslip_id).first()
+    payslip = PayslipService(db).get_detail(payslip_id)
     if not payslip:
         raise HTTPException(status_code=404, detail="Payslip not found")
     
-    employee = db.query(User).filter(User.id == payslip.employee_id).first()
-    
     return {
         "id": payslip.id,
         "employee": {
-            "id": employee.id,
-            "name": employee.name,
-            "employee_number": employee.employee_id,
-            "email": employee.email,
-            "phone": employee.contact_no_one,
-            "designation": employee.designation.name if employee.designation else None,
-            "department": employee.department.name if employee.department else None,
-            "bank_name": employee.bank_name,
-            "account_number": employee.account_number,
-            "kra_pin": employee.kra_pin,
-            "nssf_no": employee.nssf_no,
-            "nhif_no": employee.nhif_no
+            "id": payslip.employee_id,
+            "name": payslip.employee_name,
+            "employee_number": payslip.employee_number,
+            "email": payslip.email,
+            "phone": payslip.contact_no_one,
+            "designation": payslip.designation,
+            "department": payslip.department,
+            "bank_name": payslip.bank_name,
+            "account_number": payslip.bank_acc_no,
+            "kra_pin": payslip.kra_pin,
+            "nssf_no": payslip.nssf_no,
+            "nhif_no": payslip.nhif_no
         },
         "period": {
             "month": payslip.month,
@@ -128,10 +169,10 @@ async def get_payslip(
         "attendance": {
             "working_days": payslip.working_days,
             "days_worked": payslip.days_worked,
-            "overtime_hours": float(payslip.overtime_hours)
+            "overtime_hours": float(payslip.overtime_hours or 0)
         },
         "net_salary": float(payslip.net_salary),
-        "status": payslip.get_status_name(),
+        "status": Payroll.STATUS_NAMES.get(payslip.status, "Unknown"),
         "payment_date": payslip.payment_date,
         "payment_method": payslip.payment_method,
         "payment_reference": payslip.payment_reference,
@@ -144,120 +185,89 @@ async def get_payslip(
 @router.get("/{payslip_id}/download")
 async def download_payslip_pdf(
     payslip_id: int,
+    request: Request,
+    format: str = Query("pdf", pattern="^(pdf|json)$"),
     db: Session = Depends(deps.get_db),
     current_user: dict = Depends(deps.get_current_user_with_permission("payroll:read"))
 ) -> Any:
     """
-    Download payslip as PDF (returns payslip data for frontend PDF generation)
+    Download payslip as PDF
+    Paid payslips are served from the archive with their content hash as ETag and may
+    be cached for good; a matching If-None-Match is answered with 304.
+    format=json returns the payslip data instead, for clients that render their own
     """
-    payslip = db.query(Payroll).filter(Payroll.id == payslip_id).first()
-    if not payslip:
+    service = PayslipService(db)
+    digest = service.archive_digest(payslip_id) if format == "pdf" else None
+    
+    cache_headers = {}
+    if digest:
+        etag = f'"{digest}"'
+        cache_headers = {
+            "ETag": etag,
+            # Payslips are personal: browsers may keep them, shared caches may not
+            "Cache-Control": "private, max-age=31536000, immutable"
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match.strip() == "*" or etag in if_none_match:
+            return Response(status_code=304, headers=cache_headers)
+    
+    document = service.get_document(payslip_id)
+    if not document:
         raise HTTPException(status_code=404, detail="Payslip not found")
     
-    employee = db.query(User).filter(User.id == payslip.employee_id).first()
+    company = company_info()
+    
+    if format == "pdf":
+        return Response(
+            content=read_pdf(digest) or render_pdf(document, company),
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"attachment; filename={pdf_filename(document)}", **cache_headers}
+        )
     
-    # Return structured data for PDF generation on frontend
     return {
-        "payslip_id": payslip.id,
+        "payslip_id": document["id"],
         "company": {
-            "name": "Your Company Name",
-            "address": "Company Address",
-            "phone": "Company Phone",
-            "email": "company@email.com"
+            "name": company["company_name"],
+            "address": company["company_address"],
+            "phone": company["company_phone"],
+            "email": company["company_email"]
         },
         "employee": {
-            "name": employee.name,
-            "employee_number": employee.employee_id,
-            "designation": employee.designation.name if employee.designation else "N/A",
-            "department": employee.department.name if employee.department else "N/A",
-            "bank_name": employee.bank_name or "N/A",
-            "account_number": employee.account_number or "N/A",
-            "kra_pin": employee.kra_pin or "N/A",
-            "nssf_no": employee.nssf_no or "N/A",
-            "nhif_no": employee.nhif_no or "N/A"
+            "name": document["employee_name"],
+            "employee_number": document["employee_number"],
+            "designation": document["designation"] or "N/A",
+            "department": document["department"] or "N/A",
+            "bank_name": document["bank_name"] or "N/A",
+            "account_number": document["bank_acc_no"] or "N/A",
+            "kra_pin": document["kra_pin"] or "N/A",
+            "nssf_no": document["nssf_no"] or "N/A",
+            "nhif_no": document["nhif_no"] or "N/A"
         },
         "period": {
-            "month": payslip.month,
-            "year": payslip.year,
-            "month_name": ["", "January", "February", "March", "April", "May", "June", 
-                          "July", "August", "September", "October", "November", "December"][payslip.month]
+            "month": document["month"],
+            "year": document["year"],
+            "month_name": document["period"]
         },
         "earnings": [
-            {"description": "Basic Salary", "amount": float(payslip.basic_salary)},
-            {"description": "House Allowance", "amount": float(payslip.house_allowance)},
-            {"description": "Transport Allowance", "amount": float(payslip.transport_allowance)},
-            {"description": "Medical Allowance", "amount": float(payslip.medical_allowance)},
-            {"description": "Other Allowances", "amount": float(payslip.other_allowances)},
-            {"description": "Overtime", "amount": float(payslip.overtime_amount)}
+            {"description": label, "amount": float(document[key])} for label, key in EARNINGS
         ],
         "deductions": [
-            {"description": "NSSF", "amount": float(payslip.nssf)},
-            {"description": "NHIF", "amount": float(payslip.nhif)},
-            {"description": "PAYE", "amount": float(payslip.paye)},
-            {"description": "Loan Deduction", "amount": float(payslip.loan_deduction)},
-            {"description": "Other Deductions", "amount": float(payslip.other_deductions)}
+            {"description": label, "amount": float(document[key])} for label, key in DEDUCTIONS
         ],
         "totals": {
-            "gross_salary": float(payslip.gross_salary),
-            "total_deductions": float(payslip.total_deductions),
-            "net_salary": float(payslip.net_salary)
+            "gross_salary": float(document["gross_salary"]),
+            "total_deductions": float(document["total_deductions"]),
+            "net_salary": float(document["net_salary"])
         },
         "attendance": {
-            "working_days": payslip.working_days,
-            "days_worked": payslip.days_worked,
-            "overtime_hours": float(payslip.overtime_hours)
+            "working_days": document["working_days"],
+            "days_worked": document["days_worked"],
+            "overtime_hours": float(document["overtime_hours"])
         },
         "payment": {
-            "date": str(payslip.payment_date) if payslip.payment_date else None,
-            "method": payslip.payment_method,
-            "reference": payslip.payment_reference
+            "date": str(document["payment_date"]) if document["payment_date"] else None,
+            "method": document["payment_method"],
+            "reference": document["payment_reference"]
         },
         "generated_at": str(date.today())
     }
-
-
-@router.get("/bulk/download")
-async def download_bulk_payslips(
-    month: int = Query(..., ge=1, le=12),
-    year: int = Query(...),
-    employee_id: Optional[int] = Query(None),
-    db: Session = Depends(deps.get_db),
-    current_user: dict = Depends(deps.get_current_user_with_permission("payroll:read"))
-) -> Any:
-    """
-    Download multiple payslips (returns array of payslip data)
-    """
-    query = db.query(Payroll).filter(
-        Payroll.month == month,
-        Payroll.year == year
-    )
-    
-    if employee_id:
-        query = query.filter(Payroll.employee_id == employee_id)
-    
-    payslips = query.all()
-    
-    result = []
-    for payslip in payslips:
-        employee = db.query(User).filter(User.id == payslip.employee_id).first()
-        result.append({
-            "payslip_id": payslip.id,
-            "employee": {
-                "name": employee.name,
-                "employee_number": employee.employee_id,
-                "designation": employee.designation.name if employee.designation else "N/A"
-            },
-            "period": {
-                "month": payslip.month,
-                "year": payslip.year
-            },
-            "gross_salary": float(payslip.gross_salary),
-            "total_deductions": float(payslip.total_deductions),
-            "net_salary": float(payslip.net_salary)
-        })
-    
-    return {
-        "payslips": result,
-        "total": len(result),
-        "period": f"{['', 'January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December'][month]} {year}"
-    }
@@ -4,64 +4,77 @@ Reports endpoints
 
 from typing import Any
 from datetime import date, datetime
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse, FileResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from sqlalchemy import func
 import io
 import csv
 from decimal import Decimal
 
 from app.api import deps
+from app.core.report_cache import cached_report
 from app.models.user import User
-from app.models.attendance import Attendance
 from app.models.leave import Leave
 from app.models.payroll import Payroll
-from app.models.payment import Payment
-from app.models.salary_structure import SalaryStructure
+from app.models.report_job import ReportJob
+from app.schemas.report_job import ReportJobCreate, ReportJobResponse, ReportJobList
+from app.services.payroll_service import PayrollService
+from app.services.payroll_rollup import PayrollRollupService
+from app.services.report_service import ReportService, TAX_EXPORT_COLUMNS
+from app.services.parquet_export import ParquetExporter, EXPORT_TABLES
+from app.services.report_job_service import ReportJobService, MEDIA_TYPES
 
 router = APIRouter()
 
 
 @router.get("/payroll-summary")
+@cached_report("payroll", "payroll_period_rollup")
 async def get_payroll_summary(
     month: int = Query(..., ge=1, le=12),
     year: int = Query(...),
+    include_records: bool = Query(True, description="Include a page of per-employee records"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(deps.get_db),
     current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
 ) -> Any:
     """
     Get payroll summary for a specific month/year
+    Totals come from the period rollup; records are paginated and optional
     """
-    payrolls = db.query(Payroll).filter(
-        Payroll.month == month,
-        Payroll.year == year
-    ).all()
-    
-    total_gross = sum([p.gross_salary for p in payrolls])
-    total_deductions = sum([p.total_deductions for p in payrolls])
-    total_net = sum([p.net_salary for p in payrolls])
+    clauses = [Payroll.month == month, Payroll.year == year]
+    summary = PayrollRollupService(db).summarize(year=year, month=month)
+    
+    records = []
+    if include_records:
+        rows = db.query(
+            Payroll.employee_id, Payroll.gross_salary, Payroll.net_salary, Payroll.status
+        ).filter(*clauses).order_by(Payroll.id).offset(skip).limit(limit).all()
+        records = [
+            {
+                "employee_id": r.employee_id,
+                "gross_salary": float(r.gross_salary),
+                "net_salary": float(r.net_salary),
+                "status": Payroll.STATUS_NAMES.get(r.status, "Unknown")
+            }
+            for r in rows
+        ]
     
     return {
         "month": month,
         "year": year,
-        "total_employees": len(payrolls),
-        "total_gross_salary": float(total_gross),
-        "total_deductions": float(total_deductions),
-        "total_net_salary": float(total_net),
-        "payrolls": [
-            {
-                "employee_id": p.employee_id,
-                "gross_salary": float(p.gross_salary),
-                "net_salary": float(p.net_salary),
-                "status": p.get_status_name()
-            }
-            for p in payrolls
-        ]
+        "total_employees": summary["count"],
+        "total_gross_salary": float(summary["gross"]),
+        "total_deductions": float(summary["deductions"]),
+        "total_net_salary": float(summary["net"]),
+        "pagination": {"skip": skip, "limit": limit, "total": summary["count"]},
+        "payrolls": records
     }
 
 
 @router.get("/attendance-summary")
+@cached_report("attendance")
 async def get_attendance_summary(
     start_date: date = Query(...),
     end_date: date = Query(...),
@@ -72,33 +85,18 @@ async def get_attendance_summary(
     """
     Get attendance summary for a date range
     """
-    query = db.query(Attendance).filter(
-        Attendance.date >= start_date,
-        Attendance.date <= end_date
-    )
-    
-    if employee_id:
-        query = query.filter(Attendance.employee_id == employee_id)
-    
-    records = query.all()
-    
-    status_counts = {
-        "present": len([r for r in records if r.status == 1]),
-        "absent": len([r for r in records if r.status == 2]),
-        "late": len([r for r in records if r.status == 3]),
-        "half_day": len([r for r in records if r.status == 4]),
-        "leave": len([r for r in records if r.status == 5])
-    }
+    summary = ReportService(db).attendance_summary(start_date, end_date, employee_id)
     
     return {
         "start_date": start_date,
         "end_date": end_date,
-        "total_records": len(records),
-        "status_breakdown": status_counts
+        "total_records": summary["total_records"],
+        "status_breakdown": summary["status_breakdown"]
     }
 
 
 @router.get("/leave-summary")
+@cached_report("leaves")
 async def get_leave_summary(
     year: int = Query(...),
     employee_id: int = Query(None),
@@ -108,40 +106,19 @@ async def get_leave_summary(
     """
     Get leave summary for a year
     """
-    query = db.query(Leave).filter(
-        extract('year', Leave.start_date) == year
-    )
-    
-    if employee_id:
-        query = query.filter(Leave.employee_id == employee_id)
-    
-    leaves = query.all()
-    
-    leave_type_counts = {}
-    for leave in leaves:
-        leave_type = leave.get_leave_type_name()
-        if leave_type not in leave_type_counts:
-            leave_type_counts[leave_type] = {"count": 0, "days": 0}
-        leave_type_counts[leave_type]["count"] += 1
-        leave_type_counts[leave_type]["days"] += leave.days
-    
-    status_counts = {
-        "pending": len([l for l in leaves if l.status == 1]),
-        "approved": len([l for l in leaves if l.status == 2]),
-        "rejected": len([l for l in leaves if l.status == 3]),
-        "cancelled": len([l for l in leaves if l.status == 4])
-    }
+    summary = ReportService(db).leave_summary(year, employee_id)
     
     return {
         "year": year,
-        "total_requests": len(leaves),
-        "total_days": sum([l.days for l in leaves]),
-        "leave_types": leave_type_counts,
-        "status_breakdown": status_counts
+        "total_requests": summary["total_requests"],
+        "total_days": summary["total_days"],
+        "leave_types": summary["leave_types"],
+        "status_breakdown": summary["status_breakdown"]
     }
 
 
 @router.get("/employee-statistics")
+@cached_report("users")
 async def get_employee_statistics(
     db: Session = Depends(deps.get_db),
     current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
@@ -175,83 +152,31 @@ async def get_employee_statistics(
 
 
 @router.get("/employee-detailed")
+@cached_report("users", "designations", "attendance", "leaves", "payroll")
 async def get_detailed_employee_report(
     employee_id: int = Query(None),
     start_date: date = Query(None),
     end_date: date = Query(None),
+    after_id: int = Query(None, description="Return employees with id greater than this (keyset pagination)"),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(deps.get_db),
     current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
 ) -> Any:
     """
     Get detailed employee report including attendance, leave, and payroll
+    One page of employees plus one grouped query each for attendance, leave and payroll
     """
-    query = db.query(User).filter(User.deletion_status == 0)
-    
-    if employee_id:
-        query = query.filter(User.id == employee_id)
-    
-    employees = query.all()
-    
-    report_data = []
-    for emp in employees:
-        # Attendance data
-        attendance_query = db.query(Attendance).filter(Attendance.employee_id == emp.id)
-        if start_date:
-            attendance_query = attendance_query.filter(Attendance.date >= start_date)
-        if end_date:
-            attendance_query = attendance_query.filter(Attendance.date <= end_date)
-        attendance_records = attendance_query.all()
-        
-        # Leave data
-        leave_query = db.query(Leave).filter(Leave.employee_id == emp.id)
-        if start_date:
-            leave_query = leave_query.filter(Leave.start_date >= start_date)
-        if end_date:
-            leave_query = leave_query.filter(Leave.end_date <= end_date)
-        leave_records = leave_query.all()
-        
-        # Payroll data
-        payroll_query = db.query(Payroll).filter(Payroll.employee_id == emp.id)
-        if start_date and end_date:
-            payroll_query = payroll_query.filter(
-                Payroll.year >= start_date.year,
-                Payroll.year <= end_date.year
-            )
-        payroll_records = payroll_query.all()
-        
-        report_data.append({
-            "employee_id": emp.id,
-            "employee_name": emp.name,
-            "employee_number": emp.employee_id,
-            "designation": emp.designation.name if emp.designation else None,
-            "attendance": {
-                "total_days": len(attendance_records),
-                "present": len([r for r in attendance_records if r.status == 1]),
-                "absent": len([r for r in attendance_records if r.status == 2]),
-                "late": len([r for r in attendance_records if r.status == 3]),
-                "half_day": len([r for r in attendance_records if r.status == 4])
-            },
-            "leave": {
-                "total_requests": len(leave_records),
-                "total_days": sum([l.days for l in leave_records]),
-                "approved": len([l for l in leave_records if l.status == 2]),
-                "pending": len([l for l in leave_records if l.status == 1])
-            },
-            "payroll": {
-                "total_records": len(payroll_records),
-                "total_gross": float(sum([p.gross_salary for p in payroll_records])),
-                "total_net": float(sum([p.net_salary for p in payroll_records]))
-            }
-        })
-    
-    return {
-        "start_date": start_date,
-        "end_date": end_date,
-        "employees": report_data
-    }
+    return ReportService(db).employee_detailed(
+        employee_id=employee_id,
+        start_date=start_date,
+        end_date=end_date,
+        after_id=after_id,
+        limit=limit
+    )
 
 
 @router.get("/payroll-detailed")
+@cached_report("payroll", "users")
 async def get_detailed_payroll_report(
     month: int = Query(None, ge=1, le=12),
     year: int = Query(None),
@@ -260,115 +185,103 @@ async def get_detailed_payroll_report(
     week_number: int = Query(None, ge=1, le=53),
     start_date: date = Query(None),
     end_date: date = Query(None),
+    include_records: bool = Query(True, description="Include a page of detailed records"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(deps.get_db),
     current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
 ) -> Any:
     """
     Get detailed payroll report with breakdown of all components
     Supports daily, weekly, bi-weekly, monthly, and yearly frequency filtering
+    Totals and breakdowns cover every matching record; records are paginated and optional
     """
-    query = db.query(Payroll)
+    clauses = []
     
     if employee_id:
-        query = query.filter(Payroll.employee_id == employee_id)
+        clauses.append(Payroll.employee_id == employee_id)
     
     if month:
-        query = query.filter(Payroll.month == month)
+        clauses.append(Payroll.month == month)
     
     if year:
-        query = query.filter(Payroll.year == year)
+        clauses.append(Payroll.year == year)
     
     if frequency:
-        query = query.filter(Payroll.payment_frequency == frequency)
+        clauses.append(Payroll.payment_frequency == frequency)
     
     if week_number:
-        query = query.filter(Payroll.week_number == week_number)
+        clauses.append(Payroll.week_number == week_number)
     
     # Date range filtering
     if start_date:
-        query = query.filter(
+        clauses.append(
             (Payroll.pay_period_start >= start_date) | 
             (Payroll.pay_period_start.is_(None))
         )
     
     if end_date:
-        query = query.filter(
+        clauses.append(
             (Payroll.pay_period_end <= end_date) | 
             (Payroll.pay_period_end.is_(None))
         )
     
-    payrolls = query.order_by(Payroll.year.desc(), Payroll.month.desc().nullslast()).all()
+    # Totals, by_frequency and by_status come from one grouped query
+    summary = PayrollService(db).summarize(clauses)
     
     detailed_records = []
-    for p in payrolls:
-        detailed_records.append({
-            "employee_id": p.employee_id,
-            "employee_name": p.employee.name if p.employee else None,
-            "payment_frequency": p.payment_frequency,
-            "period_label": p.get_period_label(),
-            "month": p.month,
-            "year": p.year,
-            "week_number": p.week_number,
-            "pay_period_start": p.pay_period_start,
-            "pay_period_end": p.pay_period_end,
-            "basic_salary": float(p.basic_salary),
-            "allowances": {
-                "house": float(p.house_allowance or 0),
-                "transport": float(p.transport_allowance or 0),
-                "medical": float(p.medical_allowance or 0),
-                "other": float(p.other_allowances or 0)
-            },
-            "overtime": {
-                "hours": float(p.overtime_hours or 0),
-                "amount": float(p.overtime_amount or 0)
-            },
-            "rates": {
-                "daily": float(p.daily_rate or 0),
-                "hourly": float(p.hourly_rate or 0)
-            },
-            "work_info": {
-                "working_days": p.working_days,
-                "days_worked": p.days_worked,
-                "hours_worked": float(p.hours_worked or 0)
-            },
-            "gross_salary": float(p.gross_salary),
-            "deductions": {
-                "nssf": float(p.nssf or 0),
-                "nhif": float(p.nhif or 0),
-                "paye": float(p.paye or 0),
-                "loan": float(p.loan_deduction or 0),
-                "other": float(p.other_deductions or 0)
-            },
-            "total_deductions": float(p.total_deductions),
-            "net_salary": float(p.net_salary),
-            "status": p.get_status_name(),
-            "payment_date": p.payment_date,
-            "payment_method": p.payment_method
-        })
-    
-    # Calculate totals
-    total_gross = sum([p.gross_salary for p in payrolls])
-    total_deductions = sum([p.total_deductions for p in payrolls])
-    total_net = sum([p.net_salary for p in payrolls])
-    
-    # Group by frequency for summary
-    by_frequency = {}
-    for p in payrolls:
-        freq = p.payment_frequency or "monthly"
-        if freq not in by_frequency:
-            by_frequency[freq] = {"count": 0, "gross": 0, "net": 0}
-        by_frequency[freq]["count"] += 1
-        by_frequency[freq]["gross"] += float(p.gross_salary)
-        by_frequency[freq]["net"] += float(p.net_salary)
-    
-    # Group by status
-    by_status = {}
-    for p in payrolls:
-        status = p.get_status_name()
-        if status not in by_status:
-            by_status[status] = {"count": 0, "amount": 0}
-        by_status[status]["count"] += 1
-        by_status[status]["amount"] += float(p.net_salary)
+    if include_records:
+        rows = db.query(Payroll, User.name).outerjoin(
+            User, User.id == Payroll.employee_id
+        ).filter(*clauses).order_by(
+            Payroll.year.desc(), Payroll.month.desc().nullslast(), Payroll.id
+        ).offset(skip).limit(limit).all()
+        
+        for p, employee_name in rows:
+            detailed_records.append({
+                "employee_id": p.employee_id,
+                "employee_name": employee_name,
+                "payment_frequency": p.payment_frequency,
+                "period_label": p.get_period_label(),
+                "month": p.month,
+                "year": p.year,
+                "week_number": p.week_number,
+                "pay_period_start": p.pay_period_start,
+                "pay_period_end": p.pay_period_end,
+                "basic_salary": float(p.basic_salary),
+                "allowances": {
+                    "house": float(p.house_allowance or 0),
+                    "transport": float(p.transport_allowance or 0),
+                    "medical": float(p.medical_allowance or 0),
+                    "other": float(p.other_allowances or 0)
+                },
+                "overtime": {
+                    "hours": float(p.overtime_hours or 0),
+                    "amount": float(p.overtime_amount or 0)
+                },
+                "rates": {
+                    "daily": float(p.daily_rate or 0),
+                    "hourly": float(p.hourly_rate or 0)
+                },
+                "work_info": {
+                    "working_days": p.working_days,
+                    "days_worked": p.days_worked,
+                    "hours_worked": float(p.hours_worked or 0)
+                },
+                "gross_salary": float(p.gross_salary),
+                "deductions": {
+                    "nssf": float(p.nssf or 0),
+                    "nhif": float(p.nhif or 0),
+                    "paye": float(p.paye or 0),
+                    "loan": float(p.loan_deduction or 0),
+                    "other": float(p.other_deductions or 0)
+                },
+                "total_deductions": float(p.total_deductions),
+                "net_salary": float(p.net_salary),
+                "status": p.get_status_name(),
+                "payment_date": p.payment_date,
+                "payment_method": p.payment_method
+            })
     
     return {
         "filters": {
@@ -379,19 +292,27 @@ async def get_detailed_payroll_report(
             "start_date": start_date,
             "end_date": end_date
         },
-        "total_employees": len(payrolls),
+        "total_employees": summary["count"],
         "summary": {
-            "total_gross_salary": float(total_gross),
-            "total_deductions": float(total_deductions),
-            "total_net_salary": float(total_net)
+            "total_gross_salary": float(summary["gross"]),
+            "total_deductions": float(summary["deductions"]),
+            "total_net_salary": float(summary["net"])
+        },
+        "by_frequency": {
+            freq: {"count": totals["count"], "gross": float(totals["gross"]), "net": float(totals["net"])}
+            for freq, totals in summary["by_frequency"].items()
         },
-        "by_frequency": by_frequency,
-        "by_status": by_status,
+        "by_status": {
+            status: {"count": totals["count"], "amount": float(totals["amount"])}
+            for status, totals in summary["by_status"].items()
+        },
+        "pagination": {"skip": skip, "limit": limit, "total": summary["count"]},
         "records": detailed_records
     }
 
 
 @router.get("/tax-report")
+@cached_report("payroll", "users")
 async def get_tax_report(
     month: int = Query(None, ge=1, le=12),
     year: int = Query(...),
@@ -444,7 +365,37 @@ async def get_tax_report(
     }
 
 
+@router.get("/tax-report/export")
+async def export_tax_report(
+    year: int = Query(...),
+    month: int = Query(None, ge=1, le=12),
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
+) -> Any:
+    """
+    Stream the tax report (PAYE, NSSF, NHIF) in iTax P10 column order as CSV or XLSX
+    """
+    service = ReportService(db)
+    rows = service.tax_rows(year, month)
+    filename = f"tax_report_{year}_{month:02d}" if month else f"tax_report_{year}"
+    
+    if format == "xlsx":
+        content = service.xlsx_stream(TAX_EXPORT_COLUMNS, rows, title="P10")
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        content = service.csv_stream(TAX_EXPORT_COLUMNS, rows)
+        media_type = "text/csv"
+    
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}.{format}"}
+    )
+
+
 @router.get("/p9-report")
+@cached_report("payroll", "users")
 async def get_p9_report(
     year: int = Query(...),
     employee_id: int = Query(None),
@@ -453,57 +404,69 @@ async def get_p9_report(
 ) -> Any:
     """
     Get P9 Tax Deduction Card report (annual tax report for Kenya)
+    Use /p9-report/export for large years; it streams the same cards
     """
-    query = db.query(Payroll).filter(Payroll.year == year)
-    
-    if employee_id:
-        query = query.filter(Payroll.employee_id == employee_id)
-    
-    payrolls = query.all()
-    
-    # Group by employee
-    employee_data = {}
-    for p in payrolls:
-        if p.employee_id not in employee_data:
-            employee_data[p.employee_id] = {
-                "employee_id": p.employee_id,
-                "employee_name": p.employee.name if p.employee else None,
-                "employee_number": p.employee.employee_id if p.employee else None,
-                "kra_pin": p.employee.kra_pin if p.employee else None,
-                "nssf_no": p.employee.nssf_no if p.employee else None,
-                "nhif_no": p.employee.nhif_no if p.employee else None,
-                "monthly_data": [],
-                "totals": {
-                    "gross_salary": 0,
-                    "nssf": 0,
-                    "nhif": 0,
-                    "paye": 0,
-                    "net_salary": 0
-                }
-            }
-        
-        employee_data[p.employee_id]["monthly_data"].append({
-            "month": p.month,
-            "gross_salary": float(p.gross_salary),
-            "nssf": float(p.nssf),
-            "nhif": float(p.nhif),
-            "paye": float(p.paye),
-            "net_salary": float(p.net_salary)
-        })
-        
-        employee_data[p.employee_id]["totals"]["gross_salary"] += float(p.gross_salary)
-        employee_data[p.employee_id]["totals"]["nssf"] += float(p.nssf)
-        employee_data[p.employee_id]["totals"]["nhif"] += float(p.nhif)
-        employee_data[p.employee_id]["totals"]["paye"] += float(p.paye)
-        employee_data[p.employee_id]["totals"]["net_salary"] += float(p.net_salary)
-    
     return {
         "year": year,
-        "employees": list(employee_data.values())
+        "employees": list(ReportService(db).p9_cards(year, employee_id))
     }
 
 
+@router.get("/p9-report/export")
+async def export_p9_report(
+    year: int = Query(...),
+    employee_id: int = Query(None),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
+) -> Any:
+    """
+    Stream P9 Tax Deduction Cards one employee at a time as NDJSON or CSV
+    Memory use does not grow with headcount
+    """
+    service = ReportService(db)
+    cards = service.p9_cards(year, employee_id)
+    
+    if format == "csv":
+        content = service.p9_csv(cards)
+        media_type = "text/csv"
+    else:
+        content = service.p9_ndjson(cards)
+        media_type = "application/x-ndjson"
+    
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=p9_{year}.{format}"}
+    )
+
+
+@router.get("/parquet/{table}")
+async def export_parquet(
+    table: str,
+    since: datetime = Query(None, description="Only rows updated after this time"),
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
+) -> Any:
+    """
+    Download payroll, payments, attendance or leaves as a Parquet file for BI tools
+    Pass `since` for an incremental extract of rows updated after that time
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown export table, expected one of: {', '.join(EXPORT_TABLES)}"
+        )
+    
+    return StreamingResponse(
+        ParquetExporter(db).stream(table, since),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f"attachment; filename={table}.parquet"}
+    )
+
+
 @router.get("/leave-detailed")
+@cached_report("leaves", "users")
 async def get_detailed_leave_report(
     year: int = Query(None),
     employee_id: int = Query(None),
@@ -518,7 +481,7 @@ async def get_detailed_leave_report(
     query = db.query(Leave)
     
     if year:
-        query = query.filter(extract('year', Leave.start_date) == year)
+        query = query.filter(Leave.start_date >= date(year, 1, 1), Leave.start_date < date(year + 1, 1, 1))
     
     if employee_id:
         query = query.filter(Leave.employee_id == employee_id)
@@ -574,6 +537,7 @@ async def get_detailed_leave_report(
 
 
 @router.get("/payment-report")
+@cached_report("payments", "users")
 async def get_payment_report(
     start_date: date = Query(None),
     end_date: date = Query(None),
@@ -582,119 +546,21 @@ async def get_payment_report(
     payment_method: str = Query(None),
     status: int = Query(None),
     group_by: str = Query("none", pattern="^(none|day|week|month|year|employee|type|method)$"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
     db: Session = Depends(deps.get_db),
     current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
 ) -> Any:
     """
     Get comprehensive payment report with flexible grouping options
     Supports grouping by day, week, month, year, employee, type, or method
+    Summary, breakdowns and grouping come from one GROUPING SETS query; records are paginated
     """
-    from collections import defaultdict
-    from datetime import timedelta
-    
-    query = db.query(Payment)
-    
-    if start_date:
-        query = query.filter(Payment.payment_date >= start_date)
-    
-    if end_date:
-        query = query.filter(Payment.payment_date <= end_date)
-    
-    if employee_id:
-        query = query.filter(Payment.employee_id == employee_id)
-    
-    if payment_type:
-        query = query.filter(Payment.payment_type == payment_type)
-    
-    if payment_method:
-        query = query.filter(Payment.payment_method == payment_method)
-    
-    if status:
-        query = query.filter(Payment.status == status)
-    
-    payments = query.order_by(Payment.payment_date.desc()).all()
-    
-    # Individual payment records
-    payment_records = []
-    for p in payments:
-        payment_records.append({
-            "id": p.id,
-            "employee_id": p.employee_id,
-            "employee_name": p.employee.name if p.employee else None,
-            "amount": float(p.amount),
-            "payment_date": p.payment_date,
-            "payment_type": p.payment_type,
-            "payment_method": p.payment_method,
-            "reference_number": p.reference_number,
-            "status": p.get_status_name(),
-            "description": p.description if hasattr(p, 'description') else None
-        })
-    
-    total_amount = sum([p.amount for p in payments])
-    
-    # Calculate grouped data based on group_by parameter
-    grouped_data = defaultdict(lambda: {"count": 0, "amount": 0, "employees": set()})
-    
-    for p in payments:
-        if group_by == "day":
-            key = p.payment_date.strftime("%Y-%m-%d") if p.payment_date else "Unknown"
-        elif group_by == "week":
-            if p.payment_date:
-                week_start = p.payment_date - timedelta(days=p.payment_date.weekday())
-                key = f"Week of {week_start.strftime('%Y-%m-%d')}"
-            else:
-                key = "Unknown"
-        elif group_by == "month":
-            key = p.payment_date.strftime("%B %Y") if p.payment_date else "Unknown"
-        elif group_by == "year":
-            key = str(p.payment_date.year) if p.payment_date else "Unknown"
-        elif group_by == "employee":
-            key = p.employee.name if p.employee else f"Employee #{p.employee_id}"
-        elif group_by == "type":
-            key = p.payment_type or "Unknown"
-        elif group_by == "method":
-            key = p.payment_method or "Unknown"
-        else:
-            key = "all"
-        
-        grouped_data[key]["count"] += 1
-        grouped_data[key]["amount"] += float(p.amount)
-        grouped_data[key]["employees"].add(p.employee_id)
-    
-    # Convert sets to counts for JSON serialization
-    grouped_summary = []
-    for key, data in grouped_data.items():
-        grouped_summary.append({
-            "group": key,
-            "count": data["count"],
-            "amount": data["amount"],
-            "unique_employees": len(data["employees"])
-        })
+    clauses = ReportService.payment_clauses(
+        start_date, end_date, employee_id, payment_type, payment_method, status
+    )
     
-    # Sort grouped summary
-    if group_by in ["day", "week", "month", "year"]:
-        grouped_summary.sort(key=lambda x: x["group"], reverse=True)
-    else:
-        grouped_summary.sort(key=lambda x: x["amount"], reverse=True)
-    
-    # Calculate by status
-    by_status = defaultdict(lambda: {"count": 0, "amount": 0})
-    for p in payments:
-        status_name = p.get_status_name()
-        by_status[status_name]["count"] += 1
-        by_status[status_name]["amount"] += float(p.amount)
-    
-    # Calculate by type
-    by_type = defaultdict(lambda: {"count": 0, "amount": 0})
-    for p in payments:
-        by_type[p.payment_type or "Unknown"]["count"] += 1
-        by_type[p.payment_type or "Unknown"]["amount"] += float(p.amount)
-    
-    # Calculate by method
-    by_method = defaultdict(lambda: {"count": 0, "amount": 0})
-    for p in payments:
-        by_method[p.payment_method or "Unknown"]["count"] += 1
-        by_method[p.payment_method or "Unknown"]["amount"] += float(p.amount)
+    report = ReportService(db).payment_report(clauses, group_by, skip, limit)
     
     return {
         "filters": {
@@ -706,14 +572,90 @@ async def get_payment_report(
             "status": status,
             "group_by": group_by
         },
-        "summary": {
-            "total_payments": len(payments),
-            "total_amount": float(total_amount),
-            "unique_employees": len(set(p.employee_id for p in payments))
-        },
-        "by_status": dict(by_status),
-        "by_type": dict(by_type),
-        "by_method": dict(by_method),
-        "grouped": grouped_summary if group_by != "none" else None,
-        "records": payment_records
-    }
\ No newline at end of file
+        "summary": report["summary"],
+        "by_status": report["by_status"],
+        "by_type": report["by_type"],
+        "by_method": report["by_method"],
+        "grouped": report["grouped"],
+        "pagination": {"skip": skip, "limit": limit, "total": report["summary"]["total_payments"]},
+        "records": report["records"]
+    }
+
+
+@router.post("/jobs", response_model=ReportJobResponse, status_code=202)
+async def create_report_job(
+    job_in: ReportJobCreate,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
+) -> Any:
+    """
+    Queue a heavy report (payment-report, p9-report, employee-detailed, tax-report)
+    It is rendered by a background process; poll GET /reports/jobs/{id} and download
+    the result from GET /reports/jobs/{id}/download once completed
+    """
+    job = ReportJobService(db).create(job_in.model_dump(), created_by=current_user["id"])
+    job.status_name = job.get_status_name()
+    
+    return job
+
+
+@router.get("/jobs", response_model=ReportJobList)
+async def get_report_jobs(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    status: int = Query(None, ge=1, le=5),
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
+) -> Any:
+    """
+    Get the current user's report jobs, newest first
+    """
+    query = db.query(ReportJob).filter(ReportJob.created_by == current_user["id"])
+    
+    if status:
+        query = query.filter(ReportJob.status == status)
+    
+    total = query.count()
+    jobs = query.order_by(ReportJob.id.desc()).offset(skip).limit(limit).all()
+    
+    for job in jobs:
+        job.status_name = job.get_status_name()
+    
+    return {
+        "total": total,
+        "items": jobs
+    }
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
+) -> Any:
+    """
+    Get report job status and progress
+    """
+    job = ReportJobService(db).get(job_id, created_by=current_user["id"])
+    job.status_name = job.get_status_name()
+    return job
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: int,
+    db: Session = Depends(deps.get_db),
+    current_user: dict = Depends(deps.get_current_user_with_permission("reports:read"))
+) -> Any:
+    """
+    Download a completed report job's file
+    """
+    service = ReportJobService(db)
+    job = service.get(job_id, created_by=current_user["id"])
+    path = service.artifact(job)
+    
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[job.format],
+        filename=path.name
+    )
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from app.api import deps
 from app.models.salary_structure import SalaryStructure
 from app.schemas.salary_structure import SalaryStructureCreate, SalaryStructureUpdate, SalaryStructureResponse, SalaryStructureList
+from app.services.payroll_service import PayrollService
 
 router = APIRouter()
 
@@ -103,6 +104,7 @@ async def create_salary_structure(
     
     structure = SalaryStructure(**structure_data)
     db.add(structure)
+    PayrollService(db).mark_dirty([structure.employee_id])
     db.commit()
     db.refresh(structure)
     
@@ -128,9 +130,12 @@ async def update_salary_structure(
         raise HTTPException(status_code=404, detail="Salary structure not found")
     
     update_data = structure_in.dict(exclude_unset=True)
+    previous_employee_id = structure.employee_id
     for field, value in update_data.items():
         setattr(structure, field, value)
     
+    # Draft payrolls built from this structure are now stale
+    PayrollService(db).mark_dirty({previous_employee_id, structure.employee_id})
     db.commit()
     db.refresh(structure)
     
@@ -155,6 +160,7 @@ async def delete_salary_structure(
         raise HTTPException(status_code=404, detail="Salary structure not found")
     
     db.delete(structure)
+    PayrollService(db).mark_dirty([structure.employee_id])
     db.commit()
     
     return {"success": True, "message": "Salary structure deleted successfully"}
@@ -176,6 +182,7 @@ async def deactivate_salary_structure(
     structure.is_active = False
     structure.effective_to = effective_to
     
+    PayrollService(db).mark_dirty([structure.employee_id])
     db.commit()
     db.refresh(structure)
     
@@ -54,6 +54,44 @@ class Settings(BaseSettings):
     # Debug settings
     DEBUG: bool = False
 
+    # Background payroll runs
+    PAYROLL_RUN_WORKER_ENABLED: bool = True
+    PAYROLL_RUN_POLL_SECONDS: float = 2.0
+    PAYROLL_RUN_STALE_SECONDS: int = 60  # Runs without a heartbeat for this long are taken over; owners beat every third of it
+
+    # Attendance-based pay
+    STANDARD_HOURS_PER_DAY: float = 8.0  # Hours above this per day count as overtime
+    WORKING_DAYS_PER_WEEK: int = 5  # Monday onwards
+    OVERTIME_MULTIPLIER: float = 1.5
+
+    # Yearly payroll/payments partitions created ahead of time (PostgreSQL)
+    PARTITION_YEARS_AHEAD: int = 1
+
+    # Report result cache (Redis, in-process LRU without it)
+    REPORT_CACHE_ENABLED: bool = True
+    REPORT_CACHE_TTL: int = 3600
+    REPORT_CACHE_LOCAL_TTL: int = 60  # Other processes' writes are not seen without Redis
+    REPORT_CACHE_LOCAL_SIZE: int = 256
+    DASHBOARD_CACHE_TTL: int = 60  # /dashboard/stats, cached per role
+    DASHBOARD_STREAM_PING_SECONDS: int = 15  # Keep-alive comment on idle /dashboard/stream connections
+
+    # Parquet exports for BI (python -m app.services.parquet_export)
+    EXPORT_DIR: str = "exports"
+    EXPORT_BATCH_SIZE: int = 50000  # Rows per Parquet row group
+
+    # Background report jobs (process pool)
+    REPORT_JOB_WORKER_ENABLED: bool = True
+    REPORT_JOB_WORKERS: int = 2
+    REPORT_JOB_POLL_SECONDS: float = 2.0
+    REPORT_JOB_STALE_SECONDS: int = 600
+    REPORT_JOB_DIR: str = "report_jobs"
+    REPORT_JOB_TTL_SECONDS: int = 86400  # Artifacts are deleted after a day
+
+    # Payslip PDFs
+    PAYSLIP_PDF_WORKERS: int = 0  # Rendering processes; 0 = one per CPU core
+    PAYSLIP_PDF_BATCH_SIZE: int = 50  # Payslips per pool task in bulk downloads
+    PAYSLIP_ARCHIVE_DIR: str = "payslip_archive"  # PDFs of paid payslips, stored once by content hash
+
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
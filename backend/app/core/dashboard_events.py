@@ -0,0 +1,178 @@
+"""
+Dashboard events - live counter updates for /dashboard/stream (Server-Sent Events)
+Write paths queue counter deltas on their session; they are published once the
+transaction commits and dropped on rollback. Events reach the streams of this process
+directly, and those of every other API worker through Redis pub/sub when Redis is
+available.
+
+Counters: active_today, pending_leaves, unread_notifications (deltas), monthly_payroll (value)
+"""
+
+from typing import Optional, Dict, Any, List, Set
+import asyncio
+import json
+import logging
+import threading
+import uuid
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "dashboard_events"
+
+# Events buffered per stream; a stream that falls further behind is told to resync
+QUEUE_SIZE = 100
+
+
+class Subscription:
+    """One open stream: events for everyone plus those addressed to its user"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, user_id: Optional[int]):
+        self.loop = loop
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[List[Dict[str, Any]]]" = asyncio.Queue(QUEUE_SIZE)
+
+    def offer(self, events: List[Dict[str, Any]]):
+        """Called on the subscription's event loop"""
+        try:
+            self.queue.put_nowait(events)
+        except asyncio.QueueFull:
+            # Slow client: replace the backlog with a resync request
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait([{"counter": "*", "resync": True}])
+
+
+class DashboardBroadcaster:
+    def __init__(self):
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        # Tags events this process published, so the Redis echo is not delivered twice
+        self._origin = uuid.uuid4().hex
+        self._listener: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def subscribe(self, user_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), user_id)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        self._start_listener()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def deliver(self, events: List[Dict[str, Any]]):
+        """
+        Hand events to every local stream they are addressed to; safe from any thread
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+
+        for subscription in subscriptions:
+            selected = [
+                e for e in events
+                if e.get("user_id") is None or e["user_id"] == subscription.user_id
+            ]
+            if selected:
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.offer, selected)
+                except RuntimeError:
+                    # Event loop already closed
+                    self.unsubscribe(subscription)
+
+    def publish(self, events: List[Dict[str, Any]]):
+        """
+        Deliver events locally and fan them out to other workers through Redis
+        """
+        if not events:
+            return
+
+        self.deliver(events)
+
+        try:
+            client = RedisClient.get_client()
+            if client is not None:
+                client.publish(CHANNEL, json.dumps({"origin": self._origin, "events": events}))
+        except Exception as e:
+            logger.warning(f"Redis operation failed: {e}")
+
+    def _start_listener(self):
+        if self._listener and self._listener.is_alive():
+            return
+        if RedisClient.get_client() is None:
+            return
+        self._stop.clear()
+        self._listener = threading.Thread(target=self._listen, name="dashboard-events", daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        """Relay events published by other workers to local streams"""
+        while not self._stop.is_set():
+            client = RedisClient.get_client()
+            if client is None:
+                return
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(CHANNEL)
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if not message:
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload.get("origin") != self._origin:
+                        self.deliver(payload["events"])
+            except Exception as e:
+                logger.warning(f"Dashboard event subscription failed: {e}")
+                self._stop.wait(5)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+    def stop(self):
+        self._stop.set()
+        if self._listener:
+            self._listener.join(2)
+
+
+broadcaster = DashboardBroadcaster()
+
+
+# Write paths: events are queued on the session and published after commit
+
+_EVENTS_KEY = "dashboard_events"
+
+
+def queue_delta(db: Session, counter: str, delta: float, user_id: Optional[int] = None):
+    """
+    Publish `counter` += `delta` once the current transaction commits
+    With `user_id`, only that user's streams receive it
+    """
+    if delta:
+        db.info.setdefault(_EVENTS_KEY, []).append({"counter": counter, "delta": delta, "user_id": user_id})
+
+
+def queue_value(db: Session, counter: str, value: float):
+    """
+    Publish the new value of `counter` once the current transaction commits
+    """
+    db.info.setdefault(_EVENTS_KEY, []).append({"counter": counter, "value": value, "user_id": None})
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session):
+    events = session.info.pop(_EVENTS_KEY, None)
+    if events:
+        broadcaster.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_EVENTS_KEY, None)
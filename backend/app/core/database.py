@@ -23,6 +23,31 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+# Payroll and rollup writes rely on INSERT ... ON CONFLICT, which these dialects support
+UPSERT_DIALECTS = ("postgresql", "sqlite")
+
+
+def check_dialect(bind=engine):
+    """
+    Fail fast (at startup) on a database the payroll writes cannot run on
+    """
+    if bind.dialect.name not in UPSERT_DIALECTS:
+        raise RuntimeError(
+            f"Unsupported database '{bind.dialect.name}': payroll requires one of {', '.join(UPSERT_DIALECTS)}"
+        )
+
+
+def dialect_insert(bind=engine):
+    """
+    insert() construct of the database's dialect, with on_conflict_do_nothing/do_update
+    """
+    check_dialect(bind)
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
 
 def get_db():
     """
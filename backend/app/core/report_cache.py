@@ -0,0 +1,253 @@
+"""
+Report cache - versioned result cache for read-heavy report endpoints
+Entries are keyed on endpoint path, normalized query params and the data version of every
+table the report reads. Versions are bumped after any commit that wrote to a table, so a
+stale entry is never served; it simply stops being looked up. Entries live in Redis when
+available and in a small in-process LRU otherwise (with a short TTL, since versions
+bumped by other processes cannot be seen without Redis).
+
+ETags are the cache key when versions come from Redis. Local versions are neither shared
+between workers nor kept across restarts, so without Redis the ETag is a digest of the
+response body instead.
+"""
+
+from typing import Optional, Dict, List, Iterable, Tuple
+from collections import OrderedDict
+from datetime import date
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "report_cache"
+
+
+class LocalCache:
+    """Thread-safe LRU with per-entry expiry"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_local_entries = LocalCache(settings.REPORT_CACHE_LOCAL_SIZE)
+_local_versions: Dict[str, int] = {}
+_local_versions_lock = threading.Lock()
+
+# Versions seen only by this process (Redis unavailable)
+LOCAL_VERSION_PREFIX = "local-"
+
+
+def _version_key(table: str) -> str:
+    return f"{KEY_PREFIX}:version:{table}"
+
+
+def get_versions(tables: Iterable[str]) -> Dict[str, str]:
+    """
+    Current data version of each table
+    """
+    tables = sorted(set(tables))
+    try:
+        client = RedisClient.get_client()
+        if client is not None:
+            values = client.mget([_version_key(table) for table in tables])
+            return {table: value or "0" for table, value in zip(tables, values)}
+    except Exception as e:
+        logger.warning(f"Redis operation failed: {e}")
+
+    with _local_versions_lock:
+        return {table: f"{LOCAL_VERSION_PREFIX}{_local_versions.get(table, 0)}" for table in tables}
+
+
+def bump_versions(tables: Iterable[str]):
+    """
+    Move the given tables to a new data version, invalidating every report that reads them
+    """
+    tables = sorted(set(tables))
+    if not tables:
+        return
+
+    with _local_versions_lock:
+        for table in tables:
+            _local_versions[table] = _local_versions.get(table, 0) + 1
+
+    try:
+        client = RedisClient.get_client()
+        if client is not None:
+            pipe = client.pipeline(transaction=False)
+            for table in tables:
+                pipe.incr(_version_key(table))
+            pipe.execute()
+    except Exception as e:
+        logger.warning(f"Redis operation failed: {e}")
+
+
+def cache_get(key: str) -> Optional[str]:
+    try:
+        client = RedisClient.get_client()
+        if client is not None:
+            return client.get(f"{KEY_PREFIX}:entry:{key}")
+    except Exception as e:
+        logger.warning(f"Redis operation failed: {e}")
+    return _local_entries.get(key)
+
+
+def cache_set(key: str, value: str, ttl: Optional[int] = None):
+    try:
+        client = RedisClient.get_client()
+        if client is not None:
+            client.setex(f"{KEY_PREFIX}:entry:{key}", ttl or settings.REPORT_CACHE_TTL, value)
+            return
+    except Exception as e:
+        logger.warning(f"Redis operation failed: {e}")
+    _local_entries.set(key, value, min(ttl or settings.REPORT_CACHE_TTL, settings.REPORT_CACHE_LOCAL_TTL))
+
+
+def cache_key(path: str, params: List[Tuple[str, str]], versions: Dict[str, str], scope: str = "") -> str:
+    """
+    Stable digest of an endpoint, its normalized query params and the data versions it depends on
+    """
+    payload = json.dumps({
+        "path": path.rstrip("/"),
+        "params": sorted(params),
+        "versions": versions,
+        "scope": scope,
+        # Reports that default to "today" or the current month change with the date
+        "day": date.today().isoformat()
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# Write tracking: tables written in a transaction are bumped once it commits
+
+_TABLES_KEY = "report_cache_tables"
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    tables = session.info.setdefault(_TABLES_KEY, set())
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(instance, "__tablename__", None)
+        if table:
+            tables.add(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            orm_execute_state.session.info.setdefault(_TABLES_KEY, set()).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session):
+    tables = session.info.pop(_TABLES_KEY, None)
+    if tables:
+        bump_versions(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_TABLES_KEY, None)
+
+
+def cached_report(*tables: str, ttl: Optional[int] = None, per_user: bool = False, per_role: bool = False):
+    """
+    Cache a JSON report endpoint on its path, query params and the data versions of `tables`
+    Responses carry an ETag; a matching If-None-Match is answered with 304, before the
+    report is computed when versions are shared through Redis. Non-JSON responses
+    (streams) pass through uncached. With `per_user`, entries are not shared between
+    users; with `per_role`, only between users of the same role.
+    """
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        takes_request = "request" in signature.parameters
+
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            request: Request = kwargs["request"] if takes_request else kwargs.pop("request")
+
+            if not settings.REPORT_CACHE_ENABLED:
+                return await endpoint(*args, **kwargs)
+
+            scope = ""
+            if per_user:
+                scope = str((kwargs.get("current_user") or {}).get("id", ""))
+            elif per_role:
+                scope = f"role:{(kwargs.get('current_user') or {}).get('role', '')}"
+
+            versions = get_versions(tables)
+            key = cache_key(request.url.path, list(request.query_params.multi_items()), versions, scope)
+            if_none_match = [
+                tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")
+            ]
+
+            # Shared versions identify the data, so the key can answer before any work is done
+            shared = not any(version.startswith(LOCAL_VERSION_PREFIX) for version in versions.values())
+            if shared:
+                etag = f'"{key[:32]}"'
+                if etag in if_none_match:
+                    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+            body = cache_get(key)
+            if body is None:
+                result = await endpoint(*args, **kwargs)
+                if isinstance(result, Response):
+                    return result
+                body = json.dumps(jsonable_encoder(result))
+                cache_set(key, body, ttl)
+
+            if not shared:
+                etag = f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+            headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+            if etag in if_none_match:
+                return Response(status_code=304, headers=headers)
+
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        if not takes_request:
+            wrapper.__signature__ = signature.replace(parameters=[
+                *signature.parameters.values(),
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            ])
+        return wrapper
+
+    return decorator
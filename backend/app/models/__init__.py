@@ -10,11 +10,14 @@ from app.models.employee_department import EmployeeDepartment
 from app.models.attendance import Attendance
 from app.models.leave import Leave
 from app.models.payroll import Payroll
+from app.models.payroll_run import PayrollRun
+from app.models.payroll_rollup import PayrollPeriodRollup
+from app.models.report_job import ReportJob
 from app.models.role import Role
 from app.models.activity_log import ActivityLog
 from app.models.leave_config import LeaveConfig
 from app.models.salary_structure import SalaryStructure
-from app.models.payment import Payment
+from app.models.payment import Payment, PaymentReference
 from app.models.user_settings import UserSettings
 from app.models.notification import Notification
 
@@ -27,11 +30,15 @@ __all__ = [
     "Attendance",
     "Leave",
     "Payroll",
+    "PayrollRun",
+    "PayrollPeriodRollup",
+    "ReportJob",
     "Role",
     "ActivityLog",
     "LeaveConfig",
     "SalaryStructure",
     "Payment",
+    "PaymentReference",
     "UserSettings",
     "Notification"
 ]
\ No newline at end of file
@@ -2,7 +2,7 @@
 Attendance model - SQLAlchemy ORM model
 """
 
-from sqlalchemy import Column, Integer, String, Date, Time, DateTime, SmallInteger, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Date, Time, DateTime, SmallInteger, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -22,6 +22,11 @@ class Attendance(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # One employee's attendance over a date range (reports, payroll aggregation)
+    __table_args__ = (
+        Index("ix_attendance_employee_id_date", "employee_id", "date"),
+    )
+
     # Relationships
     employee = relationship("User", back_populates="attendance_records")
 
@@ -2,7 +2,7 @@
 Leave model - SQLAlchemy ORM model
 """
 
-from sqlalchemy import Column, Integer, String, Date, Text, SmallInteger, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Date, Text, SmallInteger, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -25,20 +25,27 @@ class Leave(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # Per-employee and per-status lookups over a date range (reports, leave balance)
+    __table_args__ = (
+        Index("ix_leaves_employee_id_start_date", "employee_id", "start_date"),
+        Index("ix_leaves_status_start_date", "status", "start_date"),
+    )
+
     # Relationships
     employee = relationship("User", foreign_keys=[employee_id], back_populates="leave_requests")
     approver = relationship("User", foreign_keys=[approved_by])
 
+    LEAVE_TYPE_NAMES = {
+        1: "Sick Leave",
+        2: "Casual Leave",
+        3: "Annual Leave",
+        4: "Maternity Leave",
+        5: "Paternity Leave",
+        6: "Unpaid Leave"
+    }
+
     def get_leave_type_name(self) -> str:
-        leave_types = {
-            1: "Sick Leave",
-            2: "Casual Leave",
-            3: "Annual Leave",
-            4: "Maternity Leave",
-            5: "Paternity Leave",
-            6: "Unpaid Leave"
-        }
-        return leave_types.get(self.leave_type, "Unknown")
+        return self.LEAVE_TYPE_NAMES.get(self.leave_type, "Unknown")
 
     def get_status_name(self) -> str:
         status_names = {
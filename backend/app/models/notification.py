@@ -7,6 +7,7 @@ from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
+from app.core.dashboard_events import queue_delta
 
 
 class Notification(Base):
@@ -54,6 +55,7 @@ class Notification(Base):
             action_text=action_text
         )
         db.add(notification)
+        queue_delta(db, "unread_notifications", 1, user_id=user_id)
         db.commit()
         db.refresh(notification)
         return notification
@@ -14,11 +14,12 @@ class Payment(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    payroll_id = Column(Integer, ForeignKey("payroll.id"), nullable=True, index=True)
+    # Not a foreign key: payroll is partitioned by year and its key is (id, year)
+    payroll_id = Column(Integer, nullable=True, index=True)
     
     # Payment details
     amount = Column(Numeric(10, 2), nullable=False)
-    payment_date = Column(Date, nullable=False, index=True)
+    payment_date = Column(Date, nullable=False, index=True)  # Partition key (by year) on PostgreSQL
     payment_type = Column(String(50), nullable=False)  # salary, bonus, advance, reimbursement
     payment_method = Column(String(50), nullable=False)  # bank_transfer, cash, cheque, mobile_money
     
@@ -46,18 +47,19 @@ class Payment(Base):
 
     # Relationships
     employee = relationship("User", foreign_keys=[employee_id])
-    payroll = relationship("Payroll")
+    payroll = relationship("Payroll", primaryjoin="foreign(Payment.payroll_id) == Payroll.id")
     processor = relationship("User", foreign_keys=[processed_by])
 
+    STATUS_NAMES = {
+        1: "Pending",
+        2: "Completed",
+        3: "Failed",
+        4: "Cancelled"
+    }
+
     def get_status_name(self) -> str:
         """Get human-readable status name"""
-        status_names = {
-            1: "Pending",
-            2: "Completed",
-            3: "Failed",
-            4: "Cancelled"
-        }
-        return status_names.get(self.status, "Unknown")
+        return self.STATUS_NAMES.get(self.status, "Unknown")
 
     def mark_completed(self):
         """Mark payment as completed"""
@@ -76,3 +78,17 @@ class Payment(Base):
     @property
     def is_completed(self) -> bool:
         return self.status == 2
+
+
+class PaymentReference(Base):
+    """
+    Reference numbers of all payments, unique across years
+    On PostgreSQL payments is partitioned by payment_date and its unique keys must include
+    it, so payments.reference_number alone cannot be unique there; this unpartitioned
+    table keeps it unique. Written with the payment (see the payments endpoints)
+    """
+    __tablename__ = "payment_references"
+
+    reference_number = Column(String(100), primary_key=True)
+    payment_id = Column(Integer, nullable=False, index=True)
+    payment_date = Column(Date, nullable=False)
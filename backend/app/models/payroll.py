@@ -3,13 +3,28 @@ Payroll model - SQLAlchemy ORM model
 Supports daily, weekly, bi-weekly, monthly, and yearly payment frequencies
 """
 
-from sqlalchemy import Column, Integer, String, Numeric, Date, SmallInteger, ForeignKey, DateTime, func, Text
+from sqlalchemy import Column, Integer, String, Numeric, Date, SmallInteger, ForeignKey, DateTime, func, Text, Boolean, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from decimal import Decimal
+from datetime import date
 
 from app.core.database import Base
 
 
+def iso_weeks(year: int) -> int:
+    """Number of ISO weeks in a year, 52 or 53 (December 28th is always in the last one)"""
+    return date(year, 12, 28).isocalendar()[1]
+
+
+def iso_week_start(year: int, week_number: int) -> date:
+    """
+    Monday of an ISO week; raises ValueError for a week the year does not have
+    """
+    if not 1 <= week_number <= iso_weeks(year):
+        raise ValueError(f"Week {week_number} does not exist in {year}, which has {iso_weeks(year)} ISO weeks")
+    return date.fromisocalendar(year, week_number, 1)
+
+
 class Payroll(Base):
     __tablename__ = "payroll"
 
@@ -22,6 +37,7 @@ class Payroll(Base):
     week_number = Column(Integer, nullable=True)  # 1-52 (for weekly payroll)
     pay_period_start = Column(Date, nullable=True)  # Start date of pay period
     pay_period_end = Column(Date, nullable=True)  # End date of pay period
+    period_start = Column(Date, nullable=True)  # Normalized period key, see normalize_period_start
     
     # Payment frequency: daily, weekly, bi-weekly, monthly, yearly
     payment_frequency = Column(String(20), default="monthly", nullable=False)
@@ -58,10 +74,12 @@ class Payroll(Base):
     
     # Status and payment
     status = Column(SmallInteger, default=1)  # 1: Draft, 2: Processed, 3: Paid, 4: Cancelled
+    needs_recalculation = Column(Boolean, default=False, index=True)  # Inputs changed since the draft was calculated
     payment_date = Column(Date, nullable=True)
     payment_method = Column(String(50), nullable=True)  # Bank Transfer, Cash, Cheque
     payment_reference = Column(String(100), nullable=True)
     notes = Column(Text, nullable=True)
+    payslip_sha256 = Column(String(64), nullable=True)  # Archived PDF of the paid payslip, see payslip_archive
     
     # Audit fields
     created_by = Column(Integer, nullable=True)
@@ -70,9 +88,48 @@ class Payroll(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    # One payroll per employee, frequency and period. On PostgreSQL the table is
+    # range-partitioned by year (migration add_yearly_partitions), so every unique
+    # key includes year and the database primary key is (id, year)
+    __table_args__ = (
+        UniqueConstraint("employee_id", "payment_frequency", "year", "period_start", name="uq_payroll_employee_period"),
+        # Whole-period scans (rollup refresh, period filters)
+        Index("ix_payroll_period", "year", "payment_frequency", "period_start"),
+    )
+
     # Relationships
     employee = relationship("User", back_populates="payroll_records")
 
+    STATUS_NAMES = {
+        1: "Draft",
+        2: "Processed",
+        3: "Paid",
+        4: "Cancelled"
+    }
+
+    @staticmethod
+    def normalize_period_start(
+        payment_frequency: str,
+        year: int,
+        month: int = None,
+        week_number: int = None,
+        pay_period_start: date = None
+    ) -> date:
+        """
+        First day of the pay period, used as the unique period key:
+        month start for monthly, ISO week Monday for weekly/bi-weekly,
+        pay_period_start for daily and January 1st for yearly
+        """
+        if payment_frequency == "monthly" and month:
+            return date(year, month, 1)
+        if payment_frequency in ["weekly", "bi-weekly"] and week_number:
+            return iso_week_start(year, week_number)
+        if payment_frequency == "yearly":
+            return date(year, 1, 1)
+        if pay_period_start:
+            return pay_period_start
+        return date(year, month or 1, 1)
+
     # Frequency multipliers for converting between different pay periods
     FREQUENCY_DAYS = {
         "daily": 1,
@@ -83,33 +140,10 @@ class Payroll(Base):
     }
 
     def calculate_totals(self):
-        """Calculate gross, total deductions, and net salary"""
-        base_salary = Decimal(str(self.basic_salary or 0))
-        
-        # For daily/hourly workers, calculate based on days/hours worked
-        if self.payment_frequency == "daily" and self.days_worked and self.daily_rate:
-            base_salary = Decimal(str(self.daily_rate)) * Decimal(str(self.days_worked))
-        elif self.hours_worked and self.hourly_rate:
-            base_salary = Decimal(str(self.hourly_rate)) * Decimal(str(self.hours_worked))
+        """Calculate gross, total deductions, and net salary (integer cents arithmetic)"""
+        from app.services.payroll_calculator import PayrollCalculator
         
-        self.gross_salary = (
-            base_salary +
-            Decimal(str(self.house_allowance or 0)) +
-            Decimal(str(self.transport_allowance or 0)) +
-            Decimal(str(self.medical_allowance or 0)) +
-            Decimal(str(self.other_allowances or 0)) +
-            Decimal(str(self.overtime_amount or 0))
-        )
-        
-        self.total_deductions = (
-            Decimal(str(self.nssf or 0)) +
-            Decimal(str(self.nhif or 0)) +
-            Decimal(str(self.paye or 0)) +
-            Decimal(str(self.loan_deduction or 0)) +
-            Decimal(str(self.other_deductions or 0))
-        )
-        
-        self.net_salary = self.gross_salary - self.total_deductions
+        PayrollCalculator.calculate_payroll(self)
 
     def calculate_prorated_salary(self, monthly_salary: float, target_frequency: str = None) -> float:
         """
@@ -159,13 +193,7 @@ class Payroll(Base):
             return f"{months[self.month or 1]} {self.year}"
 
     def get_status_name(self) -> str:
-        status_names = {
-            1: "Draft",
-            2: "Processed",
-            3: "Paid",
-            4: "Cancelled"
-        }
-        return status_names.get(self.status, "Unknown")
+        return self.STATUS_NAMES.get(self.status, "Unknown")
 
     def get_frequency_name(self) -> str:
         frequency_names = {
@@ -0,0 +1,44 @@
+"""
+Payroll period rollup model - SQLAlchemy ORM model for pre-aggregated payroll totals
+One row per pay period, frequency, status and primary department, kept in step with
+the payroll table by app.services.payroll_rollup in the same transaction as each write
+"""
+
+from sqlalchemy import Column, Integer, String, Numeric, Date, SmallInteger, DateTime, UniqueConstraint, Index, func
+
+from app.core.database import Base
+
+
+class PayrollPeriodRollup(Base):
+    __tablename__ = "payroll_period_rollup"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Period (same semantics as Payroll; 0 when month/week is not set)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False, default=0)
+    week_number = Column(Integer, nullable=False, default=0)
+    period_start = Column(Date, nullable=False)  # Payroll.period_start key
+    payment_frequency = Column(String(20), nullable=False)
+
+    status = Column(SmallInteger, nullable=False)  # Payroll status
+    department_id = Column(Integer, nullable=False, default=0)  # Primary department, 0 for none
+
+    # Totals
+    payroll_count = Column(Integer, nullable=False, default=0)
+    gross_salary = Column(Numeric(15, 2), nullable=False, default=0)
+    total_deductions = Column(Numeric(15, 2), nullable=False, default=0)
+    net_salary = Column(Numeric(15, 2), nullable=False, default=0)
+    paye = Column(Numeric(15, 2), nullable=False, default=0)
+    nssf = Column(Numeric(15, 2), nullable=False, default=0)
+    nhif = Column(Numeric(15, 2), nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint(
+            "year", "payment_frequency", "period_start", "month", "week_number", "status", "department_id",
+            name="uq_payroll_period_rollup"
+        ),
+        Index("ix_payroll_period_rollup_year_month", "year", "month"),
+    )
@@ -0,0 +1,89 @@
+"""
+Payroll Run model - SQLAlchemy ORM model for background company-wide payroll runs
+A run is executed in chunks by the payroll run worker and checkpointed after each chunk
+"""
+
+from sqlalchemy import Column, Integer, String, Date, DateTime, SmallInteger, Boolean, JSON, func
+
+from app.core.database import Base
+
+
+class PayrollRun(Base):
+    __tablename__ = "payroll_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Period fields (same semantics as Payroll)
+    payment_frequency = Column(String(20), default="monthly", nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=True)
+    week_number = Column(Integer, nullable=True)
+    pay_period_start = Column(Date, nullable=True)
+    pay_period_end = Column(Date, nullable=True)
+
+    # Scope: ordered snapshot of employee ids taken when the run is queued
+    employee_ids = Column(JSON, nullable=False, default=[])
+
+    # Optional follow-up transitions applied to each chunk after creation
+    auto_process = Column(Boolean, default=False)
+    auto_pay = Column(Boolean, default=False)
+    payment_method = Column(String(50), nullable=True)
+    payment_reference = Column(String(100), nullable=True)
+
+    # Status: 1: Queued, 2: Running, 3: Completed, 4: Failed, 5: Cancelled
+    status = Column(SmallInteger, default=1, index=True)
+    chunk_size = Column(Integer, default=500)
+
+    # Checkpoint: number of employees from employee_ids already handled
+    cursor = Column(Integer, default=0)
+    total_employees = Column(Integer, default=0)
+    created_count = Column(Integer, default=0)
+    skipped_count = Column(Integer, default=0)  # Payroll already existed for the period
+    error_count = Column(Integer, default=0)
+    errors = Column(JSON, nullable=True)
+    error_message = Column(String(500), nullable=True)
+
+    # Worker bookkeeping
+    worker_id = Column(String(100), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Audit fields
+    created_by = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def get_status_name(self) -> str:
+        status_names = {
+            1: "Queued",
+            2: "Running",
+            3: "Completed",
+            4: "Failed",
+            5: "Cancelled"
+        }
+        return status_names.get(self.status, "Unknown")
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (3, 4, 5)
+
+    @property
+    def progress(self) -> float:
+        """Percentage of employees handled so far"""
+        if not self.total_employees:
+            return 100.0 if self.status == 3 else 0.0
+        return round((self.cursor or 0) * 100 / self.total_employees, 1)
+
+    @property
+    def throughput(self) -> float:
+        """Employees handled per second since the run started"""
+        if not self.started_at or not self.cursor:
+            return 0.0
+        end = self.finished_at or self.heartbeat_at
+        if not end:
+            return 0.0
+        elapsed = (end - self.started_at).total_seconds()
+        if elapsed <= 0:
+            return 0.0
+        return round(self.cursor / elapsed, 1)
@@ -0,0 +1,66 @@
+"""
+Report Job model - SQLAlchemy ORM model for reports rendered in the background
+A job is rendered by the report job worker's process pool into a file kept for a limited time
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, SmallInteger, JSON, func
+
+from app.core.database import Base
+
+
+class ReportJob(Base):
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # What to render: payment-report, p9-report, employee-detailed, tax-report
+    report_type = Column(String(50), nullable=False)
+    params = Column(JSON, nullable=False, default={})
+    format = Column(String(10), nullable=False, default="json")
+
+    # Status: 1: Queued, 2: Running, 3: Completed, 4: Failed, 5: Expired
+    status = Column(SmallInteger, default=1, index=True)
+    STATUS_NAMES = {
+        1: "Queued",
+        2: "Running",
+        3: "Completed",
+        4: "Failed",
+        5: "Expired"
+    }
+
+    # Progress in report-specific units (employees, payments)
+    processed = Column(Integer, default=0)
+    total = Column(Integer, nullable=True)
+    error_message = Column(String(500), nullable=True)
+
+    # Artifact, relative to REPORT_JOB_DIR
+    artifact_path = Column(String(255), nullable=True)
+    artifact_size = Column(BigInteger, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Worker bookkeeping
+    worker_id = Column(String(100), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Audit fields
+    created_by = Column(Integer, nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def get_status_name(self) -> str:
+        return self.STATUS_NAMES.get(self.status, "Unknown")
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (3, 4, 5)
+
+    @property
+    def progress(self) -> float:
+        """Percentage of the report rendered so far"""
+        if self.status == 3:
+            return 100.0
+        if not self.total:
+            return 0.0
+        return round(min(self.processed or 0, self.total) * 100 / self.total, 1)
@@ -3,7 +3,7 @@ Payroll schemas for request/response validation
 Supports daily, weekly, bi-weekly, monthly, and yearly payment frequencies
 """
 
-from typing import Optional, Literal
+from typing import Optional, Literal, Any
 from datetime import date, datetime
 from decimal import Decimal
 from pydantic import BaseModel, Field, model_validator
@@ -86,6 +86,42 @@ class PayrollProcess(BaseModel):
     payment_reference: Optional[str] = None
 
 
+class PayrollBatchFilter(BaseModel):
+    """Selects payroll rows for a batch transition, by id list and/or period filter"""
+    ids: Optional[list[int]] = Field(None, description="Payroll record ids")
+    year: Optional[int] = Field(None, ge=2020, le=2100)
+    month: Optional[int] = Field(None, ge=1, le=12)
+    week_number: Optional[int] = Field(None, ge=1, le=53)
+    payment_frequency: Optional[PaymentFrequency] = None
+    department_id: Optional[int] = None
+
+    @model_validator(mode='after')
+    def validate_selection(self):
+        """Refuse to transition the whole table by accident"""
+        if self.ids is None and not self.year:
+            raise ValueError("Either ids or year is required")
+        return self
+
+
+class PayrollBatchPay(PayrollBatchFilter):
+    payment_method: Optional[str] = None
+    payment_reference: Optional[str] = None
+
+
+class PayrollBatchResult(BaseModel):
+    transitioned_count: int
+    transitioned: list[int]
+    skipped_count: int
+    skipped: list[dict]
+
+
+class PayrollRecomputeResult(BaseModel):
+    recomputed_count: int
+    recomputed: list[int]
+    skipped_count: int
+    skipped: list[dict]
+
+
 class PayrollResponse(BaseModel):
     id: int
     employee_id: int
@@ -116,6 +152,7 @@ class PayrollResponse(BaseModel):
     daily_rate: Optional[Decimal] = Decimal(0)
     hourly_rate: Optional[Decimal] = Decimal(0)
     status: int
+    needs_recalculation: Optional[bool] = False
     payment_date: Optional[date] = None
     payment_method: Optional[str] = None
     payment_reference: Optional[str] = None
@@ -144,3 +181,60 @@ class PayrollSummary(BaseModel):
     total_deductions: Decimal
     total_net: Decimal
     by_status: dict
+
+
+# Salary structure components a simulation may adjust
+SalaryComponent = Literal[
+    "basic_salary", "house_allowance", "transport_allowance", "medical_allowance", "other_allowances"
+]
+
+
+class PayrollSimulationAdjustment(BaseModel):
+    """A hypothetical change applied to every matching salary structure"""
+    designation_id: Optional[int] = None
+    department_id: Optional[int] = None
+    employee_ids: Optional[list[int]] = None
+    payment_frequency: Optional[PaymentFrequency] = Field(
+        None, description="Only structures paid at this frequency"
+    )
+    components: list[SalaryComponent] = Field(["basic_salary"], min_length=1)
+    percent: Decimal = Field(Decimal(0), ge=-100, le=1000, description="Percentage change, e.g. 7 for a 7% raise")
+    amount: Decimal = Field(Decimal(0), description="Fixed monthly change added after the percentage")
+
+
+class PayrollSimulationRequest(BaseModel):
+    payment_frequency: PaymentFrequency = Field("monthly", description="Pay period the amounts are expressed in")
+    year: int = Field(..., ge=2020, le=2100)
+    month: Optional[int] = Field(None, ge=1, le=12)
+    week_number: Optional[int] = Field(None, ge=1, le=53)
+    pay_period_start: Optional[date] = None
+    department_id: Optional[int] = Field(None, description="Limit the simulation to one department")
+    adjustments: list[PayrollSimulationAdjustment] = Field(..., min_length=1)
+
+
+class PayrollSimulationAmounts(BaseModel):
+    gross_salary: Decimal
+    nssf: Decimal
+    nhif: Decimal
+    paye: Decimal
+    total_deductions: Decimal
+    net_salary: Decimal
+
+
+class PayrollSimulationGroup(BaseModel):
+    key: Optional[Any] = None
+    name: Optional[str] = None
+    employees: int
+    affected: int
+    baseline: PayrollSimulationAmounts
+    simulated: PayrollSimulationAmounts
+    delta: PayrollSimulationAmounts
+
+
+class PayrollSimulationResult(BaseModel):
+    """Baseline vs simulated payroll cost; nothing is written"""
+    payment_frequency: str
+    totals: PayrollSimulationGroup
+    by_department: list[PayrollSimulationGroup]
+    by_designation: list[PayrollSimulationGroup]
+    by_frequency: list[PayrollSimulationGroup]
@@ -0,0 +1,77 @@
+"""
+Payroll run schemas for request/response validation
+"""
+
+from typing import Optional, Any
+from datetime import date, datetime
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.payroll import PaymentFrequency
+
+
+class PayrollRunCreate(BaseModel):
+    payment_frequency: PaymentFrequency = Field("monthly", description="Payment frequency")
+    year: int = Field(..., ge=2020, le=2100)
+    month: Optional[int] = Field(None, ge=1, le=12)
+    week_number: Optional[int] = Field(None, ge=1, le=53)
+    pay_period_start: Optional[date] = None
+    pay_period_end: Optional[date] = None
+    employee_ids: Optional[list[int]] = Field(
+        None, description="Employees to include; defaults to every active employee with an active salary structure"
+    )
+    auto_process: bool = Field(False, description="Mark created rows as processed")
+    auto_pay: bool = Field(False, description="Mark processed rows as paid (implies auto_process)")
+    payment_method: Optional[str] = None
+    payment_reference: Optional[str] = None
+    chunk_size: int = Field(500, ge=50, le=5000)
+
+    @model_validator(mode='after')
+    def validate_period_fields(self):
+        """Validate that appropriate period fields are set based on frequency"""
+        freq = self.payment_frequency
+
+        if freq == "monthly" and not self.month:
+            raise ValueError("month is required for monthly payroll")
+        if freq in ["weekly", "bi-weekly"] and not self.week_number:
+            raise ValueError("week_number is required for weekly/bi-weekly payroll")
+        if freq == "daily" and not self.pay_period_start:
+            raise ValueError("pay_period_start is required for daily payroll")
+
+        return self
+
+
+class PayrollRunResponse(BaseModel):
+    id: int
+    payment_frequency: str
+    year: int
+    month: Optional[int] = None
+    week_number: Optional[int] = None
+    pay_period_start: Optional[date] = None
+    pay_period_end: Optional[date] = None
+    auto_process: bool
+    auto_pay: bool
+    status: int
+    status_name: str
+    chunk_size: int
+    cursor: int
+    total_employees: int
+    created_count: int
+    skipped_count: Optional[int] = 0
+    error_count: int
+    progress: float
+    throughput: float
+    errors: Optional[list[Any]] = None
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PayrollRunList(BaseModel):
+    total: int
+    items: list[PayrollRunResponse]
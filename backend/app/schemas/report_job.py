@@ -0,0 +1,78 @@
+"""
+Report job schemas for request/response validation
+"""
+
+from typing import Optional, Any, Literal
+from datetime import date, datetime
+from pydantic import BaseModel, Field, model_validator
+
+
+ReportType = Literal["payment-report", "p9-report", "employee-detailed", "tax-report"]
+
+# Formats each report can be rendered to; the first is the default
+REPORT_FORMATS = {
+    "payment-report": ("json",),
+    "p9-report": ("ndjson", "csv"),
+    "employee-detailed": ("json",),
+    "tax-report": ("csv", "xlsx")
+}
+
+
+class ReportJobParams(BaseModel):
+    """Same filters as the synchronous report endpoints"""
+    year: Optional[int] = Field(None, ge=2000, le=2100)
+    month: Optional[int] = Field(None, ge=1, le=12)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    employee_id: Optional[int] = None
+    payment_type: Optional[str] = None
+    payment_method: Optional[str] = None
+    status: Optional[int] = None
+    group_by: str = Field("none", pattern="^(none|day|week|month|year|employee|type|method)$")
+
+
+class ReportJobCreate(BaseModel):
+    report_type: ReportType
+    params: ReportJobParams = Field(default_factory=ReportJobParams)
+    format: Optional[str] = Field(None, description="Defaults to the report's first supported format")
+
+    @model_validator(mode='after')
+    def validate_report(self):
+        """Validate the format and the parameters each report requires"""
+        formats = REPORT_FORMATS[self.report_type]
+        if self.format is None:
+            self.format = formats[0]
+        elif self.format not in formats:
+            raise ValueError(f"{self.report_type} can be rendered as: {', '.join(formats)}")
+
+        if self.report_type in ("p9-report", "tax-report") and not self.params.year:
+            raise ValueError(f"year is required for {self.report_type}")
+
+        return self
+
+
+class ReportJobResponse(BaseModel):
+    id: int
+    report_type: str
+    params: dict[str, Any]
+    format: str
+    status: int
+    status_name: str
+    processed: int
+    total: Optional[int] = None
+    progress: float
+    error_message: Optional[str] = None
+    artifact_size: Optional[int] = None
+    expires_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_by: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ReportJobList(BaseModel):
+    total: int
+    items: list[ReportJobResponse]
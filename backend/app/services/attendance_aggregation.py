@@ -0,0 +1,140 @@
+"""
+Attendance aggregation - per employee, per pay period attendance totals computed in SQL
+One GROUP BY over the attendance table yields status counts, hours between clock-in and
+clock-out, and overtime above the standard day; payroll consumes the totals directly.
+"""
+
+from typing import Optional, Dict, Iterable, Tuple
+from datetime import date, timedelta
+import calendar
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, case, and_
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.types import Float
+
+from app.core.config import settings
+from app.models.attendance import Attendance
+from app.models.payroll import iso_week_start
+
+# Attendance statuses
+PRESENT, ABSENT, LATE, HALF_DAY, LEAVE = 1, 2, 3, 4, 5
+
+SECONDS_PER_HOUR = 3600
+
+
+class seconds_between(FunctionElement):
+    """Seconds from one TIME column to another, compiled per dialect"""
+    type = Float()
+    inherit_cache = True
+    name = "seconds_between"
+
+
+@compiles(seconds_between)
+def _seconds_between_default(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "((julianday(%s) - julianday(%s)) * 86400.0)" % (compiler.process(end, **kw), compiler.process(start, **kw))
+
+
+@compiles(seconds_between, "postgresql")
+def _seconds_between_postgresql(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "EXTRACT(EPOCH FROM (%s - %s))" % (compiler.process(end, **kw), compiler.process(start, **kw))
+
+
+@compiles(seconds_between, "mysql")
+def _seconds_between_mysql(element, compiler, **kw):
+    start, end = list(element.clauses)
+    return "TIME_TO_SEC(TIMEDIFF(%s, %s))" % (compiler.process(end, **kw), compiler.process(start, **kw))
+
+
+def period_range(
+    payment_frequency: str,
+    year: int,
+    month: Optional[int] = None,
+    week_number: Optional[int] = None,
+    pay_period_start: Optional[date] = None,
+    pay_period_end: Optional[date] = None
+) -> Tuple[date, date]:
+    """
+    First and last calendar day of a pay period
+    """
+    if pay_period_start:
+        return pay_period_start, pay_period_end or pay_period_start
+    if payment_frequency in ["weekly", "bi-weekly"] and week_number:
+        start = iso_week_start(year, week_number)
+        return start, start + timedelta(days=13 if payment_frequency == "bi-weekly" else 6)
+    if payment_frequency == "yearly":
+        return date(year, 1, 1), date(year, 12, 31)
+    month = month or 1
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def working_days(start: date, end: date) -> int:
+    """
+    Scheduled working days in an inclusive date range
+    """
+    days = max(1, min(7, settings.WORKING_DAYS_PER_WEEK))
+    weekmask = [1] * days + [0] * (7 - days)
+    return int(np.busday_count(start, end + timedelta(days=1), weekmask=weekmask))
+
+
+class AttendanceAggregator:
+    # Employee ids per IN (...) list
+    CHUNK_SIZE = 10000
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def aggregate(self, employee_ids: Iterable[int], start: date, end: date) -> Dict[int, Dict[str, float]]:
+        """
+        Attendance totals per employee for an inclusive date range
+        Returns {employee_id: {present, late, half_day, absent, leave, days_worked,
+        hours_worked, overtime_hours}}; employees without attendance are absent from the result
+        """
+        standard_seconds = settings.STANDARD_HOURS_PER_DAY * SECONDS_PER_HOUR
+        clocked = and_(
+            Attendance.clock_in.isnot(None),
+            Attendance.clock_out.isnot(None),
+            Attendance.clock_out > Attendance.clock_in
+        )
+        seconds = seconds_between(Attendance.clock_in, Attendance.clock_out)
+
+        ids = list(set(employee_ids))
+        totals = {}
+
+        for i in range(0, len(ids), self.CHUNK_SIZE):
+            stmt = select(
+                Attendance.employee_id,
+                func.count().filter(Attendance.status == PRESENT).label("present"),
+                func.count().filter(Attendance.status == LATE).label("late"),
+                func.count().filter(Attendance.status == HALF_DAY).label("half_day"),
+                func.count().filter(Attendance.status == ABSENT).label("absent"),
+                func.count().filter(Attendance.status == LEAVE).label("leave"),
+                func.coalesce(func.sum(case((clocked, seconds), else_=0)), 0).label("seconds"),
+                func.coalesce(func.sum(case(
+                    (and_(clocked, seconds > standard_seconds), seconds - standard_seconds),
+                    else_=0
+                )), 0).label("overtime_seconds")
+            ).where(
+                Attendance.employee_id.in_(ids[i:i + self.CHUNK_SIZE]),
+                Attendance.date >= start,
+                Attendance.date <= end
+            ).group_by(Attendance.employee_id)
+
+            for row in self.db.execute(stmt):
+                totals[row.employee_id] = {
+                    "present": row.present,
+                    "late": row.late,
+                    "half_day": row.half_day,
+                    "absent": row.absent,
+                    "leave": row.leave,
+                    # Two half days make a full day
+                    "days_worked": row.present + row.late + row.half_day // 2,
+                    "hours_worked": round(float(row.seconds) / SECONDS_PER_HOUR, 2),
+                    "overtime_hours": round(float(row.overtime_seconds) / SECONDS_PER_HOUR, 2)
+                }
+
+        return totals
@@ -0,0 +1,168 @@
+"""
+Dashboard service - landing page statistics in a handful of aggregate queries
+"""
+
+from typing import Dict, Any, List
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, true
+
+from app.models.user import User
+from app.models.attendance import Attendance
+from app.models.leave import Leave
+from app.models.department import Department
+from app.models.employee_department import EmployeeDepartment
+from app.models.notification import Notification
+from app.services.payroll_rollup import PayrollRollupService
+
+
+class DashboardService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def counters(self) -> Dict[str, int]:
+        """
+        Headcount, today's attendance and pending leaves in one statement
+        Each single-row aggregate is a derived table; cross joined they give one row
+        """
+        employees = select(
+            func.count().label("total_employees")
+        ).where(User.deletion_status == 0).subquery()
+
+        attendance = select(
+            func.count().label("active_today")
+        ).where(Attendance.date == date.today()).subquery()
+
+        leaves = select(
+            func.count().label("pending_leaves")
+        ).where(Leave.status == 1).subquery()
+
+        row = self.db.execute(
+            select(employees, attendance, leaves).select_from(employees).join(attendance, true()).join(leaves, true())
+        ).one()
+
+        return dict(row._mapping)
+
+    def live_counters(self, user_id: int) -> Dict[str, Any]:
+        """
+        Values of the counters /dashboard/stream keeps up to date
+        """
+        now = datetime.now()
+        monthly_net = PayrollRollupService(self.db).monthly_net([(now.year, now.month)])
+
+        return {
+            **self.counters(),
+            "monthly_payroll": float(monthly_net[(now.year, now.month)]),
+            "unread_notifications": self.db.scalar(
+                select(func.count()).select_from(Notification).where(
+                    Notification.user_id == user_id,
+                    Notification.is_read == False
+                )
+            )
+        }
+
+    def department_headcount(self) -> List[Dict[str, Any]]:
+        """
+        Employees per non-deleted department, departments without employees left out
+        """
+        rows = self.db.execute(
+            select(
+                Department.department,
+                func.count(EmployeeDepartment.employee_id.distinct())
+            ).join(
+                EmployeeDepartment, EmployeeDepartment.department_id == Department.id
+            ).where(
+                Department.deletion_status == 0
+            ).group_by(Department.id, Department.department).order_by(Department.id)
+        ).all()
+
+        return [{"name": name, "count": count} for name, count in rows]
+
+    def recent_employees(self, limit: int = 5) -> List[Any]:
+        return self.db.execute(
+            select(User.id, User.name, User.created_at).where(
+                User.deletion_status == 0
+            ).order_by(User.created_at.desc()).limit(limit)
+        ).all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Dashboard statistics: counters, 6-month payroll trend and department distribution
+        """
+        counters = self.counters()
+
+        # Net payroll per month for the trend, this month and last month from the rollup in one query
+        now = datetime.now()
+        last_month = (now.replace(day=1) - timedelta(days=1))
+        trend_dates = [now - timedelta(days=i*30) for i in range(5, -1, -1)]
+        net_by_month = PayrollRollupService(self.db).monthly_net(list({
+            (d.year, d.month) for d in trend_dates + [now, last_month]
+        }))
+
+        total_monthly_payroll = float(net_by_month[(now.year, now.month)])
+        last_month_total = float(net_by_month[(last_month.year, last_month.month)])
+
+        payroll_trend_percent = 0
+        if last_month_total > 0:
+            payroll_trend_percent = round(((total_monthly_payroll - last_month_total) / last_month_total) * 100, 1)
+
+        payroll_trend = [
+            {
+                "month": target_date.strftime("%B"),
+                "amount": float(net_by_month[(target_date.year, target_date.month)])
+            }
+            for target_date in trend_dates
+        ]
+
+        dept_distribution = self.department_headcount()
+
+        # Format for frontend
+        payroll_chart_data = {
+            "labels": [item["month"] for item in payroll_trend],
+            "datasets": [{
+                "label": "Net Payroll",
+                "data": [item["amount"] for item in payroll_trend],
+                "borderColor": "rgb(59, 130, 246)",
+                "backgroundColor": "rgba(59, 130, 246, 0.1)",
+                "tension": 0.4
+            }]
+        }
+
+        department_chart_data = {
+            "labels": [item["name"] for item in dept_distribution],
+            "datasets": [{
+                "data": [item["count"] for item in dept_distribution],
+                "backgroundColor": [
+                    'rgba(59, 130, 246, 0.8)',
+                    'rgba(5, 150, 105, 0.8)',
+                    'rgba(217, 119, 6, 0.8)',
+                    'rgba(100, 116, 139, 0.8)',
+                    'rgba(220, 38, 38, 0.8)'
+                ]
+            }]
+        }
+
+        recent_activity = [
+            {
+                "id": emp.id,
+                "description": f"New employee {emp.name} joined",
+                "type": "success",
+                "timestamp": emp.created_at.isoformat()
+            }
+            for emp in self.recent_employees()
+        ]
+
+        return {
+            "total_employees": counters["total_employees"],
+            "employees_trend": 5.2,
+            "active_today": counters["active_today"],
+            "active_trend": 2.1,
+            "pending_leaves": counters["pending_leaves"],
+            "leaves_trend": 0,
+            "monthly_payroll": total_monthly_payroll,
+            "payroll_trend": payroll_trend_percent,
+            "payroll_chart": payroll_chart_data,
+            "department_chart": department_chart_data,
+            "recent_activity": recent_activity
+        }
@@ -0,0 +1,192 @@
+"""
+Parquet export - columnar snapshots of payroll, payments, attendance and leaves for BI
+Rows are read through a server-side cursor and written one Parquet row group per batch,
+with decimal/date/timestamp logical types taken from the model columns. Incremental
+exports only include rows whose updated_at moved past the previous export's watermark;
+deleted rows are not captured, so run a full export periodically.
+
+    python -m app.services.parquet_export export [--tables payroll payments] [--full] [--out exports]
+"""
+
+from typing import Optional, Dict, Any, List, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import logging
+import tempfile
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, types
+
+from app.core.config import settings
+from app.models.payroll import Payroll
+from app.models.payment import Payment
+from app.models.attendance import Attendance
+from app.models.leave import Leave
+from app.services.report_service import FILE_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+EXPORT_TABLES = {
+    "payroll": Payroll,
+    "payments": Payment,
+    "attendance": Attendance,
+    "leaves": Leave
+}
+
+# Last exported updated_at per table, kept next to the files
+STATE_FILE = "_export_state.json"
+
+
+def arrow_type(column_type: types.TypeEngine):
+    """
+    Arrow logical type for a SQLAlchemy column type
+    """
+    import pyarrow as pa
+
+    if isinstance(column_type, types.Numeric) and not isinstance(column_type, types.Float):
+        return pa.decimal128(column_type.precision or 18, column_type.scale or 0)
+    if isinstance(column_type, types.Float):
+        return pa.float64()
+    if isinstance(column_type, types.SmallInteger):
+        return pa.int16()
+    if isinstance(column_type, types.Integer):
+        return pa.int64()
+    if isinstance(column_type, types.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, types.DateTime):
+        return pa.timestamp("us", tz="UTC") if column_type.timezone else pa.timestamp("us")
+    if isinstance(column_type, types.Date):
+        return pa.date32()
+    if isinstance(column_type, types.Time):
+        return pa.time64("us")
+    return pa.string()
+
+
+def arrow_schema(model: Any):
+    import pyarrow as pa
+
+    return pa.schema([
+        pa.field(column.name, arrow_type(column.type), nullable=column.nullable or column.primary_key)
+        for column in model.__table__.columns
+    ])
+
+
+class ParquetExporter:
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+
+    def watermark(self, table: str) -> Optional[datetime]:
+        """Latest updated_at in a table"""
+        return self.db.scalar(select(func.max(EXPORT_TABLES[table].updated_at)))
+
+    def write(
+        self,
+        table: str,
+        destination: Any,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> int:
+        """
+        Write rows of `table` with since < updated_at <= until to a Parquet file
+        `destination` is a path or a writable binary file. Returns the number of rows written
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        model = EXPORT_TABLES[table]
+        schema = arrow_schema(model)
+        columns = list(model.__table__.columns)
+
+        stmt = select(*columns)
+        if since is not None:
+            stmt = stmt.where(model.updated_at > since)
+        if until is not None:
+            stmt = stmt.where(model.updated_at <= until)
+        stmt = stmt.order_by(model.updated_at, model.id).execution_options(yield_per=self.batch_size)
+
+        rows_written = 0
+        with pq.ParquetWriter(destination, schema, compression="zstd") as writer:
+            # One row group per fetched batch; only the current batch is in memory
+            for rows in self.db.execute(stmt).partitions():
+                batch = pa.RecordBatch.from_arrays(
+                    [pa.array([row[i] for row in rows], type=field.type) for i, field in enumerate(schema)],
+                    schema=schema
+                )
+                writer.write_batch(batch)
+                rows_written += len(rows)
+
+        return rows_written
+
+    def stream(self, table: str, since: Optional[datetime] = None) -> Iterator[bytes]:
+        """
+        Write a table to a temporary Parquet file and stream it
+        The footer is written last, so the file must be complete before it can be sent
+        """
+        with tempfile.TemporaryFile() as spool:
+            self.write(table, spool, since, self.watermark(table))
+            spool.seek(0)
+            while chunk := spool.read(FILE_CHUNK_SIZE):
+                yield chunk
+
+    def export(self, tables: Optional[List[str]] = None, out_dir: Optional[str] = None, full: bool = False) -> List[Dict[str, Any]]:
+        """
+        Export each table to <out_dir>/<table>/<table>_<full|incremental>_<timestamp>.parquet
+        Incremental exports start from the watermark recorded by the previous export
+        """
+        out = Path(out_dir or settings.EXPORT_DIR)
+        out.mkdir(parents=True, exist_ok=True)
+        state_path = out / STATE_FILE
+        state = json.loads(state_path.read_text()) if state_path.exists() else {}
+
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        results = []
+
+        for table in tables or list(EXPORT_TABLES):
+            since = None if full or table not in state else datetime.fromisoformat(state[table])
+            # Fixed upper bound, so rows updated while exporting go to the next run
+            until = self.watermark(table)
+
+            if until is None or (since is not None and until <= since):
+                results.append({"table": table, "rows": 0, "path": None, "since": since, "until": since})
+                continue
+
+            path = out / table / f"{table}_{'full' if since is None else 'incremental'}_{stamp}.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            rows = self.write(table, str(path), since, until)
+
+            state[table] = until.isoformat()
+            state_path.write_text(json.dumps(state, indent=2))
+            logger.info(f"Exported {rows} {table} rows to {path}")
+            results.append({"table": table, "rows": rows, "path": str(path), "since": since, "until": until})
+
+        return results
+
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Export payroll facts to Parquet")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write Parquet files for BI")
+    export_parser.add_argument("--tables", nargs="+", choices=sorted(EXPORT_TABLES), default=None)
+    export_parser.add_argument("--full", action="store_true", help="Ignore the previous watermark")
+    export_parser.add_argument("--out", default=None, help=f"Output directory (default {settings.EXPORT_DIR})")
+    export_parser.add_argument("--batch-size", type=int, default=None, help="Rows per row group")
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "export":
+            for result in ParquetExporter(db, args.batch_size).export(args.tables, args.out, args.full):
+                print(f"{result['table']}\t{result['rows']}\t{result['path'] or '-'}")
+    finally:
+        db.close()
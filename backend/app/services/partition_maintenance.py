@@ -0,0 +1,176 @@
+"""
+Partition maintenance - yearly range partitions for payroll and payments (PostgreSQL)
+The tables are converted by the add_yearly_partitions migration. This module keeps
+partitions ahead of the calendar and detaches old years for archiving.
+
+    python -m app.services.partition_maintenance list
+    python -m app.services.partition_maintenance ensure [--years-ahead 1]
+    python -m app.services.partition_maintenance detach payroll 2019 [--archive-schema archive]
+"""
+
+from typing import Optional, Dict, List
+from datetime import date
+import argparse
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine, Connection
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column and whether the key is a date or a year number
+PARTITIONED_TABLES = {
+    "payroll": {"column": "year", "type": "year"},
+    "payments": {"column": "payment_date", "type": "date"}
+}
+
+
+def partition_name(table: str, year: int) -> str:
+    return f"{table}_y{year}"
+
+
+def _bounds(table: str, year: int) -> str:
+    if PARTITIONED_TABLES[table]["type"] == "date":
+        return f"FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+    return f"FROM ({year}) TO ({year + 1})"
+
+
+def _year_filter(table: str, year: int) -> str:
+    column = PARTITIONED_TABLES[table]["column"]
+    if PARTITIONED_TABLES[table]["type"] == "date":
+        return f"{column} >= '{year}-01-01' AND {column} < '{year + 1}-01-01'"
+    return f"{column} = {year}"
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    """True if `table` is a partitioned table (always False off PostgreSQL)"""
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :table AND c.relnamespace = 'public'::regnamespace"
+    ), {"table": table}).scalar())
+
+
+def list_partitions(conn: Connection, table: str) -> Dict[str, str]:
+    """Attached partitions of `table` with their bounds"""
+    rows = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table AND p.relnamespace = 'public'::regnamespace ORDER BY c.relname"
+    ), {"table": table})
+    return dict(rows.all())
+
+
+def create_year_partition(conn: Connection, table: str, year: int) -> bool:
+    """
+    Create the partition of `table` for one year if it is missing
+    Rows for that year already sitting in the default partition are moved into it
+    Returns True if a partition was created
+    """
+    name = partition_name(table, year)
+    if name in list_partitions(conn, table):
+        return False
+
+    default = f"{table}_default"
+    has_default = default in list_partitions(conn, table)
+    moving = has_default and conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {_year_filter(table, year)})")
+    ).scalar()
+
+    if moving:
+        # A new partition cannot overlap rows held by the default partition
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+
+    conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {_bounds(table, year)}"))
+
+    if moving:
+        conn.execute(text(f"INSERT INTO {table} SELECT * FROM {default} WHERE {_year_filter(table, year)}"))
+        conn.execute(text(f"DELETE FROM {default} WHERE {_year_filter(table, year)}"))
+        conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+
+    logger.info(f"Created partition {name}")
+    return True
+
+
+def ensure_partitions(engine: Engine, years_ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Make sure every partitioned table has partitions from this year through
+    `years_ahead` years ahead. Does nothing when the tables are not partitioned.
+    Returns the names of the partitions created
+    """
+    years_ahead = settings.PARTITION_YEARS_AHEAD if years_ahead is None else years_ahead
+    this_year = (today or date.today()).year
+    created = []
+
+    with engine.begin() as conn:
+        for table in PARTITIONED_TABLES:
+            if not is_partitioned(conn, table):
+                continue
+            for year in range(this_year, this_year + years_ahead + 1):
+                if create_year_partition(conn, table, year):
+                    created.append(partition_name(table, year))
+
+    return created
+
+
+def detach_partition(engine: Engine, table: str, year: int, archive_schema: Optional[str] = "archive") -> str:
+    """
+    Detach one year of `table` without blocking writers (DETACH ... CONCURRENTLY) and
+    optionally move it to `archive_schema`. The detached table keeps its data and can
+    be dumped with pg_dump -t and dropped, or re-attached later.
+    """
+    if table not in PARTITIONED_TABLES:
+        raise ValueError(f"{table} is not a partitioned table")
+    if archive_schema and not re.fullmatch(r"[a-z_][a-z0-9_]*", archive_schema):
+        raise ValueError(f"Invalid schema name: {archive_schema}")
+
+    name = partition_name(table, year)
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if name not in list_partitions(conn, table):
+            raise ValueError(f"{name} is not attached to {table}")
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name} CONCURRENTLY"))
+        if archive_schema:
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+            conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+            name = f"{archive_schema}.{name}"
+
+    logger.info(f"Detached {name} from {table}")
+    return name
+
+
+if __name__ == "__main__":
+    from app.core.database import engine
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Manage yearly payroll/payments partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List attached partitions")
+    ensure_parser = commands.add_parser("ensure", help="Create missing partitions for this and coming years")
+    ensure_parser.add_argument("--years-ahead", type=int, default=None)
+    detach_parser = commands.add_parser("detach", help="Detach one year for archiving")
+    detach_parser.add_argument("table", choices=sorted(PARTITIONED_TABLES))
+    detach_parser.add_argument("year", type=int)
+    detach_parser.add_argument("--archive-schema", default="archive", help="Empty string keeps it in public")
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        with engine.connect() as conn:
+            for table in PARTITIONED_TABLES:
+                for name, bounds in list_partitions(conn, table).items():
+                    print(f"{table}\t{name}\t{bounds}")
+    elif args.command == "ensure":
+        created = ensure_partitions(engine, args.years_ahead)
+        print("\n".join(created) or "Partitions up to date")
+    elif args.command == "detach":
+        print(detach_partition(engine, args.table, args.year, args.archive_schema or None))
@@ -0,0 +1,210 @@
+"""
+Payroll calculator - fixed-point payroll arithmetic in integer cents
+Rows are held in array-backed columns (int64 cents) so gross, deductions and net are
+computed for every row at once. Single rows go through the same path as a batch of one,
+so every write path produces identical results.
+"""
+
+from typing import Optional, Dict, Any, List, Iterable, Union, Sequence
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+
+from app.services.statutory_deductions import (
+    PRORATE_FACTORS, compute_deductions, period_effective_date, period_days, to_cents
+)
+from app.services.attendance_aggregation import period_range
+
+EARNING_FIELDS = (
+    "basic_salary",
+    "house_allowance",
+    "transport_allowance",
+    "medical_allowance",
+    "other_allowances",
+    "overtime_amount"
+)
+
+DEDUCTION_FIELDS = (
+    "nssf",
+    "nhif",
+    "paye",
+    "loan_deduction",
+    "other_deductions"
+)
+
+STATUTORY_FIELDS = ("nssf", "nhif", "paye")
+
+RATE_FIELDS = ("daily_rate", "hourly_rate")
+
+TOTAL_FIELDS = ("gross_salary", "total_deductions", "net_salary")
+
+MONEY_FIELDS = EARNING_FIELDS + DEDUCTION_FIELDS + RATE_FIELDS + TOTAL_FIELDS
+
+
+def from_cents(cents: int) -> Decimal:
+    """Integer cents to a 2-place Decimal for the Numeric columns"""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def _div_round(numerator, denominator):
+    """Integer division rounding half up (works on ints and int64 arrays)"""
+    return (numerator + denominator // 2) // denominator
+
+
+class PayrollColumns:
+    """
+    Array-backed payroll rows: one int64 array of cents per money field
+    """
+    __slots__ = MONEY_FIELDS + ("size", "payment_frequency", "days_worked", "hours_worked")
+
+    def __init__(self, size: int, payment_frequency: Union[str, Sequence[str]] = "monthly"):
+        self.size = size
+        self.payment_frequency = payment_frequency
+        self.days_worked = np.zeros(size, dtype=np.int64)
+        self.hours_worked = np.zeros(size, dtype=np.int64)
+        for field in MONEY_FIELDS:
+            setattr(self, field, np.zeros(size, dtype=np.int64))
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Any], payment_frequency: Union[str, Sequence[str]] = "monthly") -> "PayrollColumns":
+        """
+        Build columns from row objects or dicts; missing fields are zero
+        """
+        columns = cls(len(rows), payment_frequency)
+        if not rows:
+            return columns
+
+        if isinstance(rows[0], dict):
+            get = dict.get
+        else:
+            get = lambda row, field: getattr(row, field, None)
+
+        for field in MONEY_FIELDS:
+            getattr(columns, field)[:] = [to_cents(get(row, field)) for row in rows]
+        columns.days_worked[:] = [get(row, "days_worked") or 0 for row in rows]
+        columns.hours_worked[:] = [to_cents(get(row, "hours_worked")) for row in rows]
+        return columns
+
+    def row(self, i: int) -> Dict[str, Decimal]:
+        """Money fields of row i as Decimals"""
+        return {field: from_cents(getattr(self, field)[i]) for field in MONEY_FIELDS}
+
+    def to_rows(self, fields: Iterable[str] = MONEY_FIELDS) -> List[Dict[str, Decimal]]:
+        """All rows as column dicts of Decimals, ready for an INSERT"""
+        fields = list(fields)
+        values = [getattr(self, field).tolist() for field in fields]
+        return [
+            {field: from_cents(column[i]) for field, column in zip(fields, values)}
+            for i in range(self.size)
+        ]
+
+
+class PayrollCalculator:
+    """
+    Gross, deductions and net in integer cents
+    """
+
+    @staticmethod
+    def prorate(monthly_cents, payment_frequency: str):
+        """Convert monthly cents (int or int64 array) to the pay period, rounding half up"""
+        numerator, denominator = PRORATE_FACTORS.get(payment_frequency, (1, 1))
+        return _div_round(monthly_cents * numerator, denominator)
+
+    @staticmethod
+    def daily_rate(monthly_basic_cents):
+        return _div_round(monthly_basic_cents, 30)
+
+    @staticmethod
+    def hourly_rate(monthly_basic_cents, hours_per_day: int = 8):
+        return _div_round(monthly_basic_cents, 30 * hours_per_day)
+
+    @staticmethod
+    def overtime_amount(hourly_rate_cents, overtime_hundredths, multiplier: float = 1.5):
+        """Overtime pay for hours (in hundredths) at a multiple of the hourly rate"""
+        return _div_round(hourly_rate_cents * overtime_hundredths * int(round(multiplier * 100)), 10000)
+
+    @staticmethod
+    def calculate_batch(
+        columns: PayrollColumns,
+        statutory_on: Optional[Union[date, Sequence[date]]] = None,
+        keep: Iterable[str] = (),
+        days: Union[int, Sequence[int]] = 1
+    ) -> PayrollColumns:
+        """
+        Calculate gross, total deductions and net for every row at once (in place)
+        When `statutory_on` is given, nssf/nhif/paye are computed from gross with the
+        tables in force on that date; fields in `keep` are left as supplied.
+        `days` is the length of daily pay periods in calendar days
+        """
+        frequency = columns.payment_frequency
+        if isinstance(frequency, str):
+            is_daily = np.full(columns.size, frequency == "daily")
+        else:
+            is_daily = np.asarray(frequency) == "daily"
+
+        daily = is_daily & (columns.days_worked > 0) & (columns.daily_rate > 0)
+        hourly = ~daily & (columns.hours_worked > 0) & (columns.hourly_rate > 0)
+
+        base = columns.basic_salary.copy()
+        base[daily] = columns.daily_rate[daily] * columns.days_worked[daily]
+        base[hourly] = _div_round(columns.hourly_rate[hourly] * columns.hours_worked[hourly], 100)
+
+        columns.gross_salary = (
+            base +
+            columns.house_allowance +
+            columns.transport_allowance +
+            columns.medical_allowance +
+            columns.other_allowances +
+            columns.overtime_amount
+        )
+
+        if statutory_on is not None:
+            deductions = compute_deductions(columns.gross_salary, statutory_on, frequency, days)
+            for field in STATUTORY_FIELDS:
+                if field not in keep:
+                    setattr(columns, field, deductions[field])
+
+        columns.total_deductions = (
+            columns.nssf +
+            columns.nhif +
+            columns.paye +
+            columns.loan_deduction +
+            columns.other_deductions
+        )
+        columns.net_salary = columns.gross_salary - columns.total_deductions
+        return columns
+
+    @classmethod
+    def calculate_payroll(cls, payroll, statutory: bool = False, keep: Iterable[str] = ()):
+        """
+        Recalculate a Payroll ORM object through the batch path (a batch of one),
+        optionally filling statutory deductions not listed in `keep`
+        """
+        payment_frequency = payroll.payment_frequency or "monthly"
+        columns = PayrollColumns.from_rows([payroll], payment_frequency)
+        statutory_on = None
+        days = 1
+        if statutory:
+            statutory_on = period_effective_date(
+                payment_frequency,
+                payroll.year,
+                payroll.month,
+                payroll.week_number,
+                payroll.pay_period_start
+            )
+            days = period_days(*period_range(
+                payment_frequency,
+                payroll.year,
+                payroll.month,
+                payroll.week_number,
+                payroll.pay_period_start,
+                payroll.pay_period_end
+            ))
+        cls.calculate_batch(columns, statutory_on, keep, days)
+
+        fields = TOTAL_FIELDS + tuple(f for f in STATUTORY_FIELDS if statutory and f not in keep)
+        for field, value in columns.row(0).items():
+            if field in fields:
+                setattr(payroll, field, value)
+        return payroll
@@ -0,0 +1,261 @@
+"""
+Payroll rollup - pre-aggregated payroll totals per pay period
+Every payroll write refreshes the rollup rows of the periods it touched inside the same
+transaction, so dashboards and summaries read O(periods) rows instead of O(payrolls).
+
+    python -m app.services.payroll_rollup rebuild [--year 2025]
+"""
+
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+from datetime import date, datetime
+from decimal import Decimal
+import argparse
+import logging
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, func, tuple_, true
+
+from app.core.dashboard_events import queue_value
+from app.core.database import dialect_insert
+from app.models.payroll import Payroll
+from app.models.payroll_rollup import PayrollPeriodRollup
+from app.models.employee_department import EmployeeDepartment
+
+logger = logging.getLogger(__name__)
+
+# (year, payment_frequency, period_start) - the payroll period key
+PeriodKey = Tuple[int, str, date]
+
+GROUP_COLUMNS = ["year", "month", "week_number", "period_start", "payment_frequency", "status", "department_id"]
+
+TOTAL_COLUMNS = ["payroll_count", "gross_salary", "total_deductions", "net_salary", "paye", "nssf", "nhif"]
+
+UNIQUE_COLUMNS = ["year", "payment_frequency", "period_start", "month", "week_number", "status", "department_id"]
+
+
+class PayrollRollupService:
+    # Period keys per IN (...) list
+    CHUNK_SIZE = 500
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def period_key(payroll: Payroll) -> PeriodKey:
+        return payroll.year, payroll.payment_frequency, payroll.period_start
+
+    @staticmethod
+    def aggregate_query(*clauses) -> Any:
+        """
+        Payroll totals grouped the way the rollup table is keyed
+        Employees are counted under their primary department (lowest id if several)
+        """
+        primary = select(
+            EmployeeDepartment.employee_id,
+            func.min(EmployeeDepartment.department_id).label("department_id")
+        ).where(EmployeeDepartment.is_primary == 1).group_by(EmployeeDepartment.employee_id).subquery()
+
+        groups = [
+            Payroll.year,
+            func.coalesce(Payroll.month, 0),
+            func.coalesce(Payroll.week_number, 0),
+            Payroll.period_start,
+            Payroll.payment_frequency,
+            func.coalesce(Payroll.status, 1),
+            func.coalesce(primary.c.department_id, 0)
+        ]
+
+        return select(
+            *groups,
+            func.count(),
+            func.coalesce(func.sum(Payroll.gross_salary), 0),
+            func.coalesce(func.sum(Payroll.total_deductions), 0),
+            func.coalesce(func.sum(Payroll.net_salary), 0),
+            func.coalesce(func.sum(Payroll.paye), 0),
+            func.coalesce(func.sum(Payroll.nssf), 0),
+            func.coalesce(func.sum(Payroll.nhif), 0)
+        ).outerjoin(
+            primary, primary.c.employee_id == Payroll.employee_id
+        ).where(
+            # Rows without a period key predate the key and were duplicates
+            Payroll.period_start.isnot(None),
+            *clauses
+        ).group_by(*groups)
+
+    def _write(self, clauses: List[Any], rollup_clauses: List[Any]) -> int:
+        """
+        Replace the rollup rows matching `rollup_clauses` with fresh totals of the
+        payroll rows matching `clauses`. Returns the number of rollup rows written
+        """
+        self.db.execute(
+            delete(PayrollPeriodRollup).where(*rollup_clauses).execution_options(synchronize_session=False)
+        )
+
+        stmt = dialect_insert(self.db.get_bind())(PayrollPeriodRollup).from_select(
+            GROUP_COLUMNS + TOTAL_COLUMNS, self.aggregate_query(*clauses)
+        )
+        # A concurrent refresh of the same period may have inserted first
+        stmt = stmt.on_conflict_do_update(
+            index_elements=UNIQUE_COLUMNS,
+            set_={**{column: stmt.excluded[column] for column in TOTAL_COLUMNS}, "updated_at": func.now()}
+        )
+        return self.db.execute(stmt).rowcount
+
+    def refresh(self, keys: Iterable[PeriodKey]) -> int:
+        """
+        Recompute the rollup of the given pay periods from the payroll table
+        Call after payroll rows are written, before committing; pending ORM changes are
+        flushed first. Does not commit; returns the number of rollup rows written
+        """
+        keys = list({key for key in keys if key[2] is not None})
+        if not keys:
+            return 0
+
+        self.db.flush()
+
+        written = 0
+        for start in range(0, len(keys), self.CHUNK_SIZE):
+            chunk = keys[start:start + self.CHUNK_SIZE]
+            written += self._write(
+                [tuple_(Payroll.year, Payroll.payment_frequency, Payroll.period_start).in_(chunk)],
+                [tuple_(
+                    PayrollPeriodRollup.year,
+                    PayrollPeriodRollup.payment_frequency,
+                    PayrollPeriodRollup.period_start
+                ).in_(chunk)]
+            )
+
+        # Live dashboards show this month's net payroll
+        now = datetime.now()
+        if any(key[2].year == now.year and key[2].month == now.month for key in keys):
+            net = self.monthly_net([(now.year, now.month)])[(now.year, now.month)]
+            queue_value(self.db, "monthly_payroll", float(net))
+
+        return written
+
+    def refresh_rows(self, clauses: List[Any]) -> int:
+        """
+        Recompute the rollup of every pay period containing a payroll row matching `clauses`
+        """
+        self.db.flush()
+        keys = self.db.execute(
+            select(Payroll.year, Payroll.payment_frequency, Payroll.period_start).where(*clauses).distinct()
+        ).all()
+        return self.refresh(tuple(key) for key in keys)
+
+    def rebuild(self, year: Optional[int] = None, commit: bool = True) -> int:
+        """
+        Recompute the whole rollup (or one year of it) from the payroll table
+        Use after bulk imports, or after employees change primary department
+        """
+        if year:
+            written = self._write([Payroll.year == year], [PayrollPeriodRollup.year == year])
+        else:
+            written = self._write([true()], [true()])
+
+        if commit:
+            self.db.commit()
+        return written
+
+    def summarize(
+        self,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        week_number: Optional[int] = None,
+        payment_frequency: Optional[str] = None,
+        department_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Same result as PayrollService.summarize for period/department filters, read from the rollup
+        """
+        clauses = []
+        if year:
+            clauses.append(PayrollPeriodRollup.year == year)
+        if month:
+            clauses.append(PayrollPeriodRollup.month == month)
+        if week_number:
+            clauses.append(PayrollPeriodRollup.week_number == week_number)
+        if payment_frequency:
+            clauses.append(PayrollPeriodRollup.payment_frequency == payment_frequency)
+        if department_id:
+            clauses.append(PayrollPeriodRollup.department_id == department_id)
+
+        rows = self.db.execute(
+            select(
+                PayrollPeriodRollup.status,
+                PayrollPeriodRollup.payment_frequency,
+                func.sum(PayrollPeriodRollup.payroll_count).label("count"),
+                func.sum(PayrollPeriodRollup.gross_salary).label("gross"),
+                func.sum(PayrollPeriodRollup.total_deductions).label("deductions"),
+                func.sum(PayrollPeriodRollup.net_salary).label("net")
+            ).where(*clauses).group_by(PayrollPeriodRollup.status, PayrollPeriodRollup.payment_frequency)
+        ).all()
+
+        summary = {"count": 0, "gross": Decimal(0), "deductions": Decimal(0), "net": Decimal(0)}
+        by_status = {}
+        by_frequency = {}
+
+        for row in rows:
+            summary["count"] += row.count
+            summary["gross"] += Decimal(row.gross)
+            summary["deductions"] += Decimal(row.deductions)
+            summary["net"] += Decimal(row.net)
+
+            status_name = Payroll.STATUS_NAMES.get(row.status, "Unknown")
+            status_totals = by_status.setdefault(status_name, {"count": 0, "amount": Decimal(0)})
+            status_totals["count"] += row.count
+            status_totals["amount"] += Decimal(row.net)
+
+            frequency_totals = by_frequency.setdefault(
+                row.payment_frequency, {"count": 0, "gross": Decimal(0), "net": Decimal(0)}
+            )
+            frequency_totals["count"] += row.count
+            frequency_totals["gross"] += Decimal(row.gross)
+            frequency_totals["net"] += Decimal(row.net)
+
+        summary["by_status"] = by_status
+        summary["by_frequency"] = by_frequency
+        return summary
+
+    def monthly_net(self, months: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Decimal]:
+        """
+        Net payroll per (year, month) for the given months, in one query
+        """
+        rows = self.db.execute(
+            select(
+                PayrollPeriodRollup.year,
+                PayrollPeriodRollup.month,
+                func.sum(PayrollPeriodRollup.net_salary)
+            ).where(
+                tuple_(PayrollPeriodRollup.year, PayrollPeriodRollup.month).in_(months)
+            ).group_by(PayrollPeriodRollup.year, PayrollPeriodRollup.month)
+        ).all()
+
+        totals = {month: Decimal(0) for month in months}
+        for year, month, net in rows:
+            totals[(year, month)] = Decimal(net or 0)
+        return totals
+
+
+if __name__ == "__main__":
+    from app.core.database import SessionLocal
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Maintain the payroll period rollup")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rebuild_parser = commands.add_parser("rebuild", help="Recompute the rollup from the payroll table")
+    rebuild_parser.add_argument("--year", type=int, default=None, help="Only rebuild one year")
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            written = PayrollRollupService(db).rebuild(args.year)
+            print(f"Rebuilt payroll rollup: {written} rows")
+    finally:
+        db.close()
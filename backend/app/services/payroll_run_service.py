@@ -0,0 +1,394 @@
+"""
+Payroll run service - queues company-wide payroll runs and executes them in the background
+Runs are processed chunk by chunk; every chunk commits its payroll rows together with the
+run checkpoint, so a restarted worker resumes from the last committed chunk. The checkpoint
+only commits while the worker still owns the run, and the owner heartbeats during long
+chunks so the run is not taken over while it is still being worked on.
+
+The worker runs as a thread inside the API process (see main.py) or standalone:
+    python -m app.services.payroll_run_service
+"""
+
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timedelta, timezone
+import logging
+import os
+import socket
+import threading
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, or_, and_
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.payroll_run import PayrollRun
+from app.models.salary_structure import SalaryStructure
+from app.models.user import User
+from app.services.payroll_service import PayrollService
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class PayrollRunService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, run_id: int) -> Optional[PayrollRun]:
+        """
+        Get payroll run by ID
+        """
+        return self.db.query(PayrollRun).filter(PayrollRun.id == run_id).first()
+
+    def get_default_employee_ids(self) -> List[int]:
+        """
+        Get every active employee with an active salary structure, ordered by id
+        """
+        return list(self.db.execute(
+            select(User.id).where(
+                User.deletion_status == 0,
+                User.activation_status == 1,
+                User.id.in_(
+                    select(SalaryStructure.employee_id).where(SalaryStructure.is_active == True)
+                )
+            ).order_by(User.id)
+        ).scalars())
+
+    def create(self, run_data: Dict[str, Any], created_by: Optional[int] = None) -> PayrollRun:
+        """
+        Queue a new payroll run
+        """
+        employee_ids = run_data.pop("employee_ids", None)
+        if employee_ids is None:
+            employee_ids = self.get_default_employee_ids()
+        else:
+            # Keep request order, drop duplicates
+            employee_ids = list(dict.fromkeys(employee_ids))
+
+        run = PayrollRun(
+            **run_data,
+            employee_ids=employee_ids,
+            total_employees=len(employee_ids),
+            cursor=0,
+            created_count=0,
+            skipped_count=0,
+            error_count=0,
+            errors=[],
+            status=1,
+            created_by=created_by
+        )
+        if run.auto_pay:
+            run.auto_process = True
+
+        self.db.add(run)
+        self.db.commit()
+        self.db.refresh(run)
+
+        return run
+
+    def cancel(self, run_id: int) -> PayrollRun:
+        """
+        Cancel a queued or running payroll run
+        Chunks already committed are kept
+        """
+        run = self.get(run_id)
+        if not run:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Payroll run not found"
+            )
+
+        if run.is_finished:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Payroll run already finished"
+            )
+
+        run.status = 5
+        run.finished_at = _now()
+        self.db.commit()
+        self.db.refresh(run)
+
+        return run
+
+    def resume(self, run_id: int) -> PayrollRun:
+        """
+        Re-queue a failed or cancelled run; it continues from its last checkpoint
+        """
+        run = self.get(run_id)
+        if not run:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Payroll run not found"
+            )
+
+        if run.status not in (4, 5):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only failed or cancelled runs can be resumed"
+            )
+
+        run.status = 1
+        run.error_message = None
+        run.finished_at = None
+        self.db.commit()
+        self.db.refresh(run)
+
+        return run
+
+    def claim_next(self, worker_id: str, stale_after: int) -> Optional[PayrollRun]:
+        """
+        Claim the oldest queued run, or a running run whose worker stopped heartbeating
+        Uses SKIP LOCKED so several workers never claim the same run
+        """
+        cutoff = _now() - timedelta(seconds=stale_after)
+
+        run = self.db.query(PayrollRun).filter(
+            or_(
+                PayrollRun.status == 1,
+                and_(
+                    PayrollRun.status == 2,
+                    or_(PayrollRun.heartbeat_at.is_(None), PayrollRun.heartbeat_at < cutoff)
+                )
+            )
+        ).order_by(PayrollRun.id).with_for_update(skip_locked=True).first()
+
+        if not run:
+            self.db.rollback()
+            return None
+
+        if run.status == 2:
+            logger.info(f"Resuming payroll run {run.id} from checkpoint {run.cursor}/{run.total_employees}")
+
+        run.status = 2
+        run.worker_id = worker_id
+        run.started_at = run.started_at or _now()
+        run.heartbeat_at = _now()
+        self.db.commit()
+
+        return run
+
+    def _owned(self, run: PayrollRun):
+        """Conditions under which the worker that claimed `run` still owns it"""
+        return [PayrollRun.id == run.id, PayrollRun.worker_id == run.worker_id, PayrollRun.status == 2]
+
+    def heartbeat(self, run_id: int, worker_id: str) -> bool:
+        """
+        Refresh the heartbeat of a run this worker owns; False if it no longer does
+        """
+        updated = self.db.execute(
+            update(PayrollRun).where(
+                PayrollRun.id == run_id,
+                PayrollRun.worker_id == worker_id,
+                PayrollRun.status == 2
+            ).values(heartbeat_at=_now()).execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return bool(updated)
+
+    def _checkpoint(self, run: PayrollRun, **values) -> bool:
+        """
+        Commit the current chunk together with the run's new checkpoint, provided this worker
+        still owns the run at the cursor the chunk started from. Otherwise (taken over by
+        another worker or cancelled meanwhile) the chunk is rolled back and False returned.
+        """
+        run_id, worker_id, cursor = run.id, run.worker_id, run.cursor
+        updated = self.db.execute(
+            update(PayrollRun).where(
+                *self._owned(run),
+                PayrollRun.cursor == cursor
+            ).values(**values, heartbeat_at=_now()).execution_options(synchronize_session=False)
+        ).rowcount
+
+        if not updated:
+            self.db.rollback()
+            logger.warning(f"Payroll run {run_id} is no longer owned by {worker_id}; chunk at {cursor} rolled back")
+            return False
+
+        self.db.commit()
+        return True
+
+    def fail(self, run: PayrollRun, error: str):
+        """
+        Mark a run as failed, unless another worker has taken it over meanwhile
+        """
+        self.db.execute(
+            update(PayrollRun).where(*self._owned(run)).values(
+                status=4, error_message=error[:500], finished_at=_now()
+            ).execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+    def run_chunk(self, run: PayrollRun) -> bool:
+        """
+        Execute the next chunk of a run and commit it together with the checkpoint
+        Returns False once the run has no work left or this worker lost it
+        """
+        employee_ids = run.employee_ids or []
+        ids = employee_ids[run.cursor:run.cursor + run.chunk_size]
+
+        if not ids:
+            self._checkpoint(run, status=3, finished_at=_now())
+            return False
+
+        period = {
+            "payment_frequency": run.payment_frequency,
+            "year": run.year,
+            "month": run.month,
+            "week_number": run.week_number,
+            "pay_period_start": run.pay_period_start
+        }
+
+        payroll_service = PayrollService(self.db)
+        result = payroll_service.bulk_create(
+            ids,
+            pay_period_end=run.pay_period_end,
+            created_by=run.created_by,
+            commit=False,
+            **period
+        )
+
+        if run.auto_process:
+            payroll_service.process_for_employees(ids, run.created_by, **period)
+
+        if run.auto_pay:
+            payroll_service.pay_for_employees(
+                ids,
+                run.payment_method or "Bank Transfer",
+                run.payment_reference,
+                **period
+            )
+
+        return self._checkpoint(
+            run,
+            cursor=run.cursor + len(ids),
+            created_count=run.created_count + len(result["created"]),
+            skipped_count=(run.skipped_count or 0) + len(result["skipped_existing"]),
+            error_count=run.error_count + len(result["errors"]),
+            errors=(run.errors or []) + result["errors"]
+        )
+
+
+class PayrollRunWorker:
+    """
+    Polls for queued payroll runs and executes them chunk by chunk
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        poll_interval: float = None,
+        stale_after: int = None
+    ):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval or settings.PAYROLL_RUN_POLL_SECONDS
+        self.stale_after = stale_after or settings.PAYROLL_RUN_STALE_SECONDS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the worker in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="payroll-run-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Signal the worker to stop after the current chunk"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run_forever(self):
+        logger.info(f"Payroll run worker {self.worker_id} started")
+        while not self._stop.is_set():
+            try:
+                worked = self.run_once()
+            except Exception as e:
+                logger.error(f"Payroll run worker error: {e}", exc_info=True)
+                worked = False
+            if not worked:
+                self._stop.wait(self.poll_interval)
+        logger.info(f"Payroll run worker {self.worker_id} stopped")
+
+    def _heartbeat(self, run_id: int, done: threading.Event):
+        """Keep the claim on a run fresh while its chunks execute (own session)"""
+        interval = max(self.stale_after / 3, 1)
+        while not done.wait(interval):
+            db = self.session_factory()
+            try:
+                if not PayrollRunService(db).heartbeat(run_id, self.worker_id):
+                    return
+            except Exception as e:
+                logger.warning(f"Payroll run {run_id} heartbeat failed: {e}")
+            finally:
+                db.close()
+
+    def run_once(self) -> bool:
+        """
+        Claim one run and execute it until it finishes, is cancelled or the worker stops
+        Returns True if a run was claimed
+        """
+        db = self.session_factory()
+        try:
+            service = PayrollRunService(db)
+            run = service.claim_next(self.worker_id, self.stale_after)
+            if not run:
+                return False
+
+            done = threading.Event()
+            heartbeat = threading.Thread(
+                target=self._heartbeat, args=(run.id, done), name="payroll-run-heartbeat", daemon=True
+            )
+            heartbeat.start()
+            try:
+                self._execute(db, service, run)
+            finally:
+                done.set()
+                heartbeat.join()
+
+            return True
+        finally:
+            db.close()
+
+    def _execute(self, db: Session, service: PayrollRunService, run: PayrollRun):
+        """Run chunks until the run finishes, is cancelled or taken over, or the worker stops"""
+        while not self._stop.is_set():
+            db.refresh(run)
+            if run.status != 2 or run.worker_id != self.worker_id:
+                # Cancelled or taken over by another worker
+                return
+            try:
+                if not service.run_chunk(run):
+                    if run.status == 3:
+                        logger.info(
+                            f"Payroll run {run.id} completed: {run.created_count} created, "
+                            f"{run.skipped_count} already existed, {run.error_count} errors, {run.throughput} employees/s"
+                        )
+                    return
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Payroll run {run.id} failed at checkpoint {run.cursor}: {e}", exc_info=True)
+                service.fail(run, str(e))
+                return
+
+
+payroll_run_worker = PayrollRunWorker()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    worker = PayrollRunWorker()
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
@@ -0,0 +1,657 @@
+"""
+Payroll service - set-based payroll generation
+Loads salary structures in bulk and inserts rows in chunks, keyed on a unique pay period
+"""
+
+from typing import Optional, Dict, Any, List, Iterable, Iterator
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func, or_, and_
+
+from app.models.payroll import Payroll
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.models.salary_structure import SalaryStructure
+from app.services.attendance_aggregation import AttendanceAggregator, period_range, working_days
+from app.services.payroll_calculator import PayrollCalculator, PayrollColumns, from_cents
+from app.services.payroll_rollup import PayrollRollupService
+from app.services.payslip_service import queue_archive
+from app.services.statutory_deductions import period_effective_date, period_days, to_cents
+
+# Amounts entered on the draft itself; kept when a draft is recalculated
+MANUAL_FIELDS = ("overtime_amount", "loan_deduction", "other_deductions")
+
+# Salary structure amounts copied (prorated) onto payroll rows
+STRUCTURE_FIELDS = (
+    "basic_salary",
+    "house_allowance",
+    "transport_allowance",
+    "medical_allowance",
+    "other_allowances"
+)
+
+
+def chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Yield successive slices of at most `size` items
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class PayrollService:
+    # Rows per multi-row INSERT / ids per IN (...) list
+    CHUNK_SIZE = 1000
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_active_structures(self, employee_ids: Iterable[int]) -> Dict[int, Any]:
+        """
+        Get the active salary structure for each employee, keyed by employee id
+        Only the columns needed for payroll are loaded
+        """
+        structures = {}
+        ids = list(set(employee_ids))
+
+        for chunk in chunked(ids, self.CHUNK_SIZE * 10):
+            rows = self.db.execute(
+                select(
+                    SalaryStructure.employee_id,
+                    SalaryStructure.basic_salary,
+                    SalaryStructure.house_allowance,
+                    SalaryStructure.transport_allowance,
+                    SalaryStructure.medical_allowance,
+                    SalaryStructure.other_allowances
+                ).where(
+                    SalaryStructure.employee_id.in_(chunk),
+                    SalaryStructure.is_active == True
+                ).order_by(
+                    SalaryStructure.employee_id,
+                    SalaryStructure.effective_from.desc(),
+                    SalaryStructure.id.desc()
+                )
+            )
+            for row in rows:
+                # Most recent active structure wins
+                structures.setdefault(row.employee_id, row)
+
+        return structures
+
+    @staticmethod
+    def period_clauses(
+        payment_frequency: str,
+        year: int,
+        month: Optional[int] = None,
+        week_number: Optional[int] = None,
+        pay_period_start: Optional[date] = None
+    ) -> List[Any]:
+        """
+        Build the filter that identifies a single pay period for a frequency
+        Matches on the normalized period key, so it is served by the unique index
+        (and prunes to one partition on the year)
+        """
+        return [
+            Payroll.year == year,
+            Payroll.payment_frequency == payment_frequency,
+            Payroll.period_start == Payroll.normalize_period_start(
+                payment_frequency, year, month, week_number, pay_period_start
+            )
+        ]
+
+    def insert_rows(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Insert payroll rows in chunks with INSERT ... ON CONFLICT (period key) DO NOTHING
+        and refresh the rollup of the periods written to
+        Does not commit; returns the employee ids that were inserted
+        """
+        stmt = dialect_insert(self.db.get_bind())(Payroll).on_conflict_do_nothing(
+            index_elements=["employee_id", "payment_frequency", "year", "period_start"]
+        ).returning(Payroll.employee_id)
+
+        inserted = []
+        for chunk in chunked(rows, self.CHUNK_SIZE):
+            inserted.extend(self.db.execute(stmt, chunk).scalars())
+
+        if inserted:
+            PayrollRollupService(self.db).refresh(
+                (row["year"], row["payment_frequency"], row["period_start"]) for row in rows
+            )
+        return inserted
+
+    def create(self, payroll: Payroll) -> Optional[Payroll]:
+        """
+        Insert one payroll built in memory, keyed on its period
+        Does not commit; returns the stored row, or None if the period already exists
+        """
+        payroll.period_start = Payroll.normalize_period_start(
+            payroll.payment_frequency, payroll.year, payroll.month, payroll.week_number, payroll.pay_period_start
+        )
+        values = {
+            column.name: getattr(payroll, column.name)
+            for column in Payroll.__table__.columns
+            if getattr(payroll, column.name) is not None
+        }
+        if not self.insert_rows([values]):
+            return None
+
+        return self.db.query(Payroll).filter(
+            Payroll.employee_id == payroll.employee_id,
+            Payroll.year == payroll.year,
+            Payroll.payment_frequency == payroll.payment_frequency,
+            Payroll.period_start == payroll.period_start
+        ).first()
+
+    @staticmethod
+    def build_columns(structures: List[Any], payment_frequency: str) -> PayrollColumns:
+        """
+        Build array-backed payroll rows (integer cents) from salary structures
+        """
+        monthly = {
+            field: np.array([to_cents(getattr(s, field)) for s in structures], dtype=np.int64)
+            for field in STRUCTURE_FIELDS
+        }
+        return PayrollService.prorate_columns(monthly, payment_frequency)
+
+    @staticmethod
+    def prorate_columns(monthly: Dict[str, np.ndarray], payment_frequency: str) -> PayrollColumns:
+        """
+        Build payroll columns from monthly structure amounts (int64 cents per field)
+        Amounts are prorated to the payment frequency; daily rows also get daily/hourly rates
+        """
+        columns = PayrollColumns(len(monthly["basic_salary"]), payment_frequency)
+
+        for field in STRUCTURE_FIELDS:
+            setattr(columns, field, PayrollCalculator.prorate(monthly[field], payment_frequency))
+
+        if payment_frequency == "daily":
+            columns.daily_rate = PayrollCalculator.daily_rate(monthly["basic_salary"])
+            columns.hourly_rate = PayrollCalculator.hourly_rate(monthly["basic_salary"])
+
+        return columns
+
+    def apply_attendance(
+        self,
+        columns: PayrollColumns,
+        employee_ids: List[int],
+        start: date,
+        end: date
+    ) -> List[Dict[str, Any]]:
+        """
+        Fill days/hours worked from aggregated attendance for one pay period
+        Rows paid by rate (daily) also get overtime pay; other rows keep their overtime amount
+        Returns the non-money attendance columns for each row
+        """
+        totals = AttendanceAggregator(self.db).aggregate(employee_ids, start, end)
+        empty = {"days_worked": 0, "hours_worked": 0, "overtime_hours": 0}
+        attendance = [totals.get(emp_id, empty) for emp_id in employee_ids]
+
+        columns.days_worked = np.array([a["days_worked"] for a in attendance], dtype=np.int64)
+        columns.hours_worked = np.array([to_cents(a["hours_worked"]) for a in attendance], dtype=np.int64)
+        overtime = np.array([to_cents(a["overtime_hours"]) for a in attendance], dtype=np.int64)
+
+        by_rate = columns.hourly_rate > 0
+        columns.overtime_amount[by_rate] = PayrollCalculator.overtime_amount(
+            columns.hourly_rate[by_rate], overtime[by_rate], settings.OVERTIME_MULTIPLIER
+        )
+
+        period_days = working_days(start, end)
+        return [
+            {
+                "working_days": period_days,
+                "days_worked": int(columns.days_worked[i]),
+                "hours_worked": from_cents(columns.hours_worked[i]),
+                "overtime_hours": from_cents(overtime[i])
+            }
+            for i in range(len(employee_ids))
+        ]
+
+    def bulk_create(
+        self,
+        employee_ids: List[int],
+        payment_frequency: str,
+        year: int,
+        month: Optional[int] = None,
+        week_number: Optional[int] = None,
+        pay_period_start: Optional[date] = None,
+        pay_period_end: Optional[date] = None,
+        created_by: Optional[int] = None,
+        commit: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Create payroll records for many employees with a fixed number of queries
+        Returns created employee ids, employees whose payroll already existed for the
+        period (left untouched) and per-employee errors
+        Pass commit=False to leave the transaction open for the caller
+        """
+        structures = self.get_active_structures(employee_ids)
+
+        period = {
+            "year": year,
+            "month": month,
+            "week_number": week_number,
+            "pay_period_start": pay_period_start,
+            "pay_period_end": pay_period_end,
+            "period_start": Payroll.normalize_period_start(
+                payment_frequency, year, month, week_number, pay_period_start
+            )
+        }
+
+        selected = []
+        candidates = []
+        errors = []
+        duplicates = []
+        seen = set()
+
+        for emp_id in employee_ids:
+            # The same employee twice in the request: the first occurrence creates the
+            # payroll, later ones are reported as already existing
+            if emp_id in seen:
+                duplicates.append(emp_id)
+                continue
+            seen.add(emp_id)
+
+            structure = structures.get(emp_id)
+
+            if not structure:
+                errors.append({"employee_id": emp_id, "error": "No active salary structure found"})
+                continue
+
+            selected.append(structure)
+            candidates.append(emp_id)
+
+        start, end = period_range(payment_frequency, year, month, week_number, pay_period_start, pay_period_end)
+        columns = self.build_columns(selected, payment_frequency)
+        attendance = self.apply_attendance(columns, candidates, start, end)
+        PayrollCalculator.calculate_batch(
+            columns,
+            statutory_on=period_effective_date(payment_frequency, year, month, week_number, pay_period_start),
+            days=period_days(start, end)
+        )
+
+        rows = [
+            {
+                "employee_id": emp_id,
+                **period,
+                "payment_frequency": payment_frequency,
+                "created_by": created_by,
+                "needs_recalculation": False,
+                **worked,
+                **amounts
+            }
+            for emp_id, worked, amounts in zip(candidates, attendance, columns.to_rows())
+        ]
+
+        # The unique period key decides what already exists, atomically with the insert
+        written = set(self.insert_rows(rows))
+
+        if commit:
+            self.db.commit()
+
+        return {
+            "created": [emp_id for emp_id in candidates if emp_id in written],
+            "skipped_existing": [emp_id for emp_id in candidates if emp_id not in written] + duplicates,
+            "errors": errors
+        }
+
+    @staticmethod
+    def period_contains(on_date: date) -> Any:
+        """
+        Clause matching payroll rows whose pay period includes a date
+        """
+        iso_year, iso_week, _ = on_date.isocalendar()
+        no_dates = Payroll.pay_period_start.is_(None)
+
+        return or_(
+            and_(
+                Payroll.pay_period_start <= on_date,
+                func.coalesce(Payroll.pay_period_end, Payroll.pay_period_start) >= on_date
+            ),
+            and_(no_dates, Payroll.payment_frequency == "monthly",
+                 Payroll.year == on_date.year, Payroll.month == on_date.month),
+            and_(no_dates, Payroll.payment_frequency == "weekly",
+                 Payroll.year == iso_year, Payroll.week_number == iso_week),
+            and_(no_dates, Payroll.payment_frequency == "bi-weekly",
+                 Payroll.year == iso_year, Payroll.week_number.in_([iso_week - 1, iso_week])),
+            and_(no_dates, Payroll.payment_frequency == "yearly", Payroll.year == on_date.year)
+        )
+
+    def mark_dirty(self, employee_ids: Iterable[int], on_dates: Optional[Iterable[date]] = None) -> int:
+        """
+        Flag the draft payrolls of employees for recalculation after an input changed
+        With `on_dates`, only drafts whose period contains one of the dates are flagged
+        Does not commit; returns the number of rows flagged
+        """
+        clauses = [
+            Payroll.status == 1,
+            Payroll.employee_id.in_(list(set(employee_ids)))
+        ]
+        if on_dates is not None:
+            dates = [d for d in set(on_dates) if d]
+            if not dates:
+                return 0
+            clauses.append(or_(*[self.period_contains(d) for d in dates]))
+
+        result = self.db.execute(
+            update(Payroll).where(
+                *clauses
+            ).values(needs_recalculation=True).execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def recompute_dirty(self, clauses: Optional[List[Any]] = None, commit: bool = True) -> Dict[str, Any]:
+        """
+        Recalculate only the draft payrolls flagged for recalculation
+        Structure amounts and attendance totals are refreshed, manual amounts are kept,
+        and statutory deductions and totals are recomputed
+        """
+        recomputed = []
+        skipped = []
+
+        drafts = self.db.execute(
+            select(
+                Payroll.id,
+                Payroll.employee_id,
+                Payroll.payment_frequency,
+                Payroll.year,
+                Payroll.month,
+                Payroll.week_number,
+                Payroll.pay_period_start,
+                Payroll.pay_period_end,
+                Payroll.period_start,
+                *[getattr(Payroll, field) for field in MANUAL_FIELDS]
+            ).where(
+                Payroll.status == 1,
+                Payroll.needs_recalculation == True,
+                *(clauses or [])
+            ).order_by(Payroll.id).with_for_update()
+        ).all()
+
+        structures = self.get_active_structures(row.employee_id for row in drafts)
+
+        by_period: Dict[tuple, List[Any]] = {}
+        for row in drafts:
+            if row.employee_id not in structures:
+                skipped.append({"id": row.id, "status": 1, "reason": "No active salary structure found"})
+                continue
+            payment_frequency = row.payment_frequency or "monthly"
+            key = (payment_frequency, *period_range(
+                payment_frequency, row.year, row.month, row.week_number, row.pay_period_start, row.pay_period_end
+            ))
+            by_period.setdefault(key, []).append(row)
+
+        # Rows of one frequency and pay period are recalculated together
+        for (payment_frequency, start, end), rows in by_period.items():
+            for chunk in chunked(rows, self.CHUNK_SIZE):
+                columns = self.build_columns([structures[row.employee_id] for row in chunk], payment_frequency)
+                for field in MANUAL_FIELDS:
+                    setattr(columns, field, np.array([to_cents(getattr(row, field)) for row in chunk], dtype=np.int64))
+                attendance = self.apply_attendance(columns, [row.employee_id for row in chunk], start, end)
+
+                # The period start is the date the statutory tables are picked by
+                PayrollCalculator.calculate_batch(columns, statutory_on=start, days=period_days(start, end))
+
+                self.db.execute(update(Payroll), [
+                    {"id": row.id, "needs_recalculation": False, **worked, **amounts}
+                    for row, worked, amounts in zip(chunk, attendance, columns.to_rows())
+                ])
+                recomputed.extend(row.id for row in chunk)
+
+        PayrollRollupService(self.db).refresh(
+            (row.year, row.payment_frequency, row.period_start)
+            for rows in by_period.values() for row in rows
+        )
+
+        if commit:
+            self.db.commit()
+
+        return {
+            "recomputed_count": len(recomputed),
+            "recomputed": recomputed,
+            "skipped_count": len(skipped),
+            "skipped": skipped
+        }
+
+    def filter_clauses(
+        self,
+        ids: Optional[List[int]] = None,
+        employee_ids: Optional[List[int]] = None,
+        payment_frequency: Optional[str] = None,
+        year: Optional[int] = None,
+        month: Optional[int] = None,
+        week_number: Optional[int] = None,
+        department_id: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Build WHERE clauses for a batch of payroll rows, by id list and/or period filter
+        """
+        from app.models.employee_department import EmployeeDepartment
+
+        clauses = []
+
+        if ids is not None:
+            clauses.append(Payroll.id.in_(ids))
+        if employee_ids is not None:
+            clauses.append(Payroll.employee_id.in_(employee_ids))
+        if payment_frequency:
+            clauses.append(Payroll.payment_frequency == payment_frequency)
+        if year:
+            clauses.append(Payroll.year == year)
+        if month:
+            clauses.append(Payroll.month == month)
+        if week_number:
+            clauses.append(Payroll.week_number == week_number)
+        if department_id:
+            clauses.append(Payroll.employee_id.in_(
+                select(EmployeeDepartment.employee_id).where(EmployeeDepartment.department_id == department_id)
+            ))
+
+        return clauses
+
+    def summarize(self, clauses: List[Any]) -> Dict[str, Any]:
+        """
+        Totals for the matching payrolls with one GROUP BY status, payment_frequency query
+        Returns overall count/gross/deductions/net plus by_status and by_frequency breakdowns
+        """
+        rows = self.db.execute(
+            select(
+                Payroll.status,
+                func.coalesce(Payroll.payment_frequency, "monthly").label("payment_frequency"),
+                func.count().label("count"),
+                func.coalesce(func.sum(Payroll.gross_salary), 0).label("gross"),
+                func.coalesce(func.sum(Payroll.total_deductions), 0).label("deductions"),
+                func.coalesce(func.sum(Payroll.net_salary), 0).label("net")
+            ).where(*clauses).group_by(Payroll.status, Payroll.payment_frequency)
+        ).all()
+
+        summary = {"count": 0, "gross": Decimal(0), "deductions": Decimal(0), "net": Decimal(0)}
+        by_status = {}
+        by_frequency = {}
+
+        for row in rows:
+            summary["count"] += row.count
+            summary["gross"] += Decimal(row.gross)
+            summary["deductions"] += Decimal(row.deductions)
+            summary["net"] += Decimal(row.net)
+
+            status_name = Payroll.STATUS_NAMES.get(row.status, "Unknown")
+            status_totals = by_status.setdefault(status_name, {"count": 0, "amount": Decimal(0)})
+            status_totals["count"] += row.count
+            status_totals["amount"] += Decimal(row.net)
+
+            frequency_totals = by_frequency.setdefault(
+                row.payment_frequency, {"count": 0, "gross": Decimal(0), "net": Decimal(0)}
+            )
+            frequency_totals["count"] += row.count
+            frequency_totals["gross"] += Decimal(row.gross)
+            frequency_totals["net"] += Decimal(row.net)
+
+        summary["by_status"] = by_status
+        summary["by_frequency"] = by_frequency
+        return summary
+
+    def transition(self, clauses: List[Any], from_status: int, values: Dict[str, Any]) -> List[int]:
+        """
+        Move every matching row in `from_status` to new values with one guarded
+        UPDATE ... WHERE status = :from_status RETURNING id, and refresh the rollup
+        of the periods they belong to. Rows moved to Paid have their payslip archived after commit
+        Does not commit; returns ids of the rows that transitioned
+        """
+        rows = self.db.execute(
+            update(Payroll).where(
+                Payroll.status == from_status,
+                *clauses
+            ).values(**values).returning(
+                Payroll.id, Payroll.year, Payroll.payment_frequency, Payroll.period_start
+            ).execution_options(synchronize_session=False)
+        ).all()
+
+        PayrollRollupService(self.db).refresh((row.year, row.payment_frequency, row.period_start) for row in rows)
+        ids = [row.id for row in rows]
+        if values.get("status") == 3:
+            queue_archive(self.db, ids)
+        return ids
+
+    def _batch_result(
+        self,
+        transitioned: List[int],
+        clauses: List[Any],
+        ids: Optional[List[int]],
+        expected_status: int
+    ) -> Dict[str, Any]:
+        """
+        Report transitioned ids and the reason every other requested/matching row was skipped
+        """
+        done = set(transitioned)
+
+        if ids is not None:
+            candidates = [i for i in dict.fromkeys(ids) if i not in done]
+            found = {}
+            for chunk in chunked(candidates, self.CHUNK_SIZE * 10):
+                found.update(self.db.execute(
+                    select(Payroll.id, Payroll.status).where(Payroll.id.in_(chunk))
+                ).all())
+            statuses = [(i, found.get(i)) for i in candidates]
+        else:
+            statuses = list(self.db.execute(
+                select(Payroll.id, Payroll.status).where(
+                    Payroll.status != expected_status,
+                    *clauses
+                ).order_by(Payroll.id)
+            ).all())
+
+        skipped = []
+        for payroll_id, current_status in statuses:
+            if payroll_id in done:
+                continue
+            if current_status is None:
+                reason = "Payroll record not found"
+            elif expected_status == 1:
+                reason = "Payroll already processed"
+            else:
+                reason = "Payroll must be processed first" if current_status == 1 else "Payroll already paid or cancelled"
+            skipped.append({"id": payroll_id, "status": current_status, "reason": reason})
+
+        return {
+            "transitioned_count": len(transitioned),
+            "transitioned": sorted(transitioned),
+            "skipped_count": len(skipped),
+            "skipped": skipped
+        }
+
+    def process_batch(self, processor_id: Optional[int], ids: Optional[List[int]] = None, **filters) -> Dict[str, Any]:
+        """
+        Process every draft payroll matching the id list and/or filters in one statement
+        """
+        clauses = self.filter_clauses(ids=ids, **filters)
+        # Drafts with stale inputs are brought up to date before they are locked in
+        self.recompute_dirty(clauses, commit=False)
+        transitioned = self.transition(clauses, 1, {
+            "status": 2,
+            "processed_by": processor_id,
+            "processed_at": func.now()
+        })
+        result = self._batch_result(transitioned, clauses, ids, 1)
+        self.db.commit()
+        return result
+
+    def pay_batch(
+        self,
+        payment_method: str,
+        payment_reference: Optional[str] = None,
+        ids: Optional[List[int]] = None,
+        **filters
+    ) -> Dict[str, Any]:
+        """
+        Mark every processed payroll matching the id list and/or filters as paid in one statement
+        """
+        clauses = self.filter_clauses(ids=ids, **filters)
+        transitioned = self.transition(clauses, 2, {
+            "status": 3,
+            "payment_date": date.today(),
+            "payment_method": payment_method,
+            "payment_reference": payment_reference
+        })
+        result = self._batch_result(transitioned, clauses, ids, 2)
+        self.db.commit()
+        return result
+
+    def process_for_employees(
+        self,
+        employee_ids: List[int],
+        processor_id: Optional[int],
+        payment_frequency: str,
+        year: int,
+        month: Optional[int] = None,
+        week_number: Optional[int] = None,
+        pay_period_start: Optional[date] = None
+    ) -> int:
+        """
+        Mark the draft payrolls of the given employees for a period as processed,
+        recomputing any flagged for recalculation first
+        Does not commit; returns the number of rows updated
+        """
+        period = self.period_clauses(payment_frequency, year, month, week_number, pay_period_start)
+        updated = 0
+
+        for chunk in chunked(list(employee_ids), self.CHUNK_SIZE * 10):
+            # Same as process_batch: drafts with stale inputs are recomputed before they are locked in
+            self.recompute_dirty([Payroll.employee_id.in_(chunk), *period], commit=False)
+            updated += len(self.transition([Payroll.employee_id.in_(chunk), *period], 1, {
+                "status": 2,
+                "processed_by": processor_id,
+                "processed_at": func.now()
+            }))
+
+        return updated
+
+    def pay_for_employees(
+        self,
+        employee_ids: List[int],
+        payment_method: str,
+        payment_reference: Optional[str],
+        payment_frequency: str,
+        year: int,
+        month: Optional[int] = None,
+        week_number: Optional[int] = None,
+        pay_period_start: Optional[date] = None
+    ) -> int:
+        """
+        Mark the processed payrolls of the given employees for a period as paid
+        Does not commit; returns the number of rows updated
+        """
+        period = self.period_clauses(payment_frequency, year, month, week_number, pay_period_start)
+        updated = 0
+
+        for chunk in chunked(list(employee_ids), self.CHUNK_SIZE * 10):
+            updated += len(self.transition([Payroll.employee_id.in_(chunk), *period], 2, {
+                "status": 3,
+                "payment_date": date.today(),
+                "payment_method": payment_method,
+                "payment_reference": payment_reference
+            }))
+
+        return updated
@@ -0,0 +1,244 @@
+"""
+Payroll simulation service - in-memory "what-if" payroll costing
+Active salary structures are loaded once into int64 column arrays, hypothetical
+adjustments are applied to the arrays and the regular payroll calculation runs on
+both the baseline and the adjusted columns. Nothing is written to the database.
+"""
+
+from typing import Optional, Dict, Any, List
+from datetime import date
+
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, cast, BigInteger
+
+from app.models.salary_structure import SalaryStructure
+from app.models.user import User
+from app.models.department import Department
+from app.models.designation import Designation
+from app.models.employee_department import EmployeeDepartment
+from app.services.payroll_calculator import PayrollCalculator, PayrollColumns, from_cents, _div_round
+from app.services.payroll_service import PayrollService, STRUCTURE_FIELDS
+from app.services.statutory_deductions import BASIS_POINTS, period_effective_date, to_cents
+
+# Amounts reported per group
+RESULT_FIELDS = ("gross_salary", "nssf", "nhif", "paye", "total_deductions", "net_salary")
+
+# Sentinel for employees without a department/designation
+NO_GROUP = -1
+
+
+def _cents_column(column):
+    """Numeric column as integer cents, computed by the database"""
+    return cast(func.round(func.coalesce(column, 0) * 100), BigInteger)
+
+
+class PayrollSimulationService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load_structures(self, department_id: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Load the latest active salary structure of every active employee as column arrays
+        Money columns are monthly integer cents
+        """
+        stmt = select(
+            SalaryStructure.employee_id,
+            func.coalesce(SalaryStructure.payment_frequency, "monthly"),
+            func.coalesce(User.designation_id, NO_GROUP),
+            *[_cents_column(getattr(SalaryStructure, field)) for field in STRUCTURE_FIELDS]
+        ).join(
+            User, User.id == SalaryStructure.employee_id
+        ).where(
+            SalaryStructure.is_active == True,
+            User.deletion_status == 0,
+            User.activation_status == 1
+        ).order_by(
+            SalaryStructure.employee_id,
+            SalaryStructure.effective_from.desc(),
+            SalaryStructure.id.desc()
+        )
+
+        rows = self.db.execute(stmt).all()
+        columns = list(zip(*rows)) if rows else [()] * (3 + len(STRUCTURE_FIELDS))
+
+        employee_ids = np.array(columns[0], dtype=np.int64)
+        # Rows are ordered by employee, latest structure first; keep the first of each
+        _, first = np.unique(employee_ids, return_index=True)
+
+        data = {
+            "employee_id": employee_ids[first],
+            "payment_frequency": np.array(columns[1], dtype=object)[first],
+            "designation_id": np.array(columns[2], dtype=np.int64)[first]
+        }
+        for i, field in enumerate(STRUCTURE_FIELDS):
+            data[field] = np.array(columns[3 + i], dtype=np.int64)[first]
+
+        # Primary department first, then the oldest assignment
+        departments = {}
+        for emp_id, dept_id in self.db.execute(
+            select(EmployeeDepartment.employee_id, EmployeeDepartment.department_id).order_by(
+                EmployeeDepartment.employee_id,
+                EmployeeDepartment.is_primary.desc(),
+                EmployeeDepartment.id
+            )
+        ):
+            departments.setdefault(emp_id, dept_id)
+
+        data["department_id"] = np.array(
+            [departments.get(emp_id, NO_GROUP) for emp_id in data["employee_id"].tolist()],
+            dtype=np.int64
+        )
+
+        if department_id:
+            mask = data["department_id"] == department_id
+            data = {key: values[mask] for key, values in data.items()}
+
+        return data
+
+    @staticmethod
+    def apply_adjustments(data: Dict[str, np.ndarray], adjustments: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Apply adjustments in order to copies of the monthly amounts
+        Returns the adjusted amounts plus an `affected` mask
+        """
+        adjusted = {field: data[field].copy() for field in STRUCTURE_FIELDS}
+        affected = np.zeros(len(data["employee_id"]), dtype=bool)
+
+        for adjustment in adjustments:
+            mask = np.ones(len(data["employee_id"]), dtype=bool)
+            if adjustment.get("designation_id") is not None:
+                mask &= data["designation_id"] == adjustment["designation_id"]
+            if adjustment.get("department_id") is not None:
+                mask &= data["department_id"] == adjustment["department_id"]
+            if adjustment.get("employee_ids") is not None:
+                mask &= np.isin(data["employee_id"], adjustment["employee_ids"])
+            if adjustment.get("payment_frequency"):
+                mask &= data["payment_frequency"] == adjustment["payment_frequency"]
+
+            factor = BASIS_POINTS + int(to_cents(adjustment.get("percent")))
+            amount = to_cents(adjustment.get("amount"))
+
+            for field in adjustment.get("components") or ["basic_salary"]:
+                values = adjusted[field]
+                values[mask] = np.maximum(_div_round(values[mask] * factor, BASIS_POINTS) + amount, 0)
+
+            affected |= mask
+
+        adjusted["affected"] = affected
+        return adjusted
+
+    @staticmethod
+    def calculate(monthly: Dict[str, np.ndarray], payment_frequency: str, on_date: date) -> PayrollColumns:
+        """
+        Run the regular payroll calculation (proration, statutory deductions, totals)
+        """
+        columns = PayrollService.prorate_columns(monthly, payment_frequency)
+        return PayrollCalculator.calculate_batch(columns, statutory_on=on_date)
+
+    @staticmethod
+    def _amounts(values: Dict[str, Any], i: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            field: from_cents(values[field] if i is None else values[field][i])
+            for field in RESULT_FIELDS
+        }
+
+    def summarize(
+        self,
+        keys: np.ndarray,
+        names: Dict[Any, str],
+        baseline: PayrollColumns,
+        simulated: PayrollColumns,
+        affected: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        """
+        Sum baseline and simulated amounts per group key
+        """
+        groups, inverse = np.unique(keys, return_inverse=True)
+        n = len(groups)
+
+        employees = np.bincount(inverse, minlength=n)
+        affected_counts = np.bincount(inverse, weights=affected, minlength=n).astype(np.int64)
+
+        sums = {}
+        for label, columns in (("baseline", baseline), ("simulated", simulated)):
+            sums[label] = {}
+            for field in RESULT_FIELDS:
+                totals = np.zeros(n, dtype=np.int64)
+                np.add.at(totals, inverse, getattr(columns, field))
+                sums[label][field] = totals.tolist()
+
+        result = []
+        for i, key in enumerate(groups.tolist()):
+            key = None if key == NO_GROUP else key
+            result.append({
+                "key": key,
+                "name": names.get(key),
+                "employees": int(employees[i]),
+                "affected": int(affected_counts[i]),
+                "baseline": self._amounts(sums["baseline"], i),
+                "simulated": self._amounts(sums["simulated"], i),
+                "delta": {
+                    field: from_cents(sums["simulated"][field][i] - sums["baseline"][field][i])
+                    for field in RESULT_FIELDS
+                }
+            })
+
+        # Largest cost change first
+        result.sort(key=lambda g: (-abs(g["delta"]["gross_salary"]), str(g["key"])))
+        return result
+
+    def simulate(
+        self,
+        adjustments: List[Dict[str, Any]],
+        payment_frequency: str,
+        year: int,
+        month: Optional[int] = None,
+        week_number: Optional[int] = None,
+        pay_period_start: Optional[date] = None,
+        department_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Cost the adjustments against the current salary structures
+        Amounts are per pay period of `payment_frequency`
+        """
+        data = self.load_structures(department_id)
+        adjusted = self.apply_adjustments(data, adjustments)
+        on_date = period_effective_date(payment_frequency, year, month, week_number, pay_period_start)
+
+        baseline = self.calculate({f: data[f] for f in STRUCTURE_FIELDS}, payment_frequency, on_date)
+        simulated = self.calculate({f: adjusted[f] for f in STRUCTURE_FIELDS}, payment_frequency, on_date)
+        affected = adjusted["affected"]
+
+        department_names = dict(self.db.execute(select(Department.id, Department.department)).all())
+        designation_names = dict(self.db.execute(select(Designation.id, Designation.designation)).all())
+
+        totals = self.summarize(
+            np.zeros(len(affected), dtype=np.int64), {}, baseline, simulated, affected
+        )
+        if totals:
+            totals = totals[0]
+        else:
+            zero = {field: from_cents(0) for field in RESULT_FIELDS}
+            totals = {"employees": 0, "affected": 0, "baseline": zero, "simulated": zero, "delta": zero}
+        totals.update(key=None, name="All employees")
+
+        frequencies = data["payment_frequency"]
+        frequency_keys, frequency_index = np.unique(frequencies, return_inverse=True)
+
+        return {
+            "payment_frequency": payment_frequency,
+            "totals": totals,
+            "by_department": self.summarize(
+                data["department_id"], department_names, baseline, simulated, affected
+            ),
+            "by_designation": self.summarize(
+                data["designation_id"], designation_names, baseline, simulated, affected
+            ),
+            "by_frequency": [
+                dict(group, key=str(frequency_keys[group["key"]]), name=str(frequency_keys[group["key"]]))
+                for group in self.summarize(
+                    frequency_index.astype(np.int64), {}, baseline, simulated, affected
+                )
+            ]
+        }
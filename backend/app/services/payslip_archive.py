@@ -0,0 +1,52 @@
+"""
+Payslip archive - content-addressed store for the PDFs of paid payslips
+A paid payslip never changes, so its PDF is rendered once at pay time and kept under
+the SHA-256 of its bytes: PAYSLIP_ARCHIVE_DIR/ab/cd/abcd....pdf. Identical PDFs share
+one file, and the digest doubles as the download's ETag.
+"""
+
+from typing import Optional
+import hashlib
+import os
+import tempfile
+
+from app.core.config import settings
+
+
+def archive_path(digest: str) -> str:
+    return os.path.join(settings.PAYSLIP_ARCHIVE_DIR, digest[:2], digest[2:4], f"{digest}.pdf")
+
+
+def store_pdf(pdf: bytes) -> str:
+    """
+    Store a PDF unless its content is already archived; returns its digest
+    Files are written to a temp name and renamed, so readers never see a partial file
+    """
+    digest = hashlib.sha256(pdf).hexdigest()
+    path = archive_path(digest)
+    if os.path.exists(path):
+        return digest
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return digest
+
+
+def read_pdf(digest: Optional[str]) -> Optional[bytes]:
+    """Archived PDF bytes, None when there is no digest or the file is gone"""
+    if not digest:
+        return None
+    try:
+        with open(archive_path(digest), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
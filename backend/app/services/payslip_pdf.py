@@ -0,0 +1,366 @@
+"""
+Payslip PDF rendering - single-page A4 payslips without a PDF library
+The layout is compiled once per company into the fixed part of the file (catalog, page,
+fonts, static text and rules) plus a list of field slots; rendering a payslip only
+formats its values into the slots, deflates the content stream and writes the xref.
+Output is deterministic, so the same payslip always renders to the same bytes.
+
+Bulk downloads render batches of payslips in a process pool sized to the CPU cores and
+stream them into a ZIP as the batches complete.
+"""
+
+from typing import Optional, Dict, Any, List, Tuple, Iterator, Iterable
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from itertools import islice
+import functools
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+import zlib
+
+from app.core.config import settings
+from app.services.payslip_archive import read_pdf, store_pdf
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+LEFT = 50
+RIGHT = 545
+MIDDLE = 297
+
+# Helvetica advance widths (1/1000 em) for the characters amounts are made of
+CHAR_WIDTHS = {**dict.fromkeys("0123456789", 556), ",": 278, ".": 278, "-": 333, " ": 278}
+
+EARNINGS = [
+    ("Basic Salary", "basic_salary"),
+    ("House Allowance", "house_allowance"),
+    ("Transport Allowance", "transport_allowance"),
+    ("Medical Allowance", "medical_allowance"),
+    ("Other Allowances", "other_allowances"),
+    ("Overtime", "overtime_amount")
+]
+
+DEDUCTIONS = [
+    ("NSSF", "nssf"),
+    ("NHIF", "nhif"),
+    ("PAYE", "paye"),
+    ("Loan Deduction", "loan_deduction"),
+    ("Other Deductions", "other_deductions")
+]
+
+
+def _pdf_text(text: Any) -> bytes:
+    """A PDF literal string in WinAnsi encoding"""
+    raw = str(text).encode("cp1252", "replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _text_width(text: str, size: float) -> float:
+    return sum(CHAR_WIDTHS.get(char, 556) for char in text) * size / 1000
+
+
+def _text_op(font: str, size: float, x: float, y: float, text: str) -> bytes:
+    return b"BT /%s %g Tf %g %g Td %s Tj ET\n" % (font.encode(), size, x, y, _pdf_text(text))
+
+
+def format_amount(value: Any) -> str:
+    return f"{Decimal(value or 0):,.2f}"
+
+
+@dataclass(frozen=True)
+class Slot:
+    """A value drawn at render time"""
+    key: str
+    x: float
+    y: float
+    font: str = "F1"
+    size: float = 9
+    align: str = "left"
+    max_chars: int = 48
+    amount: bool = False
+
+
+class PayslipTemplate:
+    """
+    Compiled payslip layout for one company
+    """
+
+    def __init__(self, company: Dict[str, str]):
+        self.static = bytearray()
+        self.slots: List[Slot] = []
+        self._layout(company)
+        self.static = bytes(self.static)
+        self._prefix, self._offsets = self._compile_objects()
+
+    # Layout
+
+    def text(self, x: float, y: float, text: str, font: str = "F1", size: float = 9, align: str = "left"):
+        if align == "right":
+            x -= _text_width(text, size)
+        self.static += _text_op(font, size, x, y, text)
+
+    def rule(self, y: float, x1: float = LEFT, x2: float = RIGHT, width: float = 0.75):
+        self.static += b"%g w %g %g m %g %g l S\n" % (width, x1, y, x2, y)
+
+    def slot(self, key: str, x: float, y: float, **options):
+        self.slots.append(Slot(key, x, y, **options))
+
+    def _layout(self, company: Dict[str, str]):
+        self.static += b"0 0 0 RG 0 0 0 rg\n"
+
+        # Company header
+        self.text(LEFT, 790, company.get("company_name", ""), "F2", 16)
+        self.text(LEFT, 774, company.get("company_address", ""), size=9)
+        self.text(LEFT, 762, " | ".join(
+            value for value in (company.get("company_phone"), company.get("company_email")) if value
+        ), size=9)
+        self.text(RIGHT, 790, "PAYSLIP", "F2", 14, align="right")
+        self.slot("period", RIGHT, 774, font="F2", size=10, align="right")
+        self.slot("frequency", RIGHT, 762, align="right")
+        self.rule(748, width=1.5)
+
+        # Employee details
+        left_fields = [
+            ("Employee", "employee_name"),
+            ("Employee No.", "employee_number"),
+            ("Designation", "designation"),
+            ("Department", "department")
+        ]
+        right_fields = [
+            ("KRA PIN", "kra_pin"),
+            ("NSSF No.", "nssf_no"),
+            ("NHIF No.", "nhif_no"),
+            ("Bank Account", "bank_account")
+        ]
+        y = 730
+        for (left_label, left_key), (right_label, right_key) in zip(left_fields, right_fields):
+            self.text(LEFT, y, left_label, "F2")
+            self.slot(left_key, LEFT + 75, y, max_chars=32)
+            self.text(MIDDLE + 10, y, right_label, "F2")
+            self.slot(right_key, MIDDLE + 85, y, max_chars=30)
+            y -= 14
+        self.rule(y + 4)
+
+        # Earnings and deductions side by side
+        top = y - 14
+        for x1, x2, heading, rows, total_label, total_key in (
+            (LEFT, MIDDLE - 10, "Earnings", EARNINGS, "Gross Salary", "gross_salary"),
+            (MIDDLE + 10, RIGHT, "Deductions", DEDUCTIONS, "Total Deductions", "total_deductions")
+        ):
+            y = top
+            self.text(x1, y, heading, "F2", 10)
+            self.text(x2, y, "Amount", "F2", 10, align="right")
+            self.rule(y - 5, x1, x2, 0.5)
+            y -= 20
+            for label, key in rows:
+                self.text(x1, y, label)
+                self.slot(key, x2, y, align="right", amount=True)
+                y -= 14
+            self.rule(top - 20 - 14 * len(EARNINGS) + 4, x1, x2, 0.5)
+            total_y = top - 20 - 14 * len(EARNINGS) - 10
+            self.text(x1, total_y, total_label, "F2")
+            self.slot(total_key, x2, total_y, font="F2", align="right", amount=True)
+
+        # Net pay
+        y = total_y - 30
+        self.rule(y + 16, width=1.5)
+        self.text(LEFT, y, "NET PAY", "F2", 12)
+        self.slot("currency", RIGHT - 110, y, font="F2", size=12, align="right")
+        self.slot("net_salary", RIGHT, y, font="F2", size=12, align="right", amount=True)
+        self.rule(y - 10, width=1.5)
+
+        # Attendance and payment
+        y -= 34
+        for left_label, left_key, right_label, right_key in (
+            ("Working Days", "working_days", "Status", "status"),
+            ("Days Worked", "days_worked", "Payment Date", "payment_date"),
+            ("Overtime Hours", "overtime_hours", "Payment Method", "payment_method"),
+            ("", None, "Reference", "payment_reference")
+        ):
+            if left_key:
+                self.text(LEFT, y, left_label, "F2")
+                self.slot(left_key, LEFT + 90, y)
+            self.text(MIDDLE + 10, y, right_label, "F2")
+            self.slot(right_key, MIDDLE + 95, y, max_chars=28)
+            y -= 14
+
+        self.rule(60, width=0.5)
+        self.text(LEFT, 48, "This is a computer-generated payslip and does not require a signature.", size=7)
+        self.slot("reference", RIGHT, 48, size=7, align="right")
+
+    # File structure
+
+    def _compile_objects(self) -> Tuple[bytes, List[int]]:
+        """
+        Everything before the content stream, with the byte offset of each object
+        """
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>" % (PAGE_WIDTH, PAGE_HEIGHT),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"
+        ]
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        return bytes(out), offsets
+
+    def render(self, values: Dict[str, Any]) -> bytes:
+        """
+        PDF bytes for one payslip; `values` maps slot keys to display values
+        """
+        content = bytearray(self.static)
+        for slot in self.slots:
+            value = values.get(slot.key)
+            if slot.amount:
+                text = format_amount(value)
+            else:
+                text = "" if value is None else str(value)[:slot.max_chars]
+            if not text:
+                continue
+            x = slot.x - _text_width(text, slot.size) if slot.align == "right" else slot.x
+            content += _text_op(slot.font, slot.size, x, slot.y, text)
+
+        stream = zlib.compress(bytes(content), 6)
+
+        out = bytearray(self._prefix)
+        offsets = self._offsets + [len(out)]
+        out += b"6 0 obj\n<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream)
+        out += stream
+        out += b"\nendstream\nendobj\n"
+
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref)
+        return bytes(out)
+
+
+@functools.lru_cache(maxsize=8)
+def _template(company: Tuple[Tuple[str, str], ...]) -> PayslipTemplate:
+    return PayslipTemplate(dict(company))
+
+
+def template_key(company: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """Hashable company details; templates are compiled once per distinct key"""
+    fields = ("company_name", "company_address", "company_phone", "company_email")
+    return tuple((field, str(company.get(field) or "")) for field in fields)
+
+
+def render_pdf(document: Dict[str, Any], company: Dict[str, Any]) -> bytes:
+    """
+    Render a payslip document (see PayslipService.to_document) to PDF
+    """
+    return _template(template_key(company)).render(document)
+
+
+def pdf_filename(document: Dict[str, Any]) -> str:
+    period = re.sub(r"[^A-Za-z0-9]+", "-", str(document.get("period", ""))).strip("-")
+    employee = re.sub(r"[^A-Za-z0-9]+", "-", str(document.get("employee_number") or document["employee_id"])).strip("-")
+    return f"payslip_{employee}_{period}_{document['id']}.pdf"
+
+
+def render_batch(documents: List[Dict[str, Any]], company_key: Tuple[Tuple[str, str], ...]) -> List[Tuple[str, bytes]]:
+    """Pool worker: render a batch of payslips, reading paid ones from the archive"""
+    template = _template(company_key)
+    return [
+        (pdf_filename(document), read_pdf(document.get("payslip_sha256")) or template.render(document))
+        for document in documents
+    ]
+
+
+def archive_batch(documents: List[Dict[str, Any]], company_key: Tuple[Tuple[str, str], ...]) -> List[Tuple[int, str]]:
+    """Pool worker: render a batch of paid payslips into the archive; returns (payroll id, digest)"""
+    template = _template(company_key)
+    return [(document["id"], store_pdf(template.render(document))) for document in documents]
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for payslip rendering, one process per core unless configured"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PAYSLIP_PDF_WORKERS or os.cpu_count() or 1,
+                # Spawned, not forked: children must not inherit the parent's DB connections
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+class _ZipBuffer:
+    """Write-only, unseekable sink: zipfile then writes data descriptors and never seeks back"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(documents: Iterable[Dict[str, Any]], company: Dict[str, Any]) -> Iterator[bytes]:
+    """
+    ZIP of payslip PDFs, yielded as rendered batches complete
+    At most a few batches per pool process are in flight, so memory stays bounded
+    whatever the number of payslips. PDFs are already deflated, so entries are stored.
+    """
+    pool = pdf_pool()
+    company_key = template_key(company)
+    max_in_flight = (settings.PAYSLIP_PDF_WORKERS or os.cpu_count() or 1) * 2
+
+    buffer = _ZipBuffer()
+    archive = zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED)
+    pending = deque()
+
+    def write(future) -> bytes:
+        for filename, pdf in future.result():
+            archive.writestr(filename, pdf)
+        return buffer.take()
+
+    documents = iter(documents)
+    try:
+        while batch := list(islice(documents, settings.PAYSLIP_PDF_BATCH_SIZE)):
+            pending.append(pool.submit(render_batch, batch, company_key))
+            if len(pending) >= max_in_flight:
+                yield write(pending.popleft())
+
+        while pending:
+            yield write(pending.popleft())
+
+        archive.close()
+        yield buffer.take()
+    finally:
+        # Client went away: drop batches that have not started
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,393 @@
+"""
+Payslip service - payslip documents read with one joined projection per query,
+and the archive of paid payslips (python -m app.services.payslip_service backfills it)
+"""
+
+from typing import Optional, Dict, Any, Iterator, Iterable, List
+from concurrent.futures import Executor
+import json
+import logging
+import os
+import queue
+import threading
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func, bindparam, event
+
+from app.models.user import User
+from app.models.designation import Designation
+from app.models.department import Department
+from app.models.employee_department import EmployeeDepartment
+from app.models.payroll import Payroll
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.payslip_pdf import archive_batch, template_key, pdf_pool
+from app.services.payslip_archive import archive_path
+
+logger = logging.getLogger(__name__)
+
+# Written by /system-settings
+COMPANY_SETTINGS_FILE = "system_settings.json"
+
+DEFAULT_COMPANY = {
+    "company_name": "Jafasol Systems",
+    "company_email": "info@jafasol.com",
+    "company_phone": "+254 700 000 000",
+    "company_address": "Nairobi, Kenya",
+    "currency": "KES"
+}
+
+
+def company_info() -> Dict[str, Any]:
+    """
+    Company details printed on payslips
+    """
+    if os.path.exists(COMPANY_SETTINGS_FILE):
+        with open(COMPANY_SETTINGS_FILE, 'r') as f:
+            return {**DEFAULT_COMPANY, **json.load(f)}
+    return dict(DEFAULT_COMPANY)
+
+
+class PayslipService:
+    STREAM_BATCH_SIZE = 1000
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def document_query() -> Any:
+        """
+        Payroll amounts with the employee, designation and primary department columns a
+        payslip prints, in one statement
+        """
+        primary = select(
+            EmployeeDepartment.employee_id,
+            func.min(EmployeeDepartment.department_id).label("department_id")
+        ).where(EmployeeDepartment.is_primary == 1).group_by(EmployeeDepartment.employee_id).subquery()
+
+        return select(
+            Payroll.id,
+            Payroll.employee_id,
+            Payroll.month,
+            Payroll.year,
+            Payroll.week_number,
+            Payroll.pay_period_start,
+            Payroll.pay_period_end,
+            Payroll.payment_frequency,
+            Payroll.basic_salary,
+            Payroll.house_allowance,
+            Payroll.transport_allowance,
+            Payroll.medical_allowance,
+            Payroll.other_allowances,
+            Payroll.overtime_amount,
+            Payroll.nssf,
+            Payroll.nhif,
+            Payroll.paye,
+            Payroll.loan_deduction,
+            Payroll.other_deductions,
+            Payroll.gross_salary,
+            Payroll.total_deductions,
+            Payroll.net_salary,
+            Payroll.working_days,
+            Payroll.days_worked,
+            Payroll.overtime_hours,
+            Payroll.status,
+            Payroll.payment_date,
+            Payroll.payment_method,
+            Payroll.payment_reference,
+            Payroll.payslip_sha256,
+            User.name.label("employee_name"),
+            User.employee_id.label("employee_number"),
+            User.kra_pin,
+            User.nssf_no,
+            User.nhif_no,
+            User.bank_name,
+            User.bank_acc_no,
+            Designation.designation,
+            Department.department
+        ).outerjoin(
+            User, User.id == Payroll.employee_id
+        ).outerjoin(
+            Designation, Designation.id == User.designation_id
+        ).outerjoin(
+            primary, primary.c.employee_id == Payroll.employee_id
+        ).outerjoin(
+            Department, Department.id == primary.c.department_id
+        )
+
+    @staticmethod
+    def summary_query() -> Any:
+        """
+        Payroll totals with the employee's name, number and designation, for listings
+        """
+        return select(
+            Payroll.id,
+            Payroll.employee_id,
+            Payroll.month,
+            Payroll.year,
+            Payroll.basic_salary,
+            Payroll.gross_salary,
+            Payroll.total_deductions,
+            Payroll.net_salary,
+            Payroll.status,
+            Payroll.payment_date,
+            Payroll.created_at,
+            User.name.label("employee_name"),
+            User.employee_id.label("employee_number"),
+            Designation.designation
+        ).outerjoin(
+            User, User.id == Payroll.employee_id
+        ).outerjoin(
+            Designation, Designation.id == User.designation_id
+        )
+
+    @staticmethod
+    def filtered(stmt: Any, month: Optional[int] = None, year: Optional[int] = None,
+                 employee_id: Optional[int] = None, status: Optional[int] = None) -> Any:
+        if month:
+            stmt = stmt.where(Payroll.month == month)
+        if year:
+            stmt = stmt.where(Payroll.year == year)
+        if employee_id:
+            stmt = stmt.where(Payroll.employee_id == employee_id)
+        if status:
+            stmt = stmt.where(Payroll.status == status)
+        return stmt
+
+    def count(self, **filters) -> int:
+        return self.db.scalar(self.filtered(select(func.count(Payroll.id)), **filters))
+
+    def summaries(self, skip: int = 0, limit: Optional[int] = None, **filters) -> List[Any]:
+        """
+        Summary rows of the matching payroll records, employee columns included
+        """
+        stmt = self.filtered(self.summary_query(), **filters).order_by(Payroll.id).offset(skip)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return self.db.execute(stmt).all()
+
+    def get_detail(self, payroll_id: int) -> Optional[Any]:
+        """
+        Document columns plus the contact and audit columns of /payslips/{id}
+        """
+        return self.db.execute(
+            self.document_query().add_columns(
+                User.email,
+                User.contact_no_one,
+                Payroll.notes,
+                Payroll.created_at,
+                Payroll.processed_at
+            ).where(Payroll.id == payroll_id)
+        ).first()
+
+    @staticmethod
+    def to_document(row: Any, currency: str = "KES") -> Dict[str, Any]:
+        """
+        Picklable payslip values keyed like the PDF template slots
+        """
+        document = {
+            key: getattr(row, key)
+            for key in (
+                "id", "employee_id", "month", "year", "employee_name", "employee_number",
+                "designation", "department", "kra_pin", "nssf_no", "nhif_no", "bank_name", "bank_acc_no",
+                "basic_salary", "house_allowance", "transport_allowance", "medical_allowance",
+                "other_allowances", "overtime_amount", "nssf", "nhif", "paye", "loan_deduction",
+                "other_deductions", "gross_salary", "total_deductions", "net_salary",
+                "working_days", "days_worked", "overtime_hours", "payment_date",
+                "payment_method", "payment_reference", "payslip_sha256"
+            )
+        }
+        bank_account = " - ".join(value for value in (row.bank_name, row.bank_acc_no) if value)
+
+        document.update({
+            # Row columns are named like Payroll's, so its label logic applies
+            "period": Payroll.get_period_label(row),
+            "frequency": Payroll.get_frequency_name(row),
+            "status": Payroll.STATUS_NAMES.get(row.status, "Unknown"),
+            "bank_account": bank_account or None,
+            "currency": currency,
+            "overtime_hours": f"{row.overtime_hours or 0:g}",
+            "reference": f"Payslip #{row.id}"
+        })
+        return document
+
+    def get_document(self, payroll_id: int) -> Optional[Dict[str, Any]]:
+        row = self.db.execute(self.document_query().where(Payroll.id == payroll_id)).first()
+        if row is None:
+            return None
+        return self.to_document(row, company_info().get("currency") or "KES")
+
+    def documents(self, month: int, year: int, employee_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Payslip documents of a month, read through a server-side cursor
+        """
+        stmt = self.document_query().where(Payroll.month == month, Payroll.year == year)
+        if employee_id:
+            stmt = stmt.where(Payroll.employee_id == employee_id)
+        stmt = stmt.order_by(Payroll.employee_id, Payroll.id).execution_options(yield_per=self.STREAM_BATCH_SIZE)
+
+        currency = company_info().get("currency") or "KES"
+        for row in self.db.execute(stmt):
+            yield self.to_document(row, currency)
+
+    def archive(self, payroll_ids: List[int], force: bool = False, pool: Optional[Executor] = None) -> Dict[int, str]:
+        """
+        Render the payslips of paid payrolls into the archive and record their digest
+        Rows already archived are left alone unless `force`. Batches are rendered in
+        `pool` when given, in this process otherwise. Does not commit.
+        Returns payroll id -> digest of the rows archived
+        """
+        if not payroll_ids:
+            return {}
+
+        company = company_info()
+        company_key = template_key(company)
+        currency = company.get("currency") or "KES"
+        digests = {}
+
+        for start in range(0, len(payroll_ids), self.STREAM_BATCH_SIZE):
+            stmt = self.document_query().where(
+                Payroll.id.in_(payroll_ids[start:start + self.STREAM_BATCH_SIZE]),
+                Payroll.status == 3
+            )
+            if not force:
+                stmt = stmt.where(Payroll.payslip_sha256.is_(None))
+            documents = [self.to_document(row, currency) for row in self.db.execute(stmt)]
+
+            if pool is None:
+                digests.update(archive_batch(documents, company_key))
+            else:
+                batch_size = settings.PAYSLIP_PDF_BATCH_SIZE
+                futures = [
+                    pool.submit(archive_batch, documents[i:i + batch_size], company_key)
+                    for i in range(0, len(documents), batch_size)
+                ]
+                for future in futures:
+                    digests.update(future.result())
+
+        if digests:
+            self.db.execute(
+                update(Payroll.__table__).where(
+                    Payroll.__table__.c.id == bindparam("payroll_id")
+                ).values(payslip_sha256=bindparam("digest")),
+                [{"payroll_id": payroll_id, "digest": digest} for payroll_id, digest in digests.items()]
+            )
+        return digests
+
+    def archive_digest(self, payroll_id: int) -> Optional[str]:
+        """
+        Archive digest of a paid payslip, archiving it first if it was paid before the
+        archive existed or its file is missing. None for unpaid payslips
+        """
+        row = self.db.execute(
+            select(Payroll.status, Payroll.payslip_sha256).where(Payroll.id == payroll_id)
+        ).first()
+        if row is None or row.status != 3:
+            return None
+
+        if row.payslip_sha256 and os.path.exists(archive_path(row.payslip_sha256)):
+            return row.payslip_sha256
+
+        digest = self.archive([payroll_id], force=True).get(payroll_id)
+        self.db.commit()
+        return digest
+
+    def backfill(self) -> int:
+        """
+        Archive every paid payroll recorded before the archive existed
+        """
+        archived = 0
+        while True:
+            ids = self.db.scalars(
+                select(Payroll.id).where(
+                    Payroll.status == 3,
+                    Payroll.payslip_sha256.is_(None)
+                ).order_by(Payroll.id).limit(self.STREAM_BATCH_SIZE)
+            ).all()
+            if not ids:
+                return archived
+            archived += len(self.archive(list(ids), pool=pdf_pool()))
+            self.db.commit()
+
+
+
+class PayslipArchiver:
+    """
+    Archives the payslips of rows paid in committed transactions, off the request path
+    Payments only queue ids (queue_archive); a background thread renders them in the PDF
+    process pool and records digests in short transactions of their own. Rows it misses
+    (process restart, render failure) are archived on first download or by backfill.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[List[int]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, payroll_ids: List[int]):
+        self._queue.put(list(payroll_ids))
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="payslip-archiver", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            payroll_ids = self._queue.get()
+            if payroll_ids is None:
+                return
+
+            db = SessionLocal()
+            try:
+                service = PayslipService(db)
+                for start in range(0, len(payroll_ids), service.STREAM_BATCH_SIZE):
+                    service.archive(payroll_ids[start:start + service.STREAM_BATCH_SIZE], pool=pdf_pool())
+                    db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Payslip archiving failed: {e}")
+            finally:
+                db.close()
+
+    def stop(self):
+        with self._lock:
+            thread = self._thread
+        if thread and thread.is_alive():
+            self._queue.put(None)
+            thread.join(10)
+
+
+payslip_archiver = PayslipArchiver()
+
+
+# Pay paths queue ids on the session; they are archived once the payment commits
+
+_ARCHIVE_KEY = "payslip_archive_ids"
+
+
+def queue_archive(db: Session, payroll_ids: Iterable[int]):
+    """
+    Archive the payslips of these paid payrolls after the current transaction commits
+    """
+    db.info.setdefault(_ARCHIVE_KEY, []).extend(payroll_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _archive_committed(session):
+    payroll_ids = session.info.pop(_ARCHIVE_KEY, None)
+    if payroll_ids:
+        payslip_archiver.submit(payroll_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop(_ARCHIVE_KEY, None)
+
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        count = PayslipService(db).backfill()
+        print(f"Archived {count} paid payslips in {settings.PAYSLIP_ARCHIVE_DIR}")
+    finally:
+        db.close()
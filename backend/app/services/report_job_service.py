@@ -0,0 +1,485 @@
+"""
+Report job service - renders heavy reports in a local process pool
+POST /reports/jobs queues a job; the worker thread claims queued jobs and hands each to a
+pool process, which renders the report into REPORT_JOB_DIR and records its progress on
+the job row. Finished artifacts are downloadable until they expire after
+REPORT_JOB_TTL_SECONDS, when the worker deletes them.
+
+The worker runs as a thread inside the API process (see main.py) or standalone:
+    python -m app.services.report_job_service
+"""
+
+from typing import Optional, Dict, Any, Iterator, Iterable, Union
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func, or_, and_
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.report_job import ReportJob
+from app.models.payroll import Payroll
+from app.models.user import User
+from app.services.report_service import ReportService, TAX_EXPORT_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def artifact_dir() -> Path:
+    path = Path(settings.REPORT_JOB_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+class ReportJobService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, job_id: int, created_by: Optional[int] = None) -> ReportJob:
+        """
+        Get report job by ID; jobs are only visible to the user who queued them
+        """
+        job = self.db.query(ReportJob).filter(ReportJob.id == job_id).first()
+        if not job or (created_by is not None and job.created_by != created_by):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Report job not found"
+            )
+        return job
+
+    def create(self, job_data: Dict[str, Any], created_by: Optional[int] = None) -> ReportJob:
+        """
+        Queue a report job
+        """
+        job = ReportJob(
+            report_type=job_data["report_type"],
+            params=jsonable_encoder(job_data.get("params") or {}, exclude_none=True),
+            format=job_data["format"],
+            status=1,
+            processed=0,
+            created_by=created_by
+        )
+
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+
+        return job
+
+    def artifact(self, job: ReportJob) -> Path:
+        """
+        Path of a finished job's artifact
+        """
+        if job.status == 5:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Report has expired; queue it again"
+            )
+
+        if job.status != 3 or not job.artifact_path:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Report is not ready ({job.get_status_name()})"
+            )
+
+        path = artifact_dir() / job.artifact_path
+        if not path.exists():
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Report file no longer exists; queue it again"
+            )
+        return path
+
+    def claim_next(self, worker_id: str, stale_after: int) -> Optional[ReportJob]:
+        """
+        Claim the oldest queued job, or a running job whose worker stopped heartbeating
+        Uses SKIP LOCKED so several API processes never claim the same job
+        """
+        cutoff = _now() - timedelta(seconds=stale_after)
+
+        job = self.db.query(ReportJob).filter(
+            or_(
+                ReportJob.status == 1,
+                and_(
+                    ReportJob.status == 2,
+                    or_(ReportJob.heartbeat_at.is_(None), ReportJob.heartbeat_at < cutoff)
+                )
+            )
+        ).order_by(ReportJob.id).with_for_update(skip_locked=True).first()
+
+        if not job:
+            self.db.rollback()
+            return None
+
+        if job.status == 2:
+            logger.info(f"Restarting report job {job.id} abandoned by {job.worker_id}")
+
+        job.status = 2
+        job.worker_id = worker_id
+        job.processed = 0
+        job.started_at = _now()
+        job.heartbeat_at = job.started_at
+        self.db.commit()
+
+        return job
+
+    def fail(self, job_id: int, worker_id: str, message: str):
+        """
+        Mark a running job as failed, unless another worker has taken it over
+        """
+        job = self.db.get(ReportJob, job_id)
+        if job and job.status == 2 and job.worker_id == worker_id:
+            job.status = 4
+            job.error_message = message[:500]
+            job.finished_at = _now()
+            self.db.commit()
+
+    def expire(self) -> int:
+        """
+        Delete artifacts past their expiry and mark their jobs expired
+        """
+        jobs = self.db.query(ReportJob).filter(
+            ReportJob.status == 3,
+            ReportJob.expires_at < _now()
+        ).all()
+
+        for job in jobs:
+            if job.artifact_path:
+                try:
+                    (artifact_dir() / job.artifact_path).unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning(f"Could not delete report artifact {job.artifact_path}: {e}")
+            job.status = 5
+            job.artifact_path = None
+
+        if jobs:
+            self.db.commit()
+            logger.info(f"Expired {len(jobs)} report artifacts")
+        return len(jobs)
+
+
+class ReportRenderer:
+    """
+    Renders one claimed job to a file; runs inside a pool process
+    Progress is written through a separate session: committing the session that reads
+    the report would close its server-side cursor.
+    """
+
+    # Progress is committed at most this often (items)
+    PROGRESS_INTERVAL = 500
+
+    def __init__(self, db: Session, progress_db: Session, job: ReportJob):
+        self.db = db
+        self.progress_db = progress_db
+        self.job = job
+        self.params = dict(job.params or {})
+        for field in ("start_date", "end_date"):
+            if self.params.get(field):
+                self.params[field] = date.fromisoformat(self.params[field])
+        self.service = ReportService(db)
+        self.processed = 0
+
+    def _update(self, **values):
+        self.progress_db.execute(
+            update(ReportJob).where(ReportJob.id == self.job.id).values(heartbeat_at=_now(), **values)
+        )
+        self.progress_db.commit()
+
+    def set_total(self, total: int):
+        self._update(total=total)
+
+    def track(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Yield items, recording progress and heartbeating as they are consumed"""
+        for item in items:
+            yield item
+            self.processed += 1
+            if self.processed % self.PROGRESS_INTERVAL == 0:
+                self._update(processed=self.processed)
+
+    @staticmethod
+    def json_document(head: Dict[str, Any], key: str, items: Iterable[Dict[str, Any]]) -> Iterator[str]:
+        """
+        A JSON object with `head`'s fields and `key` holding the items, written item by item
+        """
+        yield json.dumps(jsonable_encoder(head))[:-1]
+        yield f'{", " if head else ""}"{key}": ['
+        for i, item in enumerate(items):
+            yield ("," if i else "") + json.dumps(jsonable_encoder(item))
+        yield "]}"
+
+    def payment_report(self) -> Iterator[Union[str, bytes]]:
+        filters = {
+            field: self.params.get(field)
+            for field in ("start_date", "end_date", "employee_id", "payment_type", "payment_method", "status")
+        }
+        group_by = self.params.get("group_by", "none")
+        clauses = ReportService.payment_clauses(**filters)
+
+        # Totals and breakdowns only; every record is streamed below
+        report = self.service.payment_report(clauses, group_by, 0, 0)
+        self.set_total(report["summary"]["total_payments"])
+        report.pop("records")
+
+        return self.json_document(
+            {"filters": {**filters, "group_by": group_by}, **report},
+            "records",
+            self.track(self.service.payment_records(clauses))
+        )
+
+    def employee_detailed(self) -> Iterator[Union[str, bytes]]:
+        employee_id = self.params.get("employee_id")
+        self.set_total(1 if employee_id else self.db.scalar(
+            select(func.count()).select_from(User).where(User.deletion_status == 0)
+        ))
+
+        def employees():
+            after_id = None
+            while True:
+                page = self.service.employee_detailed(
+                    employee_id=employee_id,
+                    start_date=self.params.get("start_date"),
+                    end_date=self.params.get("end_date"),
+                    after_id=after_id,
+                    limit=1000
+                )
+                yield from page["employees"]
+                after_id = page["next_after_id"]
+                if after_id is None:
+                    break
+
+        return self.json_document(
+            {"start_date": self.params.get("start_date"), "end_date": self.params.get("end_date")},
+            "employees",
+            self.track(employees())
+        )
+
+    def p9_report(self) -> Iterator[Union[str, bytes]]:
+        year = self.params["year"]
+        employee_id = self.params.get("employee_id")
+
+        stmt = select(func.count(Payroll.employee_id.distinct())).where(Payroll.year == year)
+        if employee_id:
+            stmt = stmt.where(Payroll.employee_id == employee_id)
+        self.set_total(self.db.scalar(stmt))
+
+        cards = self.track(self.service.p9_cards(year, employee_id))
+        if self.job.format == "csv":
+            return self.service.p9_csv(cards)
+        return self.service.p9_ndjson(cards)
+
+    def tax_report(self) -> Iterator[Union[str, bytes]]:
+        year = self.params["year"]
+        month = self.params.get("month")
+
+        stmt = select(func.count()).select_from(Payroll).where(Payroll.year == year)
+        if month:
+            stmt = stmt.where(Payroll.month == month)
+        self.set_total(self.db.scalar(stmt))
+
+        rows = self.track(self.service.tax_rows(year, month))
+        if self.job.format == "xlsx":
+            return self.service.xlsx_stream(TAX_EXPORT_COLUMNS, rows, title="P10")
+        return self.service.csv_stream(TAX_EXPORT_COLUMNS, rows)
+
+    def render(self, path: Path) -> int:
+        """
+        Write the report to `path`; returns its size in bytes
+        """
+        renderers = {
+            "payment-report": self.payment_report,
+            "employee-detailed": self.employee_detailed,
+            "p9-report": self.p9_report,
+            "tax-report": self.tax_report
+        }
+        chunks = renderers[self.job.report_type]()
+
+        with open(path, "wb") as out:
+            for chunk in chunks:
+                out.write(chunk.encode() if isinstance(chunk, str) else chunk)
+
+        return path.stat().st_size
+
+
+def render_job(job_id: int, worker_id: str):
+    """
+    Pool process entry point: render a claimed job and record the artifact
+    """
+    db = SessionLocal()
+    progress_db = SessionLocal()
+    try:
+        job = progress_db.get(ReportJob, job_id)
+        if not job or job.status != 2 or job.worker_id != worker_id:
+            return
+
+        filename = f"{job.report_type}_{job.id}.{job.format}"
+        partial = artifact_dir() / f".{filename}.{os.getpid()}.part"
+        renderer = ReportRenderer(db, progress_db, job)
+        try:
+            size = renderer.render(partial)
+            # Rename so a half-written file is never served
+            os.replace(partial, artifact_dir() / filename)
+        except Exception:
+            partial.unlink(missing_ok=True)
+            raise
+
+        finished_at = _now()
+        renderer._update(
+            status=3,
+            processed=renderer.processed,
+            artifact_path=filename,
+            artifact_size=size,
+            finished_at=finished_at,
+            expires_at=finished_at + timedelta(seconds=settings.REPORT_JOB_TTL_SECONDS)
+        )
+
+        logger.info(f"Report job {job_id} ({job.report_type}) completed: {renderer.processed} items, {size} bytes")
+    finally:
+        db.close()
+        progress_db.close()
+
+
+class ReportJobWorker:
+    """
+    Claims queued report jobs and renders them in a process pool
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        max_workers: int = None,
+        poll_interval: float = None,
+        stale_after: int = None
+    ):
+        self.session_factory = session_factory
+        self.max_workers = max_workers or settings.REPORT_JOB_WORKERS
+        self.poll_interval = poll_interval or settings.REPORT_JOB_POLL_SECONDS
+        self.stale_after = stale_after or settings.REPORT_JOB_STALE_SECONDS
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._running: Dict[int, Future] = {}
+
+    def start(self):
+        """Start the worker in a daemon thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="report-job-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Stop claiming jobs; reports being rendered are abandoned and re-run once stale"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned, not forked: children must not inherit the parent's DB connections
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def run_forever(self):
+        logger.info(f"Report job worker {self.worker_id} started with {self.max_workers} processes")
+        last_expiry = 0.0
+        while not self._stop.is_set():
+            try:
+                if _now().timestamp() - last_expiry >= 60:
+                    self.expire()
+                    last_expiry = _now().timestamp()
+                claimed = self.run_once()
+            except Exception as e:
+                logger.error(f"Report job worker error: {e}", exc_info=True)
+                claimed = False
+            if not claimed:
+                self._stop.wait(self.poll_interval)
+        logger.info(f"Report job worker {self.worker_id} stopped")
+
+    def expire(self):
+        db = self.session_factory()
+        try:
+            ReportJobService(db).expire()
+        finally:
+            db.close()
+
+    def _finished(self, job_id: int, future: Future):
+        self._running.pop(job_id, None)
+        error = future.exception() if not future.cancelled() else None
+        if error is None:
+            return
+
+        logger.error(f"Report job {job_id} failed: {error}")
+        if isinstance(error, BrokenProcessPool):
+            self._executor = None
+
+        db = self.session_factory()
+        try:
+            ReportJobService(db).fail(job_id, self.worker_id, str(error) or error.__class__.__name__)
+        finally:
+            db.close()
+
+    def run_once(self) -> bool:
+        """
+        Claim one job and submit it to the pool if a process is free
+        Returns True if a job was claimed
+        """
+        if len(self._running) >= self.max_workers:
+            return False
+
+        db = self.session_factory()
+        try:
+            job = ReportJobService(db).claim_next(self.worker_id, self.stale_after)
+            if not job:
+                return False
+            job_id = job.id
+        finally:
+            db.close()
+
+        future = self._pool().submit(render_job, job_id, self.worker_id)
+        self._running[job_id] = future
+        future.add_done_callback(lambda f: self._finished(job_id, f))
+        return True
+
+
+report_job_worker = ReportJobWorker()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    worker = ReportJobWorker()
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
@@ -0,0 +1,668 @@
+"""
+Report service - report data computed with grouped aggregate queries
+Every report runs a fixed number of queries regardless of headcount; per-employee
+sections are keyed by employee_id and paginated with a keyset (id > after_id).
+"""
+
+from typing import Optional, Dict, Any, List, Iterator
+from datetime import date
+from decimal import Decimal
+from itertools import groupby
+import csv
+import io
+import json
+import tempfile
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, tuple_, literal, literal_column, null, union_all, cast, String
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.types import Date
+
+from app.models.user import User
+from app.models.designation import Designation
+from app.models.attendance import Attendance
+from app.models.leave import Leave
+from app.models.payroll import Payroll
+from app.models.payment import Payment
+
+P9_AMOUNTS = ["gross_salary", "nssf", "nhif", "paye", "net_salary"]
+
+P9_CSV_COLUMNS = [
+    "employee_id", "employee_name", "employee_number", "kra_pin", "nssf_no", "nhif_no", "month"
+] + P9_AMOUNTS
+
+# Column order of the iTax P10 employee details sheet (cash pay section), plus the
+# NSSF/NHIF numbers and contributions needed to file the statutory returns
+TAX_EXPORT_COLUMNS = [
+    "PIN of Employee", "Name of Employee", "Employee Number", "NSSF Number", "NHIF Number",
+    "Year", "Month", "Residential Status", "Type of Employee",
+    "Basic Salary", "Housing Allowance", "Transport Allowance", "Overtime Allowance", "Other Allowance",
+    "Total Cash Pay", "NSSF Contribution", "NHIF Contribution", "PAYE Tax"
+]
+
+# Bytes per chunk when streaming a generated file
+FILE_CHUNK_SIZE = 64 * 1024
+
+
+def _as_date(value: Any) -> date:
+    """Dates computed in SQL come back as ISO strings on SQLite"""
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+class date_bucket(FunctionElement):
+    """
+    First day of the week/month/year containing a date, compiled per dialect
+    The unit is a literal_column so it is part of the statement cache key
+    """
+    type = Date()
+    inherit_cache = True
+    name = "date_bucket"
+
+
+@compiles(date_bucket)
+def _date_bucket_default(element, compiler, **kw):
+    unit, column = list(element.clauses)
+    column = compiler.process(column, **kw)
+    unit = unit.name
+    if unit == "week":
+        # strftime %w: 0 = Sunday; weeks start on Monday
+        return "date(%s, '-' || ((CAST(strftime('%%w', %s) AS INTEGER) + 6) %% 7) || ' days')" % (column, column)
+    if unit in ("month", "year"):
+        return "date(%s, 'start of %s')" % (column, unit)
+    return "date(%s)" % column
+
+
+@compiles(date_bucket, "postgresql")
+def _date_bucket_postgresql(element, compiler, **kw):
+    unit, column = list(element.clauses)
+    return "CAST(date_trunc('%s', %s) AS DATE)" % (unit.name, compiler.process(column, **kw))
+
+
+class ReportService:
+    # Rows fetched per round trip when streaming a report
+    STREAM_BATCH_SIZE = 1000
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def attendance_summary(self, start_date: date, end_date: date, employee_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Attendance status counts for a date range in one aggregate query
+        """
+        stmt = select(
+            func.count().label("total"),
+            func.count().filter(Attendance.status == 1).label("present"),
+            func.count().filter(Attendance.status == 2).label("absent"),
+            func.count().filter(Attendance.status == 3).label("late"),
+            func.count().filter(Attendance.status == 4).label("half_day"),
+            func.count().filter(Attendance.status == 5).label("leave")
+        ).where(
+            Attendance.date >= start_date,
+            Attendance.date <= end_date
+        )
+
+        if employee_id:
+            stmt = stmt.where(Attendance.employee_id == employee_id)
+
+        row = self.db.execute(stmt).one()
+        return {
+            "total_records": row.total,
+            "status_breakdown": {
+                "present": row.present,
+                "absent": row.absent,
+                "late": row.late,
+                "half_day": row.half_day,
+                "leave": row.leave
+            }
+        }
+
+    def leave_summary(self, year: int, employee_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Leave counts and days per type and status for leaves starting in a year,
+        one aggregate query grouped by leave type
+        """
+        stmt = select(
+            Leave.leave_type,
+            func.count().label("count"),
+            func.coalesce(func.sum(Leave.days), 0).label("days"),
+            func.count().filter(Leave.status == 1).label("pending"),
+            func.count().filter(Leave.status == 2).label("approved"),
+            func.count().filter(Leave.status == 3).label("rejected"),
+            func.count().filter(Leave.status == 4).label("cancelled")
+        ).where(
+            # A plain range on start_date can use the (status|employee_id, start_date) indexes
+            Leave.start_date >= date(year, 1, 1),
+            Leave.start_date < date(year + 1, 1, 1)
+        )
+
+        if employee_id:
+            stmt = stmt.where(Leave.employee_id == employee_id)
+
+        leave_types = {}
+        status_counts = dict.fromkeys(["pending", "approved", "rejected", "cancelled"], 0)
+        total_requests = 0
+        total_days = 0
+
+        for row in self.db.execute(stmt.group_by(Leave.leave_type).order_by(Leave.leave_type)):
+            name = Leave.LEAVE_TYPE_NAMES.get(row.leave_type, "Unknown")
+            totals = leave_types.setdefault(name, {"count": 0, "days": 0})
+            totals["count"] += row.count
+            totals["days"] += int(row.days)
+            for status in status_counts:
+                status_counts[status] += getattr(row, status)
+            total_requests += row.count
+            total_days += int(row.days)
+
+        return {
+            "total_requests": total_requests,
+            "total_days": total_days,
+            "leave_types": leave_types,
+            "status_breakdown": status_counts
+        }
+
+    def employee_page(self, employee_id: Optional[int], after_id: Optional[int], limit: int) -> List[Any]:
+        """
+        One page of non-deleted employees ordered by id, with their designation
+        """
+        stmt = select(
+            User.id,
+            User.name,
+            User.employee_id,
+            Designation.designation
+        ).outerjoin(
+            Designation, Designation.id == User.designation_id
+        ).where(User.deletion_status == 0)
+
+        if employee_id:
+            stmt = stmt.where(User.id == employee_id)
+        if after_id:
+            stmt = stmt.where(User.id > after_id)
+
+        return self.db.execute(stmt.order_by(User.id).limit(limit)).all()
+
+    def attendance_totals(self, ids: List[int], start_date: Optional[date], end_date: Optional[date]) -> Dict[int, Any]:
+        stmt = select(
+            Attendance.employee_id,
+            func.count().label("total_days"),
+            func.count().filter(Attendance.status == 1).label("present"),
+            func.count().filter(Attendance.status == 2).label("absent"),
+            func.count().filter(Attendance.status == 3).label("late"),
+            func.count().filter(Attendance.status == 4).label("half_day")
+        ).where(Attendance.employee_id.in_(ids))
+
+        if start_date:
+            stmt = stmt.where(Attendance.date >= start_date)
+        if end_date:
+            stmt = stmt.where(Attendance.date <= end_date)
+
+        return {row.employee_id: row for row in self.db.execute(stmt.group_by(Attendance.employee_id))}
+
+    def leave_totals(self, ids: List[int], start_date: Optional[date], end_date: Optional[date]) -> Dict[int, Any]:
+        stmt = select(
+            Leave.employee_id,
+            func.count().label("total_requests"),
+            func.coalesce(func.sum(Leave.days), 0).label("total_days"),
+            func.count().filter(Leave.status == 2).label("approved"),
+            func.count().filter(Leave.status == 1).label("pending")
+        ).where(Leave.employee_id.in_(ids))
+
+        if start_date:
+            stmt = stmt.where(Leave.start_date >= start_date)
+        if end_date:
+            stmt = stmt.where(Leave.end_date <= end_date)
+
+        return {row.employee_id: row for row in self.db.execute(stmt.group_by(Leave.employee_id))}
+
+    def payroll_totals(self, ids: List[int], start_date: Optional[date], end_date: Optional[date]) -> Dict[int, Any]:
+        stmt = select(
+            Payroll.employee_id,
+            func.count().label("total_records"),
+            func.coalesce(func.sum(Payroll.gross_salary), 0).label("total_gross"),
+            func.coalesce(func.sum(Payroll.net_salary), 0).label("total_net")
+        ).where(Payroll.employee_id.in_(ids))
+
+        if start_date and end_date:
+            stmt = stmt.where(
+                Payroll.year >= start_date.year,
+                Payroll.year <= end_date.year
+            )
+
+        return {row.employee_id: row for row in self.db.execute(stmt.group_by(Payroll.employee_id))}
+
+    def employee_detailed(
+        self,
+        employee_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Attendance, leave and payroll totals per employee in four queries per page
+        """
+        employees = self.employee_page(employee_id, after_id, limit)
+        ids = [emp.id for emp in employees]
+
+        attendance = self.attendance_totals(ids, start_date, end_date) if ids else {}
+        leave = self.leave_totals(ids, start_date, end_date) if ids else {}
+        payroll = self.payroll_totals(ids, start_date, end_date) if ids else {}
+
+        report_data = []
+        for emp in employees:
+            a = attendance.get(emp.id)
+            l = leave.get(emp.id)
+            p = payroll.get(emp.id)
+
+            report_data.append({
+                "employee_id": emp.id,
+                "employee_name": emp.name,
+                "employee_number": emp.employee_id,
+                "designation": emp.designation,
+                "attendance": {
+                    "total_days": a.total_days if a else 0,
+                    "present": a.present if a else 0,
+                    "absent": a.absent if a else 0,
+                    "late": a.late if a else 0,
+                    "half_day": a.half_day if a else 0
+                },
+                "leave": {
+                    "total_requests": l.total_requests if l else 0,
+                    "total_days": int(l.total_days) if l else 0,
+                    "approved": l.approved if l else 0,
+                    "pending": l.pending if l else 0
+                },
+                "payroll": {
+                    "total_records": p.total_records if p else 0,
+                    "total_gross": float(p.total_gross) if p else 0.0,
+                    "total_net": float(p.total_net) if p else 0.0
+                }
+            })
+
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "employees": report_data,
+            "limit": limit,
+            # Pass as after_id to fetch the next page; None on the last page
+            "next_after_id": ids[-1] if len(ids) == limit else None
+        }
+
+    def p9_cards(self, year: int, employee_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        P9 tax deduction cards for a year, one employee at a time
+        Rows are read in employee order through a server-side cursor, so only the
+        current card is held in memory whatever the headcount.
+        """
+        stmt = select(
+            Payroll.employee_id,
+            Payroll.month,
+            Payroll.gross_salary,
+            Payroll.nssf,
+            Payroll.nhif,
+            Payroll.paye,
+            Payroll.net_salary,
+            User.name,
+            User.employee_id.label("employee_number"),
+            User.kra_pin,
+            User.nssf_no,
+            User.nhif_no
+        ).outerjoin(
+            User, User.id == Payroll.employee_id
+        ).where(Payroll.year == year)
+
+        if employee_id:
+            stmt = stmt.where(Payroll.employee_id == employee_id)
+
+        stmt = stmt.order_by(
+            Payroll.employee_id, Payroll.month, Payroll.period_start, Payroll.id
+        ).execution_options(yield_per=self.STREAM_BATCH_SIZE)
+
+        for emp_id, rows in groupby(self.db.execute(stmt), key=lambda row: row.employee_id):
+            card = None
+            totals = dict.fromkeys(P9_AMOUNTS, Decimal(0))
+
+            for row in rows:
+                if card is None:
+                    card = {
+                        "employee_id": emp_id,
+                        "employee_name": row.name,
+                        "employee_number": row.employee_number,
+                        "kra_pin": row.kra_pin,
+                        "nssf_no": row.nssf_no,
+                        "nhif_no": row.nhif_no,
+                        "monthly_data": []
+                    }
+
+                month = {"month": row.month}
+                for field in P9_AMOUNTS:
+                    amount = getattr(row, field) or Decimal(0)
+                    month[field] = float(amount)
+                    totals[field] += amount
+                card["monthly_data"].append(month)
+
+            card["totals"] = {field: float(amount) for field, amount in totals.items()}
+            yield card
+
+    @staticmethod
+    def p9_ndjson(cards: Iterator[Dict[str, Any]]) -> Iterator[str]:
+        """One JSON document per line per card"""
+        for card in cards:
+            yield json.dumps(card) + "\n"
+
+    @staticmethod
+    def csv_stream(header: List[str], rows: Iterator[List[Any]]) -> Iterator[str]:
+        """
+        Encode rows as CSV text, yielding the header and then one chunk per row
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        yield buffer.getvalue()
+
+        for row in rows:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(row)
+            yield buffer.getvalue()
+
+    @staticmethod
+    def xlsx_stream(header: List[str], rows: Iterator[List[Any]], title: str = "Sheet1") -> Iterator[bytes]:
+        """
+        Write rows to an .xlsx workbook in openpyxl write-only mode and stream the file
+        Rows are spooled to a temporary file as they are written, never kept in memory
+        """
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title)
+        sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+
+        with tempfile.TemporaryFile() as spool:
+            workbook.save(spool)
+            spool.seek(0)
+            while chunk := spool.read(FILE_CHUNK_SIZE):
+                yield chunk
+
+    @classmethod
+    def p9_csv(cls, cards: Iterator[Dict[str, Any]]) -> Iterator[str]:
+        """
+        One CSV row per payroll month followed by a "Total" row, card by card
+        """
+        def rows():
+            for card in cards:
+                employee = [card[column] for column in P9_CSV_COLUMNS[:6]]
+                for month in card["monthly_data"]:
+                    yield employee + [month["month"]] + [month[field] for field in P9_AMOUNTS]
+                yield employee + ["Total"] + [card["totals"][field] for field in P9_AMOUNTS]
+
+        return cls.csv_stream(P9_CSV_COLUMNS, rows())
+
+    def tax_rows(self, year: int, month: Optional[int] = None) -> Iterator[List[Any]]:
+        """
+        Tax report rows in TAX_EXPORT_COLUMNS order, one per payroll record
+        Read in employee order through a server-side cursor
+        """
+        stmt = select(
+            User.kra_pin,
+            User.name,
+            User.employee_id.label("employee_number"),
+            User.nssf_no,
+            User.nhif_no,
+            Payroll.year,
+            Payroll.month,
+            Payroll.basic_salary,
+            Payroll.house_allowance,
+            Payroll.transport_allowance,
+            Payroll.overtime_amount,
+            Payroll.medical_allowance,
+            Payroll.other_allowances,
+            Payroll.gross_salary,
+            Payroll.nssf,
+            Payroll.nhif,
+            Payroll.paye
+        ).outerjoin(
+            User, User.id == Payroll.employee_id
+        ).where(Payroll.year == year)
+
+        if month:
+            stmt = stmt.where(Payroll.month == month)
+
+        stmt = stmt.order_by(
+            Payroll.employee_id, Payroll.month, Payroll.period_start, Payroll.id
+        ).execution_options(yield_per=self.STREAM_BATCH_SIZE)
+
+        def amount(value) -> float:
+            return float(value or 0)
+
+        for row in self.db.execute(stmt):
+            yield [
+                row.kra_pin,
+                row.name,
+                row.employee_number,
+                row.nssf_no,
+                row.nhif_no,
+                row.year,
+                row.month,
+                "Resident",
+                "Primary Employee",
+                amount(row.basic_salary),
+                amount(row.house_allowance),
+                amount(row.transport_allowance),
+                amount(row.overtime_amount),
+                amount(row.medical_allowance) + amount(row.other_allowances),
+                amount(row.gross_salary),
+                amount(row.nssf),
+                amount(row.nhif),
+                amount(row.paye)
+            ]
+
+    def grouped_totals(
+        self,
+        select_from: Any,
+        clauses: List[Any],
+        sets: Dict[str, Any],
+        measures: List[Any]
+    ) -> Dict[str, List[Any]]:
+        """
+        Aggregate `measures` over several groupings in one statement
+        `sets` maps a name to the expression to group by (None for the grand total).
+        PostgreSQL runs a single GROUPING SETS query; other databases a UNION ALL of
+        the same groupings. Returns {name: [(key, *measures), ...]}
+        """
+        names = list(sets)
+        keys = [sets[name] for name in names if sets[name] is not None]
+        # Column position of each set's key (expressions are compared by identity)
+        position = {name: next(i for i, key in enumerate(keys) if key is sets[name])
+                    for name in names if sets[name] is not None}
+
+        def mask(name: str) -> int:
+            # GROUPING(k1, ..., kn): bit set for every key not in the row's grouping set
+            return sum(
+                1 << (len(keys) - 1 - i)
+                for i in range(len(keys))
+                if i != position.get(name)
+            )
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            stmt = select(
+                func.grouping(*keys).label("grouping_id") if keys else literal(0).label("grouping_id"),
+                *[key.label(f"key_{i}") for i, key in enumerate(keys)],
+                *measures
+            ).select_from(select_from).where(*clauses).group_by(
+                func.grouping_sets(*[tuple_(sets[name]) if sets[name] is not None else tuple_() for name in names])
+            )
+        else:
+            stmt = union_all(*[
+                select(
+                    literal(mask(name)).label("grouping_id"),
+                    *[(key if i == position.get(name) else null()).label(f"key_{i}") for i, key in enumerate(keys)],
+                    *measures
+                ).select_from(select_from).where(*clauses).group_by(
+                    *([sets[name]] if sets[name] is not None else [])
+                )
+                for name in names
+            ])
+
+        by_mask = {mask(name): name for name in names}
+        results = {name: [] for name in names}
+        for row in self.db.execute(stmt):
+            name = by_mask[row.grouping_id]
+            key = row[1 + position[name]] if name in position else None
+            results[name].append((key, *row[1 + len(keys):]))
+        return results
+
+    @staticmethod
+    def payment_clauses(
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        employee_id: Optional[int] = None,
+        payment_type: Optional[str] = None,
+        payment_method: Optional[str] = None,
+        status: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Payment report filters as WHERE clauses
+        """
+        clauses = []
+        if start_date:
+            clauses.append(Payment.payment_date >= start_date)
+        if end_date:
+            clauses.append(Payment.payment_date <= end_date)
+        if employee_id:
+            clauses.append(Payment.employee_id == employee_id)
+        if payment_type:
+            clauses.append(Payment.payment_type == payment_type)
+        if payment_method:
+            clauses.append(Payment.payment_method == payment_method)
+        if status:
+            clauses.append(Payment.status == status)
+        return clauses
+
+    def payment_report(
+        self,
+        clauses: List[Any],
+        group_by: str = "none",
+        skip: int = 0,
+        limit: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Payment totals, status/type/method breakdowns and the optional grouping in one
+        GROUPING SETS statement, plus one page of records joined to the employee name
+        """
+        group_keys = {
+            "day": date_bucket(literal_column("day"), Payment.payment_date),
+            "week": date_bucket(literal_column("week"), Payment.payment_date),
+            "month": date_bucket(literal_column("month"), Payment.payment_date),
+            "year": date_bucket(literal_column("year"), Payment.payment_date),
+            "employee": func.coalesce(User.name, literal("Employee #") + cast(Payment.employee_id, String)),
+            "type": func.coalesce(Payment.payment_type, "Unknown"),
+            "method": func.coalesce(Payment.payment_method, "Unknown")
+        }
+
+        sets = {
+            "summary": None,
+            "by_status": Payment.status,
+            "by_type": group_keys["type"],
+            "by_method": group_keys["method"]
+        }
+        # Grouping by type or method reuses that breakdown
+        if group_by in group_keys and group_by not in ("type", "method"):
+            sets["grouped"] = group_keys[group_by]
+
+        source = Payment.__table__.outerjoin(User.__table__, User.id == Payment.employee_id)
+        totals = self.grouped_totals(source, clauses, sets, [
+            func.count().label("count"),
+            func.coalesce(func.sum(Payment.amount), 0).label("amount"),
+            func.count(Payment.employee_id.distinct()).label("employees"),
+            func.max(Payment.payment_date).label("latest"),
+            func.max(Payment.id).label("latest_id")
+        ])
+
+        def breakdown(rows, label=lambda key: key) -> Dict[str, Dict[str, Any]]:
+            # Most recently paid group first, like the order payments are listed in
+            rows = sorted(rows, key=lambda r: (r[4] is not None, r[4], r[5]), reverse=True)
+            return {label(key): {"count": count, "amount": float(amount)} for key, count, amount, *_ in rows}
+
+        summary = totals["summary"][0] if totals["summary"] else (None, 0, 0, 0, None, None)
+
+        grouped = None
+        if group_by in group_keys:
+            labels = {
+                "day": lambda d: d.strftime("%Y-%m-%d"),
+                "week": lambda d: f"Week of {d.strftime('%Y-%m-%d')}",
+                "month": lambda d: d.strftime("%B %Y"),
+                "year": lambda d: str(d.year)
+            }
+            rows = totals["grouped"] if "grouped" in totals else totals[f"by_{group_by}"]
+            rows = sorted(rows, key=lambda r: (r[4] is not None, r[4], r[5]), reverse=True)
+            grouped = []
+            for key, count, amount, employees, *_ in rows:
+                if group_by in labels:
+                    key = labels[group_by](_as_date(key)) if key is not None else "Unknown"
+                grouped.append({
+                    "group": key,
+                    "count": count,
+                    "amount": float(amount),
+                    "unique_employees": employees
+                })
+            if group_by in labels:
+                grouped.sort(key=lambda x: x["group"], reverse=True)
+            else:
+                grouped.sort(key=lambda x: x["amount"], reverse=True)
+
+        return {
+            "summary": {
+                "total_payments": summary[1],
+                "total_amount": float(summary[2]),
+                "unique_employees": summary[3]
+            },
+            "by_status": breakdown(totals["by_status"], lambda status: Payment.STATUS_NAMES.get(status, "Unknown")),
+            "by_type": breakdown(totals["by_type"]),
+            "by_method": breakdown(totals["by_method"]),
+            "grouped": grouped,
+            "records": list(self.payment_records(clauses, skip, limit))
+        }
+
+    def payment_records(self, clauses: List[Any], skip: int = 0, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Payments matching `clauses`, newest first, joined to the employee name
+        Without a limit every record is read through a server-side cursor
+        """
+        stmt = select(
+            Payment.id,
+            Payment.employee_id,
+            User.name,
+            Payment.amount,
+            Payment.payment_date,
+            Payment.payment_type,
+            Payment.payment_method,
+            Payment.reference_number,
+            Payment.status,
+            Payment.description
+        ).outerjoin(
+            User, User.id == Payment.employee_id
+        ).where(*clauses).order_by(
+            Payment.payment_date.desc(), Payment.id.desc()
+        ).offset(skip)
+
+        if limit is None:
+            stmt = stmt.execution_options(yield_per=self.STREAM_BATCH_SIZE)
+        else:
+            stmt = stmt.limit(limit)
+
+        for r in self.db.execute(stmt):
+            yield {
+                "id": r.id,
+                "employee_id": r.employee_id,
+                "employee_name": r.name,
+                "amount": float(r.amount),
+                "payment_date": r.payment_date,
+                "payment_type": r.payment_type,
+                "payment_method": r.payment_method,
+                "reference_number": r.reference_number,
+                "status": Payment.STATUS_NAMES.get(r.status, "Unknown"),
+                "description": r.description
+            }
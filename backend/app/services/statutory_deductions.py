@@ -0,0 +1,312 @@
+"""
+Statutory deduction engine - NSSF, NHIF/SHIF and PAYE for Kenya
+Bracket tables are versioned and effective-dated. All amounts are integer cents and
+deductions are computed for a whole column of gross salaries at once with NumPy.
+
+Tables are expressed per month; other payment frequencies are converted to a monthly
+equivalent, computed, then converted back with the same factor. A daily payroll may
+cover several days, so its factor is scaled by the number of days in the period.
+"""
+
+from typing import Optional, Dict, List, Union, Sequence
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+import bisect
+
+import numpy as np
+
+from app.models.payroll import iso_week_start
+
+# Monthly amounts are converted to the pay period as exact fractions (numerator, denominator)
+# "daily" is one day; deductions multiply its numerator by the days in the period
+PRORATE_FACTORS = {
+    "daily": (1, 30),
+    "weekly": (1, 4),
+    "bi-weekly": (1, 2),
+    "monthly": (1, 1),
+    "yearly": (12, 1)
+}
+
+BASIS_POINTS = 10000
+
+
+def to_cents(amount) -> int:
+    """Convert a Decimal/float/None amount to integer cents (half-up)"""
+    if amount is None:
+        return 0
+    return int((Decimal(str(amount)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def _kes(shillings: float) -> int:
+    """Shillings to cents for table definitions"""
+    return int(round(shillings * 100))
+
+
+def _div_round(numerator: np.ndarray, denominator: int) -> np.ndarray:
+    """Integer division rounding half up (inputs are non-negative)"""
+    return (numerator + denominator // 2) // denominator
+
+
+class StatutoryTable:
+    """
+    One effective-dated version of the statutory rules (monthly amounts in cents)
+    """
+
+    def __init__(
+        self,
+        version: str,
+        effective_from: date,
+        paye_bands: List[tuple],
+        personal_relief: int,
+        nssf_rate_bp: int,
+        nssf_lower_limit: int,
+        nssf_upper_limit: int,
+        nhif_brackets: Optional[List[tuple]] = None,
+        shif_rate_bp: int = 0,
+        shif_minimum: int = 0,
+        insurance_relief_bp: int = 0,
+        health_deductible: bool = False
+    ):
+        self.version = version
+        self.effective_from = effective_from
+        self.personal_relief = personal_relief
+        self.nssf_rate_bp = nssf_rate_bp
+        self.nssf_lower_limit = nssf_lower_limit
+        self.nssf_upper_limit = nssf_upper_limit
+        self.shif_rate_bp = shif_rate_bp
+        self.shif_minimum = shif_minimum
+        self.insurance_relief_bp = insurance_relief_bp
+        self.health_deductible = health_deductible
+
+        # PAYE bands are (upper bound in cents or None, rate in basis points);
+        # precompute lower bounds, widths and rates once
+        lowers, widths, rates = [], [], []
+        lower = 0
+        for upper, rate_bp in paye_bands:
+            lowers.append(lower)
+            widths.append((upper - lower) if upper is not None else np.iinfo(np.int64).max // BASIS_POINTS)
+            rates.append(rate_bp)
+            lower = upper if upper is not None else lower
+        self.band_lowers = np.array(lowers, dtype=np.int64)
+        self.band_widths = np.array(widths, dtype=np.int64)
+        self.band_rates = np.array(rates, dtype=np.int64)
+
+        # NHIF brackets: (gross lower bound in cents, contribution in cents)
+        if nhif_brackets:
+            self.nhif_lowers = np.array([b[0] for b in nhif_brackets], dtype=np.int64)
+            self.nhif_amounts = np.array([b[1] for b in nhif_brackets], dtype=np.int64)
+        else:
+            self.nhif_lowers = None
+            self.nhif_amounts = None
+
+    def nssf(self, gross: np.ndarray) -> np.ndarray:
+        """Employee NSSF: Tier I up to the lower limit, Tier II up to the upper limit"""
+        tier_one = np.minimum(gross, self.nssf_lower_limit)
+        tier_two = np.clip(gross - self.nssf_lower_limit, 0, self.nssf_upper_limit - self.nssf_lower_limit)
+        return (
+            _div_round(tier_one * self.nssf_rate_bp, BASIS_POINTS) +
+            _div_round(tier_two * self.nssf_rate_bp, BASIS_POINTS)
+        )
+
+    def health(self, gross: np.ndarray) -> np.ndarray:
+        """NHIF bracket amount, or SHIF percentage with a minimum"""
+        if self.nhif_lowers is not None:
+            idx = np.searchsorted(self.nhif_lowers, gross, side="right") - 1
+            return self.nhif_amounts[np.clip(idx, 0, len(self.nhif_amounts) - 1)]
+        shif = _div_round(gross * self.shif_rate_bp, BASIS_POINTS)
+        return np.maximum(shif, self.shif_minimum)
+
+    def paye(self, gross: np.ndarray, nssf: np.ndarray, health: np.ndarray) -> np.ndarray:
+        """Banded income tax less personal and insurance relief, never negative"""
+        taxable = gross - nssf
+        if self.health_deductible:
+            taxable = taxable - health
+        taxable = np.maximum(taxable, 0)
+
+        portions = np.clip(taxable[:, None] - self.band_lowers[None, :], 0, self.band_widths[None, :])
+        tax = _div_round((portions * self.band_rates[None, :]).sum(axis=1), BASIS_POINTS)
+
+        relief = self.personal_relief
+        if self.insurance_relief_bp:
+            relief = relief + _div_round(health * self.insurance_relief_bp, BASIS_POINTS)
+
+        return np.maximum(tax - relief, 0)
+
+    def compute(self, gross: np.ndarray) -> Dict[str, np.ndarray]:
+        nssf = self.nssf(gross)
+        health = self.health(gross)
+        paye = self.paye(gross, nssf, health)
+        return {"nssf": nssf, "nhif": health, "paye": paye}
+
+
+_PAYE_BANDS_2023 = [
+    (_kes(24000), 1000),
+    (_kes(32333), 2500),
+    (_kes(500000), 3000),
+    (_kes(800000), 3250),
+    (None, 3500)
+]
+
+_NHIF_BRACKETS = [
+    (_kes(0), _kes(150)),
+    (_kes(6000), _kes(300)),
+    (_kes(8000), _kes(400)),
+    (_kes(12000), _kes(500)),
+    (_kes(15000), _kes(600)),
+    (_kes(20000), _kes(750)),
+    (_kes(25000), _kes(850)),
+    (_kes(30000), _kes(900)),
+    (_kes(35000), _kes(950)),
+    (_kes(40000), _kes(1000)),
+    (_kes(45000), _kes(1100)),
+    (_kes(50000), _kes(1200)),
+    (_kes(60000), _kes(1300)),
+    (_kes(70000), _kes(1400)),
+    (_kes(80000), _kes(1500)),
+    (_kes(90000), _kes(1600)),
+    (_kes(100000), _kes(1700))
+]
+
+# Ordered by effective date; the latest table not after the pay period applies
+STATUTORY_TABLES = [
+    StatutoryTable(
+        version="KE-2023-07",
+        effective_from=date(2023, 7, 1),
+        paye_bands=_PAYE_BANDS_2023,
+        personal_relief=_kes(2400),
+        nssf_rate_bp=600,
+        nssf_lower_limit=_kes(6000),
+        nssf_upper_limit=_kes(18000),
+        nhif_brackets=_NHIF_BRACKETS,
+        insurance_relief_bp=1500
+    ),
+    StatutoryTable(
+        version="KE-2024-02",
+        effective_from=date(2024, 2, 1),
+        paye_bands=_PAYE_BANDS_2023,
+        personal_relief=_kes(2400),
+        nssf_rate_bp=600,
+        nssf_lower_limit=_kes(7000),
+        nssf_upper_limit=_kes(36000),
+        nhif_brackets=_NHIF_BRACKETS,
+        insurance_relief_bp=1500
+    ),
+    StatutoryTable(
+        version="KE-2024-10",
+        effective_from=date(2024, 10, 1),
+        paye_bands=_PAYE_BANDS_2023,
+        personal_relief=_kes(2400),
+        nssf_rate_bp=600,
+        nssf_lower_limit=_kes(7000),
+        nssf_upper_limit=_kes(36000),
+        shif_rate_bp=275,
+        shif_minimum=_kes(300),
+        insurance_relief_bp=1500
+    ),
+    StatutoryTable(
+        version="KE-2024-12",
+        effective_from=date(2024, 12, 27),
+        paye_bands=_PAYE_BANDS_2023,
+        personal_relief=_kes(2400),
+        nssf_rate_bp=600,
+        nssf_lower_limit=_kes(7000),
+        nssf_upper_limit=_kes(36000),
+        shif_rate_bp=275,
+        shif_minimum=_kes(300),
+        health_deductible=True
+    ),
+    StatutoryTable(
+        version="KE-2025-02",
+        effective_from=date(2025, 2, 1),
+        paye_bands=_PAYE_BANDS_2023,
+        personal_relief=_kes(2400),
+        nssf_rate_bp=600,
+        nssf_lower_limit=_kes(8000),
+        nssf_upper_limit=_kes(72000),
+        shif_rate_bp=275,
+        shif_minimum=_kes(300),
+        health_deductible=True
+    )
+]
+
+_EFFECTIVE_DATES = [t.effective_from for t in STATUTORY_TABLES]
+
+
+def get_table(on_date: date) -> StatutoryTable:
+    """Get the statutory table in force on a date (the earliest table for older dates)"""
+    idx = bisect.bisect_right(_EFFECTIVE_DATES, on_date) - 1
+    return STATUTORY_TABLES[max(idx, 0)]
+
+
+def period_effective_date(
+    payment_frequency: str,
+    year: int,
+    month: Optional[int] = None,
+    week_number: Optional[int] = None,
+    pay_period_start: Optional[date] = None
+) -> date:
+    """Date used to pick the statutory table for a pay period"""
+    if pay_period_start:
+        return pay_period_start
+    if payment_frequency in ["weekly", "bi-weekly"] and week_number:
+        return iso_week_start(year, week_number)
+    return date(year, month or 1, 1)
+
+
+def period_days(start: date, end: Optional[date] = None) -> int:
+    """Calendar days in an inclusive pay period"""
+    return max(((end or start) - start).days + 1, 1)
+
+
+def compute_deductions(
+    gross_cents: Union[np.ndarray, Sequence[int]],
+    on_dates: Union[date, Sequence[date]],
+    payment_frequency: Union[str, Sequence[str]] = "monthly",
+    days: Union[int, Sequence[int]] = 1
+) -> Dict[str, np.ndarray]:
+    """
+    Compute NSSF, NHIF/SHIF and PAYE (int64 cents) for a column of gross salaries
+    `on_dates`, `payment_frequency` and `days` (calendar days covered by daily
+    payrolls, see period_days) may be scalars or per-row sequences
+    """
+    gross = np.asarray(gross_cents, dtype=np.int64)
+    n = len(gross)
+    result = {key: np.zeros(n, dtype=np.int64) for key in ("nssf", "nhif", "paye")}
+    if n == 0:
+        return result
+
+    # Per-row frequency factors
+    if isinstance(payment_frequency, str):
+        num, den = PRORATE_FACTORS.get(payment_frequency, (1, 1))
+        numerators = np.full(n, num, dtype=np.int64)
+        denominators = np.full(n, den, dtype=np.int64)
+    else:
+        factors = [PRORATE_FACTORS.get(f, (1, 1)) for f in payment_frequency]
+        numerators = np.array([f[0] for f in factors], dtype=np.int64)
+        denominators = np.array([f[1] for f in factors], dtype=np.int64)
+
+    # A daily payroll's gross covers all days of its period, not one
+    if isinstance(payment_frequency, str):
+        is_daily = np.full(n, payment_frequency == "daily")
+    else:
+        is_daily = np.asarray(payment_frequency) == "daily"
+    numerators = np.where(is_daily, numerators * np.asarray(days, dtype=np.int64), numerators)
+
+    # Per-row table version
+    if isinstance(on_dates, date):
+        groups = [(get_table(on_dates), slice(None))]
+    else:
+        versions = np.array([bisect.bisect_right(_EFFECTIVE_DATES, d) - 1 for d in on_dates])
+        versions = np.maximum(versions, 0)
+        groups = [(STATUTORY_TABLES[v], versions == v) for v in np.unique(versions)]
+
+    monthly_gross = (gross * denominators + numerators // 2) // numerators
+
+    for table, mask in groups:
+        monthly = table.compute(monthly_gross[mask])
+        for key, values in monthly.items():
+            # Back to the pay period
+            result[key][mask] = (values * numerators[mask] + denominators[mask] // 2) // denominators[mask]
+
+    return result
+
@@ -0,0 +1,108 @@
+"""
+Benchmark: query count and time of the detailed employee report vs headcount
+
+Seeds an in-memory SQLite database with N employees (attendance, leave and payroll
+for each), then pages through /reports/employee-detailed and counts the SQL
+statements per page. The count must not grow with headcount.
+
+    cd backend && python -m benchmarks.employee_report_queries [--sizes 100 1000 10000]
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import date, timedelta
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import User, Attendance, Leave, Payroll
+from app.services.report_service import ReportService
+
+
+def seed(db, n: int):
+    db.execute(insert(User), [
+        dict(id=i, name=f"Employee {i}", password="x", present_address="-", contact_no_one="-", gender="M",
+             access_label=5, employee_id=f"EMP{i:05d}", activation_status=1, deletion_status=0)
+        for i in range(1, n + 1)
+    ])
+    day = date(2025, 3, 3)
+    db.execute(insert(Attendance), [
+        dict(employee_id=i, date=day + timedelta(days=d), status=1 + (i + d) % 4)
+        for i in range(1, n + 1) for d in range(5)
+    ])
+    db.execute(insert(Leave), [
+        dict(employee_id=i, leave_type=1, start_date=day, end_date=day, days=1, reason="-", status=1 + i % 2)
+        for i in range(1, n + 1)
+    ])
+    db.execute(insert(Payroll), [
+        dict(employee_id=i, year=2025, month=3, payment_frequency="monthly", period_start=date(2025, 3, 1),
+             basic_salary=Decimal(50000), gross_salary=Decimal(50000), total_deductions=Decimal(10000),
+             net_salary=Decimal(40000))
+        for i in range(1, n + 1)
+    ])
+    db.commit()
+
+
+def run(n: int, page_size: int):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, n)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    service = ReportService(db)
+    started = time.perf_counter()
+    pages = 0
+    rows = 0
+    after_id = None
+    first_page_queries = None
+
+    while True:
+        before = len(statements)
+        report = service.employee_detailed(
+            start_date=date(2025, 1, 1), end_date=date(2025, 12, 31), after_id=after_id, limit=page_size
+        )
+        if first_page_queries is None:
+            first_page_queries = len(statements) - before
+        pages += 1
+        rows += len(report["employees"])
+        after_id = report["next_after_id"]
+        if after_id is None:
+            break
+
+    elapsed = time.perf_counter() - started
+    db.close()
+    return {
+        "employees": n,
+        "rows": rows,
+        "pages": pages,
+        "queries_per_page": first_page_queries,
+        "queries_total": len(statements),
+        "seconds": round(elapsed, 3)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'employees':>10} {'pages':>6} {'queries/page':>13} {'queries':>8} {'seconds':>8}")
+    for size in args.sizes:
+        result = run(size, args.page_size)
+        assert result["rows"] == size
+        print(
+            f"{result['employees']:>10} {result['pages']:>6} {result['queries_per_page']:>13} "
+            f"{result['queries_total']:>8} {result['seconds']:>8}"
+        )
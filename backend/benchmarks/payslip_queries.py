@@ -0,0 +1,103 @@
+"""
+Benchmark: query count of the payslip listing and bulk JSON download vs headcount
+
+Seeds an in-memory SQLite database with N employees (designation and payroll for
+each), then calls GET /payslips and GET /payslips/bulk/download?format=json and
+counts the SQL statements per call. The counts must not grow with headcount.
+
+    cd backend && python -m benchmarks.payslip_queries [--sizes 100 1000 10000]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from datetime import date
+from decimal import Decimal
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import User, Designation, Payroll
+from app.api.v1.endpoints.payslips import get_payslips, download_bulk_payslips
+
+
+def seed(db, n: int):
+    db.execute(insert(Designation), [
+        dict(id=d, created_by=1, department_id=1, designation=f"Designation {d}") for d in range(1, 6)
+    ])
+    db.execute(insert(User), [
+        dict(id=i, name=f"Employee {i}", password="x", present_address="-", contact_no_one="-", gender="M",
+             access_label=5, employee_id=f"EMP{i:05d}", activation_status=1, deletion_status=0,
+             designation_id=1 + i % 5)
+        for i in range(1, n + 1)
+    ])
+    db.execute(insert(Payroll), [
+        dict(employee_id=i, year=2025, month=3, payment_frequency="monthly", period_start=date(2025, 3, 1),
+             basic_salary=Decimal(50000), gross_salary=Decimal(50000), total_deductions=Decimal(10000),
+             net_salary=Decimal(40000), status=1)
+        for i in range(1, n + 1)
+    ])
+    db.commit()
+
+
+def run(n: int, page_size: int):
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    seed(db, n)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    def count(call):
+        db.expunge_all()
+        before = len(statements)
+        started = time.perf_counter()
+        result = asyncio.run(call)
+        return result, len(statements) - before, time.perf_counter() - started
+
+    listing, listing_queries, listing_seconds = count(get_payslips(
+        month=3, year=2025, employee_id=None, status=None, skip=0, limit=page_size, db=db, current_user={}
+    ))
+    bulk, bulk_queries, bulk_seconds = count(download_bulk_payslips(
+        month=3, year=2025, employee_id=None, format="json", db=db, current_user={}
+    ))
+
+    db.close()
+    return {
+        "employees": n,
+        "listed": len(listing["items"]),
+        "listing_queries": listing_queries,
+        "bulk_rows": bulk["total"],
+        "bulk_queries": bulk_queries,
+        "seconds": round(listing_seconds + bulk_seconds, 3)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'employees':>10} {'listed':>7} {'list queries':>13} {'bulk rows':>10} {'bulk queries':>13} {'seconds':>8}")
+    baseline = None
+    for size in args.sizes:
+        result = run(size, args.page_size)
+        assert result["listed"] == min(size, args.page_size)
+        assert result["bulk_rows"] == size
+        counts = (result["listing_queries"], result["bulk_queries"])
+        # Query counts are independent of headcount
+        assert baseline is None or counts == baseline, f"query count grew with headcount: {baseline} -> {counts}"
+        baseline = counts
+        print(
+            f"{result['employees']:>10} {result['listed']:>7} {result['listing_queries']:>13} "
+            f"{result['bulk_rows']:>10} {result['bulk_queries']:>13} {result['seconds']:>8}"
+        )
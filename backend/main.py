@@ -12,7 +12,7 @@ import time
 import logging
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, check_dialect
 from app.core.middleware import (
     SecurityHeadersMiddleware,
     RequestLoggingMiddleware,
@@ -32,9 +32,21 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Payroll API...")
     
+    # Payroll writes need INSERT ... ON CONFLICT; refuse to start on other databases
+    check_dialect(engine)
+    
     # Create database tables
     Base.metadata.create_all(bind=engine)
     
+    # Make sure next year's payroll/payments partitions exist (no-op if not partitioned)
+    try:
+        from app.services.partition_maintenance import ensure_partitions
+        created = ensure_partitions(engine)
+        if created:
+            logger.info(f"✅ Created partitions: {', '.join(created)}")
+    except Exception as e:
+        logger.warning(f"⚠️ Partition maintenance failed: {e}")
+    
     # Test Redis connection
     try:
         from app.core.redis_client import RedisClient
@@ -45,6 +57,18 @@ async def lifespan(app: FastAPI):
         logger.warning(f"⚠️ Redis connection failed: {e}")
         logger.warning("Some features (session management, rate limiting) will be disabled")
     
+    # Start background payroll run worker
+    if settings.PAYROLL_RUN_WORKER_ENABLED:
+        from app.services.payroll_run_service import payroll_run_worker
+        payroll_run_worker.start()
+        logger.info("✅ Payroll run worker started")
+    
+    # Start background report job worker
+    if settings.REPORT_JOB_WORKER_ENABLED:
+        from app.services.report_job_service import report_job_worker
+        report_job_worker.start()
+        logger.info("✅ Report job worker started")
+    
     logger.info("✅ Payroll API started successfully")
     
     yield
@@ -52,6 +76,22 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Payroll API...")
     
+    # Stop background payroll run worker (current chunk is allowed to finish)
+    if settings.PAYROLL_RUN_WORKER_ENABLED:
+        from app.services.payroll_run_service import payroll_run_worker
+        payroll_run_worker.stop()
+    
+    # Stop background report job worker (unfinished jobs are re-run once stale)
+    if settings.REPORT_JOB_WORKER_ENABLED:
+        from app.services.report_job_service import report_job_worker
+        report_job_worker.stop()
+    
+    # Stop payslip archiving and the PDF rendering processes (unarchived payslips are archived on first download)
+    from app.services.payslip_service import payslip_archiver
+    payslip_archiver.stop()
+    from app.services.payslip_pdf import shutdown_pool
+    shutdown_pool()
+    
     # Close Redis connection
     try:
         from app.core.redis_client import RedisClient
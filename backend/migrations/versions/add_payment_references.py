@@ -0,0 +1,54 @@
+"""Add payment references table
+
+Revision ID: add_payment_references
+Revises: add_payslip_archive
+Create Date: 2026-10-18
+
+Partitioned payments can only enforce UNIQUE (reference_number, payment_date), so the
+same reference could be stored again in another year. payment_references is not
+partitioned and keeps reference numbers unique across all years.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_payment_references'
+down_revision = 'add_payslip_archive'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'payment_references',
+        sa.Column('reference_number', sa.String(length=100), nullable=False),
+        sa.Column('payment_id', sa.Integer(), nullable=False),
+        sa.Column('payment_date', sa.Date(), nullable=False),
+        sa.PrimaryKeyConstraint('reference_number')
+    )
+    op.create_index(op.f('ix_payment_references_payment_id'), 'payment_references', ['payment_id'])
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # References repeated across years before this table existed: the oldest payment keeps it
+        op.execute(
+            "INSERT INTO payment_references (reference_number, payment_id, payment_date) "
+            "SELECT DISTINCT ON (reference_number) reference_number, id, payment_date FROM payments "
+            "WHERE reference_number IS NOT NULL ORDER BY reference_number, id"
+        )
+        # The partitioned key (id, payment_date) can be referenced, so deletes cascade
+        op.create_foreign_key(
+            'payment_references_payment_fkey', 'payment_references', 'payments',
+            ['payment_id', 'payment_date'], ['id', 'payment_date'],
+            ondelete='CASCADE', onupdate='CASCADE'
+        )
+    else:
+        op.execute(
+            "INSERT INTO payment_references (reference_number, payment_id, payment_date) "
+            "SELECT reference_number, id, payment_date FROM payments WHERE reference_number IS NOT NULL"
+        )
+
+
+def downgrade():
+    op.drop_index(op.f('ix_payment_references_payment_id'), table_name='payment_references')
+    op.drop_table('payment_references')
@@ -0,0 +1,95 @@
+"""Add normalized payroll period key
+
+Revision ID: add_payroll_period_key
+Revises: add_payroll_recalculation_flag
+Create Date: 2026-10-18
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.payroll import Payroll
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+# revision identifiers, used by Alembic.
+revision = 'add_payroll_period_key'
+down_revision = 'add_payroll_recalculation_flag'
+branch_labels = None
+depends_on = None
+
+
+def _backfill_period_start():
+    """
+    Key every existing row with Payroll.normalize_period_start (portable, no database
+    date functions). Only the oldest row of a duplicated period gets the key; NULLs never
+    conflict, so the unique constraint can be created. The rows left without a key drop out
+    of period filters, runs and the rollup, so they are reported for review.
+    """
+    bind = op.get_bind()
+    payroll = sa.table(
+        'payroll',
+        sa.column('id', sa.Integer), sa.column('employee_id', sa.Integer),
+        sa.column('payment_frequency', sa.String), sa.column('year', sa.Integer),
+        sa.column('month', sa.Integer), sa.column('week_number', sa.Integer),
+        sa.column('pay_period_start', sa.Date), sa.column('period_start', sa.Date)
+    )
+    rows = bind.execute(sa.select(
+        payroll.c.id, payroll.c.employee_id, payroll.c.payment_frequency, payroll.c.year,
+        payroll.c.month, payroll.c.week_number, payroll.c.pay_period_start
+    ).order_by(payroll.c.id)).all()
+
+    keyed, seen, duplicates, invalid = [], set(), [], []
+    for row in rows:
+        try:
+            key = Payroll.normalize_period_start(
+                row.payment_frequency, row.year, row.month, row.week_number, row.pay_period_start
+            )
+        except ValueError:
+            invalid.append(row.id)
+            continue
+        period = (row.employee_id, row.payment_frequency, row.year, key)
+        if period in seen:
+            duplicates.append(row.id)
+            continue
+        seen.add(period)
+        keyed.append({'row_id': row.id, 'key': key})
+
+    update = payroll.update().where(payroll.c.id == sa.bindparam('row_id')).values(period_start=sa.bindparam('key'))
+    for i in range(0, len(keyed), 5000):
+        bind.execute(update, keyed[i:i + 5000])
+
+    if duplicates:
+        logger.warning(
+            "%d payroll rows duplicate an older row's period and were left without period_start; "
+            "review and delete or merge them (ids: %s%s)",
+            len(duplicates), ", ".join(map(str, duplicates[:50])), ", ..." if len(duplicates) > 50 else ""
+        )
+    if invalid:
+        logger.warning(
+            "%d payroll rows have a month or week_number outside their year and were left without "
+            "period_start (ids: %s%s)",
+            len(invalid), ", ".join(map(str, invalid[:50])), ", ..." if len(invalid) > 50 else ""
+        )
+
+
+def upgrade():
+    op.add_column('payroll', sa.Column('period_start', sa.Date(), nullable=True))
+    op.add_column('payroll_runs', sa.Column('skipped_count', sa.Integer(), server_default='0', nullable=True))
+
+    _backfill_period_start()
+
+    # Batch mode so the constraint can also be added on SQLite (table copy)
+    with op.batch_alter_table('payroll') as batch_op:
+        batch_op.create_unique_constraint(
+            'uq_payroll_employee_period', ['employee_id', 'payment_frequency', 'year', 'period_start']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('payroll') as batch_op:
+        batch_op.drop_constraint('uq_payroll_employee_period', type_='unique')
+    op.drop_column('payroll_runs', 'skipped_count')
+    op.drop_column('payroll', 'period_start')
@@ -0,0 +1,76 @@
+"""Add payroll period rollup table
+
+Revision ID: add_payroll_period_rollup
+Revises: add_yearly_partitions
+Create Date: 2026-10-18
+
+Totals per pay period, frequency, status and primary department, maintained by
+app.services.payroll_rollup on every payroll write. The table is backfilled here;
+`python -m app.services.payroll_rollup rebuild` recomputes it at any time.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_payroll_period_rollup'
+down_revision = 'add_yearly_partitions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'payroll_period_rollup',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('week_number', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('payment_frequency', sa.String(length=20), nullable=False),
+        sa.Column('status', sa.SmallInteger(), nullable=False),
+        sa.Column('department_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('payroll_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('gross_salary', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.Column('total_deductions', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.Column('net_salary', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.Column('paye', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.Column('nssf', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.Column('nhif', sa.Numeric(precision=15, scale=2), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'year', 'payment_frequency', 'period_start', 'month', 'week_number', 'status', 'department_id',
+            name='uq_payroll_period_rollup'
+        )
+    )
+    op.create_index(op.f('ix_payroll_period_rollup_id'), 'payroll_period_rollup', ['id'], unique=False)
+    op.create_index('ix_payroll_period_rollup_year_month', 'payroll_period_rollup', ['year', 'month'], unique=False)
+    op.create_index('ix_payroll_period', 'payroll', ['year', 'payment_frequency', 'period_start'], unique=False)
+
+    op.execute("""
+        INSERT INTO payroll_period_rollup (
+            year, month, week_number, period_start, payment_frequency, status, department_id,
+            payroll_count, gross_salary, total_deductions, net_salary, paye, nssf, nhif
+        )
+        SELECT p.year, COALESCE(p.month, 0), COALESCE(p.week_number, 0), p.period_start,
+               p.payment_frequency, COALESCE(p.status, 1), COALESCE(d.department_id, 0),
+               COUNT(*), COALESCE(SUM(p.gross_salary), 0), COALESCE(SUM(p.total_deductions), 0),
+               COALESCE(SUM(p.net_salary), 0), COALESCE(SUM(p.paye), 0),
+               COALESCE(SUM(p.nssf), 0), COALESCE(SUM(p.nhif), 0)
+        FROM payroll p
+        LEFT JOIN (
+            SELECT employee_id, MIN(department_id) AS department_id
+            FROM employee_departments WHERE is_primary = 1 GROUP BY employee_id
+        ) d ON d.employee_id = p.employee_id
+        WHERE p.period_start IS NOT NULL
+        GROUP BY p.year, COALESCE(p.month, 0), COALESCE(p.week_number, 0), p.period_start,
+                 p.payment_frequency, COALESCE(p.status, 1), COALESCE(d.department_id, 0)
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_payroll_period', table_name='payroll')
+    op.drop_index('ix_payroll_period_rollup_year_month', table_name='payroll_period_rollup')
+    op.drop_index(op.f('ix_payroll_period_rollup_id'), table_name='payroll_period_rollup')
+    op.drop_table('payroll_period_rollup')
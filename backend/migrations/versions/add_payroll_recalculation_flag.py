@@ -0,0 +1,25 @@
+"""Add payroll recalculation flag
+
+Revision ID: add_payroll_recalculation_flag
+Revises: add_payroll_runs_table
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_payroll_recalculation_flag'
+down_revision = 'add_payroll_runs_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('payroll', sa.Column('needs_recalculation', sa.Boolean(), server_default=sa.false(), nullable=True))
+    op.create_index(op.f('ix_payroll_needs_recalculation'), 'payroll', ['needs_recalculation'])
+
+
+def downgrade():
+    op.drop_index(op.f('ix_payroll_needs_recalculation'), table_name='payroll')
+    op.drop_column('payroll', 'needs_recalculation')
@@ -0,0 +1,57 @@
+"""Add payroll runs table
+
+Revision ID: add_payroll_runs_table
+Revises: add_new_management_tables
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_payroll_runs_table'
+down_revision = 'add_new_management_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'payroll_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('payment_frequency', sa.String(length=20), nullable=False, server_default='monthly'),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=True),
+        sa.Column('week_number', sa.Integer(), nullable=True),
+        sa.Column('pay_period_start', sa.Date(), nullable=True),
+        sa.Column('pay_period_end', sa.Date(), nullable=True),
+        sa.Column('employee_ids', sa.JSON(), nullable=False),
+        sa.Column('auto_process', sa.Boolean(), default=False),
+        sa.Column('auto_pay', sa.Boolean(), default=False),
+        sa.Column('payment_method', sa.String(length=50), nullable=True),
+        sa.Column('payment_reference', sa.String(length=100), nullable=True),
+        sa.Column('status', sa.SmallInteger(), default=1),
+        sa.Column('chunk_size', sa.Integer(), default=500),
+        sa.Column('cursor', sa.Integer(), default=0),
+        sa.Column('total_employees', sa.Integer(), default=0),
+        sa.Column('created_count', sa.Integer(), default=0),
+        sa.Column('error_count', sa.Integer(), default=0),
+        sa.Column('errors', sa.JSON(), nullable=True),
+        sa.Column('error_message', sa.String(length=500), nullable=True),
+        sa.Column('worker_id', sa.String(length=100), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_payroll_runs_id'), 'payroll_runs', ['id'])
+    op.create_index(op.f('ix_payroll_runs_status'), 'payroll_runs', ['status'])
+
+
+def downgrade():
+    op.drop_index(op.f('ix_payroll_runs_status'), table_name='payroll_runs')
+    op.drop_index(op.f('ix_payroll_runs_id'), table_name='payroll_runs')
+    op.drop_table('payroll_runs')
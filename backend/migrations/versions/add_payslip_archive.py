@@ -0,0 +1,25 @@
+"""Add archived payslip digest to payroll
+
+Revision ID: add_payslip_archive
+Revises: add_report_jobs_table
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_payslip_archive'
+down_revision = 'add_report_jobs_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Paid rows without a digest are archived on first download, or in bulk with
+    # python -m app.services.payslip_service
+    op.add_column('payroll', sa.Column('payslip_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column('payroll', 'payslip_sha256')
@@ -0,0 +1,37 @@
+"""Add composite indexes for attendance and leave reports
+
+Revision ID: add_report_indexes
+Revises: add_payroll_period_rollup
+Create Date: 2026-10-18
+
+On PostgreSQL the indexes are built CONCURRENTLY so the tables stay writable.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_report_indexes'
+down_revision = 'add_payroll_period_rollup'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_attendance_employee_id_date', 'attendance', ['employee_id', 'date']),
+    ('ix_leaves_employee_id_start_date', 'leaves', ['employee_id', 'start_date']),
+    ('ix_leaves_status_start_date', 'leaves', ['status', 'start_date'])
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
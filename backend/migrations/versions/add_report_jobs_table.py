@@ -0,0 +1,50 @@
+"""Add report jobs table
+
+Revision ID: add_report_jobs_table
+Revises: add_report_indexes
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_report_jobs_table'
+down_revision = 'add_report_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'report_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('report_type', sa.String(length=50), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('format', sa.String(length=10), nullable=False, server_default='json'),
+        sa.Column('status', sa.SmallInteger(), default=1),
+        sa.Column('processed', sa.Integer(), default=0),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('error_message', sa.String(length=500), nullable=True),
+        sa.Column('artifact_path', sa.String(length=255), nullable=True),
+        sa.Column('artifact_size', sa.BigInteger(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('worker_id', sa.String(length=100), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_report_jobs_id'), 'report_jobs', ['id'])
+    op.create_index(op.f('ix_report_jobs_status'), 'report_jobs', ['status'])
+    op.create_index(op.f('ix_report_jobs_created_by'), 'report_jobs', ['created_by'])
+
+
+def downgrade():
+    op.drop_index(op.f('ix_report_jobs_created_by'), table_name='report_jobs')
+    op.drop_index(op.f('ix_report_jobs_status'), table_name='report_jobs')
+    op.drop_index(op.f('ix_report_jobs_id'), table_name='report_jobs')
+    op.drop_table('report_jobs')
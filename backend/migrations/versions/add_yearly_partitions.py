@@ -0,0 +1,151 @@
+"""Range-partition payroll and payments by year
+
+Revision ID: add_yearly_partitions
+Revises: add_payroll_period_key
+Create Date: 2026-10-18
+
+PostgreSQL only. Each table is rebuilt as a declaratively partitioned table with one
+partition per year present in the data (through next year) plus a default partition,
+and the rows are copied across. Primary and unique keys must contain the partition
+key, so they become (id, year) / (id, payment_date); payments.payroll_id can no
+longer be a foreign key to payroll.id (the payments endpoints check it instead), and
+reference_number is kept unique across years by payment_references
+(add_payment_references). Later years are created by
+app.services.partition_maintenance (run at API startup and from the CLI).
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_yearly_partitions'
+down_revision = 'add_payroll_period_key'
+branch_labels = None
+depends_on = None
+
+
+PAYROLL_INDEXES = [
+    ('ix_payroll_id', ['id']),
+    ('ix_payroll_employee_id', ['employee_id']),
+    ('ix_payroll_needs_recalculation', ['needs_recalculation'])
+]
+
+PAYMENT_INDEXES = [
+    ('ix_payments_id', ['id']),
+    ('ix_payments_employee_id', ['employee_id']),
+    ('ix_payments_payroll_id', ['payroll_id']),
+    ('ix_payments_payment_date', ['payment_date'])
+]
+
+
+def _year_bounds(table, year):
+    if table == 'payments':
+        return f"FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+    return f"FROM ({year}) TO ({year + 1})"
+
+
+def _rebuild_partitioned(table, partition_by, year_sql, primary_key, unique_constraints, indexes):
+    """Swap `table` for a range-partitioned copy with yearly partitions"""
+    bind = op.get_bind()
+    legacy = f'{table}_unpartitioned'
+
+    # Keep the id sequence alive when the old table is dropped
+    op.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq OWNED BY NONE")
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(
+        f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS) "
+        f"PARTITION BY RANGE ({partition_by})"
+    )
+
+    first, last = bind.execute(sa.text(f"SELECT MIN({year_sql}), MAX({year_sql}) FROM {legacy}")).one()
+    this_year = date.today().year
+    first = int(first) if first is not None else this_year
+    last = max(int(last) if last is not None else this_year, this_year + 1)
+
+    for year in range(first, last + 1):
+        op.execute(f"CREATE TABLE {table}_y{year} PARTITION OF {table} FOR VALUES {_year_bounds(table, year)}")
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    op.execute(f"DROP TABLE {legacy} CASCADE")
+    op.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq OWNED BY {table}.id")
+
+    # Defined on the parent, created on every partition
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({', '.join(primary_key)})")
+    for name, columns in unique_constraints:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE ({', '.join(columns)})")
+    for name, columns in indexes:
+        op.create_index(name, table, columns)
+    op.create_foreign_key(f'{table}_employee_id_fkey', table, 'users', ['employee_id'], ['id'])
+
+
+def _rebuild_plain(table, primary_key, unique_constraints, indexes):
+    """Swap a partitioned `table` back for a regular table"""
+    legacy = f'{table}_partitioned'
+
+    op.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq OWNED BY NONE")
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+    op.execute(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS)")
+    op.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+    op.execute(f"DROP TABLE {legacy} CASCADE")
+    op.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq OWNED BY {table}.id")
+
+    op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({', '.join(primary_key)})")
+    for name, columns in unique_constraints:
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE ({', '.join(columns)})")
+    for name, columns in indexes:
+        op.create_index(name, table, columns)
+    op.create_foreign_key(f'{table}_employee_id_fkey', table, 'users', ['employee_id'], ['id'])
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # payments first: dropping its old table also drops the foreign key into payroll
+    _rebuild_partitioned(
+        'payments',
+        partition_by='payment_date',
+        year_sql='EXTRACT(YEAR FROM payment_date)',
+        primary_key=['id', 'payment_date'],
+        unique_constraints=[('uq_payments_reference_number', ['reference_number', 'payment_date'])],
+        indexes=PAYMENT_INDEXES
+    )
+    op.create_foreign_key('payments_processed_by_fkey', 'payments', 'users', ['processed_by'], ['id'])
+
+    _rebuild_partitioned(
+        'payroll',
+        partition_by='year',
+        year_sql='year',
+        primary_key=['id', 'year'],
+        unique_constraints=[
+            ('uq_payroll_employee_period', ['employee_id', 'payment_frequency', 'year', 'period_start'])
+        ],
+        indexes=PAYROLL_INDEXES
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    _rebuild_plain(
+        'payroll',
+        primary_key=['id'],
+        unique_constraints=[
+            ('uq_payroll_employee_period', ['employee_id', 'payment_frequency', 'year', 'period_start'])
+        ],
+        indexes=PAYROLL_INDEXES
+    )
+
+    _rebuild_plain(
+        'payments',
+        primary_key=['id'],
+        unique_constraints=[],
+        indexes=PAYMENT_INDEXES
+    )
+    op.create_index('ix_payments_reference_number', 'payments', ['reference_number'], unique=True)
+    op.create_foreign_key('payments_processed_by_fkey', 'payments', 'users', ['processed_by'], ['id'])
+    op.create_foreign_key('payments_payroll_id_fkey', 'payments', 'payroll', ['payroll_id'], ['id'])